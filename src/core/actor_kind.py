@@ -0,0 +1,29 @@
+from enum import Enum
+
+class ActorKind(Enum):
+    VEHICLE = "vehicle"
+    WALKER = "walker"
+    TRAFFIC_LIGHT = "traffic_light"
+    SPEED_LIMIT = "speed_limit"
+    TRAFFIC_SIGN = "traffic_sign"  # Stop and yield signs
+    SENSOR = "sensor"
+    OTHER = "other"
+
+    @staticmethod
+    def classify(type_id):
+        """
+        Returns the kind of an actor from its type id.
+        """
+        if 'vehicle' in type_id:
+            return ActorKind.VEHICLE
+        if 'traffic_light' in type_id:
+            return ActorKind.TRAFFIC_LIGHT
+        if 'speed_limit' in type_id:
+            return ActorKind.SPEED_LIMIT
+        if type_id in ('traffic.stop', 'traffic.yield'):
+            return ActorKind.TRAFFIC_SIGN
+        if 'walker.pedestrian' in type_id:
+            return ActorKind.WALKER
+        if type_id.startswith('sensor.'):
+            return ActorKind.SENSOR
+        return ActorKind.OTHER
@@ -32,6 +32,61 @@ HEART_EMPTY_PATH = ASSETS_PATH + "/images/heart_empty.png"
 # Sound Constants
 SOUND_BASE_PATH = ASSETS_PATH + "/sounds/"
 
+# Loop Constants
+SIMULATION_FPS = 60  # Fixed rate of the synchronous Carla steps (fixed_delta_seconds = 1 / SIMULATION_FPS)
+GAME_LOGIC_FPS = 60  # Fixed rate of the GameManager updates
+RENDER_FPS = 60  # Rate of the rendered frames
+MAX_CATCH_UP_STEPS = 3  # Maximum game logic steps run in one loop iteration after a stall
+FRAME_LIMITER_MODE = "hybrid"  # busy, sleep, hybrid or server
+FRAME_LIMITER_SPIN_MS = 2.0  # Last part of the frame interval spun by the hybrid frame limiter
+JITTER_REPORT_INTERVAL = 10.0  # Seconds between two frame jitter reports in the debug log
+TICK_ROLE = "auto"  # auto, master or follower
+TICK_MASTER_LOCK_PATH = ".carla_tick_master.lock"  # Shared with generate_traffic.py to elect one tick master
+
+# Connection Constants
+CARLA_CLIENT_TIMEOUT = 2.0  # Seconds an RPC call waits for the server before it raises
+RECONNECT_ATTEMPTS = 10  # Reconnection attempts after the server stopped answering, 0 ends the game instead
+RECONNECT_BACKOFF = 0.5  # Seconds before the first reconnection attempt, doubled after every failed one
+RECONNECT_MAX_BACKOFF = 8.0  # Longest wait between two reconnection attempts
+
+# Traffic Constants
+TRAFFIC_VEHICLES = 60  # Vehicles spawned by the game client itself, 0 leaves the traffic to generate_traffic.py
+TRAFFIC_WALKERS = 0  # Walkers spawned by the game client itself
+TRAFFIC_HERO_CLEARANCE = 10.0  # No traffic vehicle is spawned closer than this to the hero, in meters
+TRAFFIC_DISTANCE_TO_LEADING_VEHICLE = 2.5  # Meters the traffic manager keeps between two vehicles
+TRAFFIC_SPEED_DIFFERENCE = 30.0  # Percentage the traffic drives below the speed limit
+TRAFFIC_RADIUS = 250.0  # Keep the traffic vehicles within this radius of the hero in meters, 0 spreads them over the map
+TRAFFIC_BEHIND_DISTANCE = 60.0  # Traffic vehicles further behind the hero than this are despawned, in meters
+TRAFFIC_MIN_SPAWN_DISTANCE = 50.0  # New traffic vehicles appear at least this far ahead of the hero, in meters
+TRAFFIC_SPAWN_BATCH = 10  # Most traffic vehicles spawned in one density update
+TRAFFIC_UPDATE_INTERVAL = 1.0  # Simulation seconds between two density updates
+TRAFFIC_HYBRID_RADIUS = 70.0  # Traffic manager hybrid physics radius around the hero, in meters
+
+# Recorder Constants
+RECORDER_DIR = "session_logs/recordings"  # Carla recordings of the study sessions and their indexes
+
+# Map Constants
+MAP_CACHE_DIR = "cache/no_rendering_mode"  # Rendered map images and lane graphs, keyed by the OpenDRIVE hash
+LANE_GRAPH_RESOLUTION = 2.0  # Meters between two samples of a lane in the lane graph
+MAP_MATCHER_CELL_SIZE = 10.0  # Grid cell size of the map matcher in meters, a match looks at the 3x3 cells around it
+MAP_MATCHER_LOOKAHEAD = 5  # Lane samples ahead of the last match tried before the grid is searched
+MAP_MATCHER_HEADING_WEIGHT = 2.0  # Meters added to the distance of a lane that runs against the heading
+
+# Quality Constants
+QUALITY_MODE = "auto"  # auto, or a fixed level: high, medium or low
+QUALITY_EMA_FACTOR = 0.1  # Weight of the last frame in the smoothed render cost
+QUALITY_DOWNGRADE_RATIO = 0.9  # Step the quality down above this share of the frame budget
+QUALITY_UPGRADE_RATIO = 0.5  # Step the quality up below this share of the frame budget
+QUALITY_HOLD_FRAMES = 60  # Rendered frames a quality level is kept before it may change again
+
+# Garbage Collector Constants
+GC_MODE = "default"  # default or deferred
+GC_FULL_THRESHOLD = 1000  # Generation 1 collections before an automatic full collection in deferred mode
+GC_IDLE_INTERVAL = 5.0  # Minimum seconds between two full collections in PAUSED or MANUAL_DRIVING
+
+# Profiling Constants
+RPC_PROFILE_TOP_N = 20  # Rows of the RPC profile report
+
 # Game Constants
 AVATAR_DISTANCE_FROM_HERO = 12.5 # Distance from hero to avatar in meters
 AVATAR_INVULNERABLE_TIME = 3  # Time in seconds for avatar invulnerability
@@ -46,6 +101,7 @@ COIN_SPACING = 20.0  # Spacing between coins in meters
 COIN_NUMBER = 5  # Number of coins to spawn
 COIN_COLLISION_RADIUS = 2.0  # Radius for coin collision detection in meters
 COIN_REMOVE_THRESHOLD = 30.0  # Distance from avatar to remove coin in meters
+VEHICLE_GRID_CELL_SIZE = max(COIN_COLLISION_RADIUS, AVATAR_COLLISION_RADIUS)  # Collision queries only visit 3x3 cells
 TAKE_OVER_COUNTDOWN = 3
 STARTING_COUNTDOWN = 3  # Starting countdown before the game begins
 TARGET_TRAFFIC_LIGHT_ID = 145
@@ -12,21 +12,30 @@ from src.core.constants import (
 from src.core.avatar_direction import AvatarDirection
 from src.data.sounds import Sounds
 from src.data.sound_mixer import SoundMixer
+from src.data.game_clock import GameClock
+from src.utils.interpolation import lerp_location, lerp_angle
 
 class Avatar(pygame.sprite.Sprite):
-    def __init__(self, lives=AVATAR_TOTAL_LIVES):
+    def __init__(self, lane_graph, lives=AVATAR_TOTAL_LIVES):
         super().__init__()
 
+        # Lane neighbours and the point ahead of the hero are looked up in the lane graph of the map
+        self.lane_graph = lane_graph
+
         self.lives = lives
         self.current_life = lives
 
         self.invulnerable = True
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = GameClock.instance().get_ticks()
 
         self.current_wp = None
         self.location = None
         self.last_hero_location = None
 
+        # Waypoint transform before the last move, to interpolate the drawing between two ticks
+        self.previous_location = None
+        self.previous_yaw = None
+
         self.relative_lane_offset = 0
 
         self.absolute_lane_id = None
@@ -40,31 +49,35 @@ class Avatar(pygame.sprite.Sprite):
         self.blocked_flash_start = 0
         self.blocked_duration = AVATAR_BLOCKED_DURATION
 
+    def _avatar_point(self, hero_wp):
+        """
+        Lane point of the avatar: the hero's lane point moved by the relative lane offset,
+        as far as there are driving lanes, and then AVATAR_DISTANCE_FROM_HERO meters ahead.
+        Returns None if the hero is not on a lane of the graph.
+        """
+        hero_point = self.lane_graph.point_at(hero_wp)
+        if hero_point is None:
+            return None
+        avatar_point = self.lane_graph.lateral(hero_point, self.relative_lane_offset)
+        return self.lane_graph.advance(avatar_point, AVATAR_DISTANCE_FROM_HERO)
+
     def start(self, hero_wp):
-        avatar_wp = hero_wp
-        offset = self.relative_lane_offset
-        for _ in range(abs(offset)):
-            if offset > 0:
-                right = avatar_wp.get_right_lane()
-                if right and right.lane_type.name.lower() == avatar_wp.lane_type.name.lower():
-                    avatar_wp = right
-            elif offset < 0:
-                left = avatar_wp.get_left_lane()
-                if left and left.lane_type.name.lower() == avatar_wp.lane_type.name.lower():
-                    avatar_wp = left
-
-        # Move forward by AVATAR_DISTANCE_FROM_HERO meters
-        avatar_wp = avatar_wp.next(AVATAR_DISTANCE_FROM_HERO)[0] if avatar_wp.next(AVATAR_DISTANCE_FROM_HERO) else avatar_wp
+        avatar_wp = self._avatar_point(hero_wp)
+        if avatar_wp is None:
+            logging.warning("Hero waypoint is not on a lane of the lane graph.")
+            return
 
         self.current_wp = avatar_wp
         self.location = avatar_wp.transform.location
+        self.previous_location = None
+        self.previous_yaw = None
         self.last_hero_location = hero_wp.transform.location
         self.absolute_lane_id = avatar_wp.lane_id
         self.invulnerable = True
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = GameClock.instance().get_ticks()
 
     def update(self, hero_wp=None):
-        now = pygame.time.get_ticks()
+        now = GameClock.instance().get_ticks()
 
         # Keep avatar at the correct lane offset from hero
         if hero_wp is not None:
@@ -93,16 +106,22 @@ class Avatar(pygame.sprite.Sprite):
                 if self.image.get_alpha() != 255:
                     self.image.set_alpha(255)
 
-    def draw(self, surface, world_to_pixel):
+    def draw(self, surface, world_to_pixel, alpha=1.0):
         """
         Draw the avatar as a rotated image centered on the map position.
         Only rotate the image if the yaw has changed.
+        An alpha below 1 draws the avatar between its previous and current waypoint.
         """
         if not self.current_wp:
             return
 
         self.location = self.current_wp.transform.location
-        x, y = world_to_pixel(self.location)
+        yaw = self.current_wp.transform.rotation.yaw
+        location = self.location
+        if alpha < 1.0 and self.previous_location is not None:
+            location = lerp_location(self.previous_location, self.location, alpha)
+            yaw = lerp_angle(self.previous_yaw, yaw, alpha)
+        x, y = world_to_pixel(location)
 
         if self.image is None:
             self.image = pygame.image.load(AVATAR_IMAGE_PATH).convert_alpha()
@@ -112,8 +131,6 @@ class Avatar(pygame.sprite.Sprite):
             self._rotated_image = None
             self._rotated_rect = None
 
-        yaw = self.current_wp.transform.rotation.yaw
-
         # Only rotate if yaw changed
         if getattr(self, '_last_yaw', None) != yaw:
             self._rotated_image = pygame.transform.rotate(self.image, -yaw - 90)
@@ -129,20 +146,15 @@ class Avatar(pygame.sprite.Sprite):
             logging.warning("Missing hero waypoint.")
             return
 
-        avatar_wp = hero_wp
-        offset = self.relative_lane_offset
-        for _ in range(abs(offset)):
-            if offset > 0:
-                right = avatar_wp.get_right_lane()
-                if right and right.lane_type.name.lower() == avatar_wp.lane_type.name.lower():
-                    avatar_wp = right
-            elif offset < 0:
-                left = avatar_wp.get_left_lane()
-                if left and left.lane_type.name.lower() == avatar_wp.lane_type.name.lower():
-                    avatar_wp = left
-
-        # Move forward by AVATAR_DISTANCE_FROM_HERO meters
-        avatar_wp = avatar_wp.next(AVATAR_DISTANCE_FROM_HERO)[0] if avatar_wp.next(AVATAR_DISTANCE_FROM_HERO) else avatar_wp
+        avatar_wp = self._avatar_point(hero_wp)
+        if avatar_wp is None:
+            logging.debug("Hero waypoint is not on a lane of the lane graph.")
+            return
+
+        # Several logic steps may run per tick, only a new waypoint moves the interpolation start
+        if self.current_wp is not None and avatar_wp.transform.location != self.current_wp.transform.location:
+            self.previous_location = self.current_wp.transform.location
+            self.previous_yaw = self.current_wp.transform.rotation.yaw
 
         self.current_wp = avatar_wp
         self.location = avatar_wp.transform.location
@@ -173,7 +185,7 @@ class Avatar(pygame.sprite.Sprite):
 
     def feedback_blocked(self):
         self.blocked_flash = True
-        self.blocked_flash_start = pygame.time.get_ticks()
+        self.blocked_flash_start = GameClock.instance().get_ticks()
         SoundMixer.instance().play(Sounds.BLOCKED)
 
     def change_waypoint(self, hero_wp, direction, safety_margin=3.0):
@@ -187,35 +199,25 @@ class Avatar(pygame.sprite.Sprite):
             self.feedback_blocked()
             return
 
-        # Find avatar's current waypoint (may be offset from hero)
-        avatar_wp = hero_wp
+        hero_point = self.lane_graph.point_at(hero_wp)
+        if hero_point is None:
+            logging.warning("Hero waypoint is not on a lane of the lane graph.")
+            self.feedback_blocked()
+            return
+
+        # Find avatar's current lane point (may be offset from hero)
         offset = self.relative_lane_offset
-        logging.debug(f"Attempting lane change: current offset={offset}, absolute_lane_id={self.absolute_lane_id}, hero lane_id={hero_wp.lane_id}")
-
-        # Traverse to avatar's current lane from hero_wp
-        if offset > 0:
-            for _ in range(offset):
-                right = avatar_wp.get_right_lane()
-                if right and right.lane_type.name.lower() == avatar_wp.lane_type.name.lower():
-                    avatar_wp = right
-                else:
-                    logging.debug("Failed to traverse right for offset.")
-                    break
-        elif offset < 0:
-            for _ in range(-offset):
-                left = avatar_wp.get_left_lane()
-                if left and left.lane_type.name.lower() == avatar_wp.lane_type.name.lower():
-                    avatar_wp = left
-                else:
-                    logging.debug("Failed to traverse left for offset.")
-                    break
+        logging.debug(f"Attempting lane change: current offset={offset}, absolute_lane_id={self.absolute_lane_id}, hero lane_id={hero_point.lane_id}")
+
+        # Traverse to avatar's current lane from the hero's lane point
+        avatar_wp = self.lane_graph.lateral(hero_point, offset)
 
         logging.debug(f"Avatar is at lane_id={avatar_wp.lane_id}, lane_type={avatar_wp.lane_type.name}")
 
-        # Check left/right lane existence from avatar's current lane
+        # Check left/right lane existence from avatar's current lane, only driving lanes are in the graph
         if direction == AvatarDirection.LEFT:
-            left_wp = avatar_wp.get_left_lane()
-            if not left_wp or left_wp.lane_type.name.lower() != avatar_wp.lane_type.name.lower():
+            left_wp = self.lane_graph.neighbour(avatar_wp, -1)
+            if not left_wp:
                 logging.debug("Blocked: No more left lanes available.")
                 self.feedback_blocked()
                 return
@@ -225,8 +227,8 @@ class Avatar(pygame.sprite.Sprite):
             return
 
         elif direction == AvatarDirection.RIGHT:
-            right_wp = avatar_wp.get_right_lane()
-            if not right_wp or right_wp.lane_type.name.lower() != avatar_wp.lane_type.name.lower():
+            right_wp = self.lane_graph.neighbour(avatar_wp, 1)
+            if not right_wp:
                 logging.debug("Blocked: No more right lanes available.")
                 self.feedback_blocked()
                 return
@@ -252,7 +254,7 @@ class Avatar(pygame.sprite.Sprite):
 
         self.current_life -= 1
         self.invulnerable = True
-        self.spawn_time = pygame.time.get_ticks()
+        self.spawn_time = GameClock.instance().get_ticks()
         logging.debug(f"Avatar killed! Lives left: {self.current_life}")
 
         if self.current_life == 0:
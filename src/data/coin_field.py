@@ -0,0 +1,118 @@
+import math
+import logging
+import numpy as np
+import pygame
+
+# Local imports
+from src.core.constants import COIN_IMAGE_PATH, COIN_COLLISION_RADIUS, COIN_REMOVE_THRESHOLD
+from src.data.sounds import Sounds
+from src.data.sound_mixer import SoundMixer
+
+
+class CoinField(object):
+    """
+    All coins of the game as NumPy arrays: positions, yaw, visible flags and values. Removing the coins left
+    behind, collecting the ones the avatar reaches and hiding the ones under a vehicle are a few array
+    operations per update instead of carla calls per coin. The waypoint, location and rotated image of a
+    coin are read once when it is added, they never change.
+    """
+
+    def __init__(self, coin_radius=1.0, image_path=COIN_IMAGE_PATH):
+        self.coin_radius = coin_radius  # meters
+        self.image_path = image_path
+        self._image = None
+
+        self.positions = np.zeros((0, 3))
+        self.yaws = np.zeros(0)
+        self.visible = np.zeros(0, dtype=bool)
+        self.values = np.zeros(0, dtype=np.int32)
+
+        # Per coin objects, in the order of the arrays
+        self.waypoints = []
+        self._images = []
+
+    def __len__(self):
+        return len(self.waypoints)
+
+    def clear(self):
+        self._keep(np.zeros(len(self), dtype=bool))
+
+    def add(self, waypoints, value=1):
+        """Adds one coin on each waypoint"""
+        if not waypoints:
+            return
+        if self._image is None:
+            self._image = pygame.image.load(self.image_path).convert_alpha()
+
+        transforms = [wp.transform for wp in waypoints]
+        positions = np.array([(t.location.x, t.location.y, t.location.z) for t in transforms], dtype=np.float64)
+        yaws = np.array([t.rotation.yaw for t in transforms], dtype=np.float64)
+
+        self.positions = np.concatenate((self.positions, positions))
+        self.yaws = np.concatenate((self.yaws, yaws))
+        self.visible = np.concatenate((self.visible, np.ones(len(waypoints), dtype=bool)))
+        self.values = np.concatenate((self.values, np.full(len(waypoints), value, dtype=np.int32)))
+
+        self.waypoints.extend(waypoints)
+        self._images.extend(pygame.transform.rotate(self._image, -t.rotation.yaw - 90.0) for t in transforms)
+
+    def _keep(self, mask):
+        self.positions = self.positions[mask]
+        self.yaws = self.yaws[mask]
+        self.visible = self.visible[mask]
+        self.values = self.values[mask]
+
+        indices = np.flatnonzero(mask)
+        self.waypoints = [self.waypoints[i] for i in indices]
+        self._images = [self._images[i] for i in indices]
+
+    def update(self, avatar_transform, vehicle_grid):
+        """
+        Removes the coins far behind the avatar, collects the ones within reach of the avatar and hides the ones
+        under a vehicle of the grid. Returns the value collected in this update.
+        """
+        if not len(self):
+            return 0
+
+        collected = np.zeros(len(self), dtype=bool)
+        remove = np.zeros(len(self), dtype=bool)
+
+        if avatar_transform is not None:
+            avatar = avatar_transform.location
+            offsets = self.positions - (avatar.x, avatar.y, avatar.z)
+            yaw = math.radians(avatar_transform.rotation.yaw)
+
+            # Behind the avatar: negative along its forward vector and further than the threshold on the ground
+            ahead = offsets[:, 0] * math.cos(yaw) + offsets[:, 1] * math.sin(yaw)
+            ground_distances = np.hypot(offsets[:, 0], offsets[:, 1])
+            remove = (ahead < 0.0) & (ground_distances > COIN_REMOVE_THRESHOLD)
+
+            distances = np.sqrt(ground_distances ** 2 + offsets[:, 2] ** 2)
+            collected = ~remove & (distances < COIN_COLLISION_RADIUS)
+            remove |= collected
+
+        # Only the vehicles in the cells around the coins can hide them
+        nearby = [vehicle_grid.near(x, y, COIN_COLLISION_RADIUS) for x, y in self.positions[:, :2]]
+        vehicles = np.array([point for points in nearby for point in points], dtype=np.float64).reshape(-1, 3)
+        if len(vehicles):
+            gaps = self.positions[:, None, :] - vehicles[None, :, :]
+            occluded = (np.einsum('ijk,ijk->ij', gaps, gaps) < COIN_COLLISION_RADIUS ** 2).any(axis=1)
+            self.visible = ~occluded
+        else:
+            self.visible[:] = True
+
+        value = int(self.values[collected].sum())
+        if value:
+            SoundMixer.instance().play(Sounds.COIN_COLLECTED)
+            logging.debug("%d coin(s) collected by avatar", np.count_nonzero(collected))
+        if remove.any():
+            self._keep(~remove)
+        return value
+
+    def draw(self, surface, world_to_pixel_array, world_to_pixel_width):
+        """Draws the visible coins, their pixel positions are converted in one call"""
+        coin_radius_px = max(3, int(world_to_pixel_width(self.coin_radius)))
+        indices = np.flatnonzero(self.visible)
+        corners = world_to_pixel_array(self.positions[indices]) - coin_radius_px
+        for index, (x, y) in zip(indices, corners.tolist()):
+            surface.blit(self._images[index], (x, y))
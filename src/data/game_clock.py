@@ -0,0 +1,69 @@
+# game_clock.py
+import time
+
+GAME_CLOCK_WALL = "wall"
+GAME_CLOCK_SIMULATION = "simulation"
+GAME_CLOCK_MODES = (GAME_CLOCK_WALL, GAME_CLOCK_SIMULATION)
+
+
+class GameClock():
+    """
+    Single time source of the game timers (countdowns, invulnerability, blocked flashes, stability window).
+    In simulation mode it follows the elapsed seconds of the Carla world ticks, so the timers stay
+    consistent when the world is stepped faster or slower than real time.
+    """
+    _instance = None
+
+    def __init__(self):
+        if GameClock._instance is not None:
+            raise Exception("Use GameClock.instance()")
+        self.mode = GAME_CLOCK_WALL
+        self._wall_start = time.perf_counter()
+        self._simulation_start = None
+        self._simulation_seconds = None
+        self._last_tick = None
+        self._frame_time = 0.0
+        GameClock._instance = self
+
+    @staticmethod
+    def instance():
+        if GameClock._instance is None:
+            GameClock()
+        return GameClock._instance
+
+    def set_mode(self, mode):
+        if mode not in GAME_CLOCK_MODES:
+            raise ValueError("Unknown game clock mode: {}".format(mode))
+        self.mode = mode
+        self._last_tick = None
+
+    def on_world_tick(self, elapsed_seconds):
+        """Receives the elapsed seconds of the world timestamp of every server tick"""
+        if self._simulation_start is None:
+            # Until the first tick the game time was the wall time, continue from it so it never goes back
+            self._simulation_start = elapsed_seconds - (time.perf_counter() - self._wall_start)
+        elif elapsed_seconds < self._simulation_seconds:
+            # The server was restarted, continue the game time from where it stopped
+            self._simulation_start = elapsed_seconds - (self._simulation_seconds - self._simulation_start)
+        self._simulation_seconds = elapsed_seconds
+
+    def seconds(self):
+        """Seconds since the clock started"""
+        if self.mode == GAME_CLOCK_SIMULATION and self._simulation_seconds is not None:
+            return self._simulation_seconds - self._simulation_start
+        return time.perf_counter() - self._wall_start
+
+    def get_ticks(self):
+        """Milliseconds since the clock started, same unit as pygame.time.get_ticks()"""
+        return int(self.seconds() * 1000)
+
+    def tick(self):
+        """Called once per loop iteration, measures the game time between two frames"""
+        now = self.seconds()
+        if self._last_tick is not None:
+            self._frame_time = now - self._last_tick
+        self._last_tick = now
+
+    def get_time(self):
+        """Milliseconds of game time between the last two frames, same as pygame.time.Clock.get_time()"""
+        return int(self._frame_time * 1000)
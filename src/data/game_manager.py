@@ -6,7 +6,7 @@ import math
 
 # Local imports
 from src.core.colors import COLOR_AQUAMARINE, COLOR_DUKEBLUE
-from src.data.coin import Coin
+from src.data.coin_field import CoinField
 from src.data.game_state import GameState
 from src.data.avatar import Avatar
 from src.data.sounds import Sounds
@@ -15,8 +15,6 @@ from src.core.constants import (
     BUTTON_BACKGROUND_PATH,
     COIN_SPACING, 
     COIN_NUMBER, 
-    COIN_COLLISION_RADIUS, 
-    COIN_REMOVE_THRESHOLD,
     COIN_COUNTER_ICON_PATH,
     CORNER_BOTTOM_RIGHT_PATH,
     CORNER_TOP_LEFT_PATH,
@@ -44,8 +42,11 @@ class GameManager:
         # Avatar
         self.avatar = None
 
+        # Lane graph of the map, the avatar and the coins move along its lanes
+        self.lane_graph = None
+
         # Coins
-        self.coins = {}
+        self.coins = CoinField()
         self.last_coin_wp = None  # Last coin waypoint for spawning new coins
 
         # Takeover request
@@ -66,7 +67,7 @@ class GameManager:
         self._img_heart_filled = None
         self._img_heart_empty = None
 
-    def start(self, hero_wp):
+    def start(self, hero_wp, lane_graph):
         # Load images if not already loaded
         if self._img_border_topleft is None:
             self._img_border_topleft = pygame.image.load(CORNER_TOP_LEFT_PATH).convert_alpha()
@@ -85,14 +86,15 @@ class GameManager:
         if self._img_heart_empty is None:
             self._img_heart_empty = pygame.image.load(HEART_EMPTY_PATH).convert_alpha()
 
-        self.avatar = Avatar()
+        self.lane_graph = lane_graph
+        self.avatar = Avatar(self.lane_graph)
         self.avatar.start(hero_wp)
         self.spawn_coins(hero_wp)
 
-    def update(self, vehicles):
+    def update(self, vehicle_grid):
         self.check_spawn_need()
-        self.check_avatar_vehicle_collisions(vehicles)
-        self.check_coin_collisions(vehicles)
+        self.check_avatar_vehicle_collisions(vehicle_grid)
+        self.check_coin_collisions(vehicle_grid)
 
     def start_game(self):
         if self.game_state != GameState.MANUAL_DRIVING and self.game_state != GameState.GAME_OVER and self.game_state != GameState.PAUSED and self.game_state != GameState.END_GAME:
@@ -134,7 +136,7 @@ class GameManager:
         """
         self.game_state = GameState.STARTING
         self.player_score = 0
-        self.avatar = Avatar()
+        self.avatar = Avatar(self.lane_graph)
         self.avatar.start(hero_wp)
         self.spawn_coins(hero_wp)
         self.has_game_started = True
@@ -224,27 +226,28 @@ class GameManager:
         return self.game_state
     
     def spawn_coins(self, hero_wp, num_coins=COIN_NUMBER, spacing=COIN_SPACING):
-        # Find all drivable lane_ids and their waypoints at the hero's location
+        hero_point = self.lane_graph.point_at(hero_wp)
+        if hero_point is None:
+            logging.warning("Cannot spawn coins, the waypoint is not on a lane of the lane graph.")
+            return
+
+        # Find all drivable lane_ids and their lane points at the hero's location, the graph only has driving lanes
         lane_wps = {}
         for offset in [-2, -1, 0, 1, 2]:  # Adjust range as needed for your map
-            try:
-                wp = hero_wp
-                for _ in range(abs(offset)):
-                    wp = wp.get_left_lane() if offset < 0 else wp.get_right_lane()
-                if wp and wp.lane_type == carla.LaneType.Driving:
-                    lane_wps[wp.lane_id] = wp
-            except Exception:
-                continue
-    
-        if not lane_wps:
-            lane_wps = {hero_wp.lane_id: hero_wp}  # fallback
+            wp = hero_point
+            for _ in range(abs(offset)):
+                wp = self.lane_graph.neighbour(wp, offset)
+                if wp is None:
+                    break
+            if wp is not None:
+                lane_wps[wp.lane_id] = wp
     
         lane_ids = list(lane_wps.keys())
         base_wps = list(lane_wps.values())
     
-        # Start from the hero's waypoint and move forward by spacing each time
-        wp = hero_wp
+        # Start from the hero's lane point and move forward by spacing each time
         placed = 0
+        coin_wps = []
         while placed < num_coins:
             # At each row, randomly pick a lane
             lane_idx = random.randint(0, len(lane_ids) - 1)
@@ -252,15 +255,14 @@ class GameManager:
             # For this row, get the waypoint for the chosen lane
             row_wps = []
             for base_wp in base_wps:
-                next_wps = base_wp.next(spacing * (placed + 1))
+                next_wps = self.lane_graph.advance_all(base_wp, spacing * (placed + 1))
                 for candidate_wp in next_wps:
-                    if candidate_wp.lane_id == lane_id and candidate_wp.lane_type == carla.LaneType.Driving:
+                    if candidate_wp.lane_id == lane_id:
                         row_wps.append(candidate_wp)
                         break
             if row_wps:
                 coin_wp = row_wps[0]
-                coin = Coin(coin_wp)
-                self.coins[coin.id] = coin
+                coin_wps.append(coin_wp)
                 placed += 1
 
                 self.last_coin_wp = coin_wp
@@ -268,6 +270,7 @@ class GameManager:
                 # If no waypoint found, break to avoid infinite loop
                 break
 
+        self.coins.add(coin_wps)
         logging.debug("Coins spawned. Total coins: %s", len(self.coins))
 
     def check_spawn_need(self):
@@ -332,73 +335,30 @@ class GameManager:
         # No suitable path found
         return None
     
-    def draw_coins(self, surface, world_to_pixel, world_to_pixel_width):
+    def draw_coins(self, surface, world_to_pixel_array, world_to_pixel_width):
         """
         Draw all visible coins on the given surface.
         """
-        for coin in self.coins.values():
-            coin.draw(surface, world_to_pixel, world_to_pixel_width)
+        self.coins.draw(surface, world_to_pixel_array, world_to_pixel_width)
 
-    def check_coin_collisions(self, vehicles):
+    def check_coin_collisions(self, vehicle_grid):
         """
-        Check for collisions between coins and avatar or vehicles.
+        Check for collisions between coins and avatar or vehicles, given the SpatialGrid of the vehicles of the last tick.
         If avatar collides with a coin, collect and remove it.
         If a vehicle collides with a coin, hide it.
         If not colliding, show it again.
         Also remove coins that are far behind the avatar.
         """
-        avatar_location = self.avatar.current_wp.transform.location if self.avatar and self.avatar.current_wp else None
-        coins_to_remove = []
-
-        for coin in list(self.coins.values()):
-            coin_location = coin.wp.transform.location
-
-            # Remove coins that are left behind and not collected
-            if avatar_location:
-                # Vector from avatar to coin
-                dx = coin_location.x - avatar_location.x
-                dy = coin_location.y - avatar_location.y
-
-                # Avatar's forward vector (assuming CARLA uses yaw in degrees)
-                yaw = self.avatar.current_wp.transform.rotation.yaw
-                forward_x = math.cos(math.radians(yaw))
-                forward_y = math.sin(math.radians(yaw))
-
-                # Dot product: negative means behind
-                dot = dx * forward_x + dy * forward_y
-
-                distance = math.sqrt(dx**2 + dy**2)
-                if dot < 0 and distance > COIN_REMOVE_THRESHOLD:
-                    coins_to_remove.append(coin.id)
-                    continue
-
-            # Check collision with avatar
-            if avatar_location and coin_location.distance(avatar_location) < COIN_COLLISION_RADIUS:
-                coin.collect()
-                coins_to_remove.append(coin.id)
-                self.player_score += 1
-                logging.debug(f"Coin collected by avatar at {coin_location}")
-                logging.debug(f"Player score: {self.player_score}")
-                continue
-
-            # Check collision with vehicles
-            hidden = False
-            for vehicle in vehicles:
-                vehicle_location = vehicle.get_location()
-                if coin_location.distance(vehicle_location) < COIN_COLLISION_RADIUS:
-                    coin.hide()
-                    hidden = True
-                    break
-            if not hidden:
-                coin.show()
+        avatar_transform = self.avatar.current_wp.transform if self.avatar and self.avatar.current_wp else None
 
-        # Remove collected or obsolete coins
-        for coin_id in coins_to_remove:
-            del self.coins[coin_id]
+        collected = self.coins.update(avatar_transform, vehicle_grid)
+        if collected:
+            self.player_score += collected
+            logging.debug(f"Player score: {self.player_score}")
     
-    def check_avatar_vehicle_collisions(self, vehicles):
+    def check_avatar_vehicle_collisions(self, vehicle_grid):
         """
-        Check for collisions between the avatar and vehicles.
+        Check for collisions between the avatar and vehicles, given the SpatialGrid of the vehicles of the last tick.
         If a collision occurs, handle avatar death and game over.
         """
         if not self.avatar or not self.avatar.current_wp:
@@ -406,15 +366,12 @@ class GameManager:
 
         avatar_location = self.avatar.current_wp.transform.location
 
-        for vehicle in vehicles:
-            vehicle_location = vehicle.get_location()
-            if avatar_location.distance(vehicle_location) < AVATAR_COLLISION_RADIUS:
-                killed = self.avatar.kill()
-                if killed:
-                    self.game_state = GameState.GAME_OVER
-                    SoundMixer.instance().play(Sounds.GAME_OVER)
-                    logging.debug("Game over: Avatar collided with vehicle.")
-                break
+        if vehicle_grid.any_within(avatar_location, AVATAR_COLLISION_RADIUS):
+            killed = self.avatar.kill()
+            if killed:
+                self.game_state = GameState.GAME_OVER
+                SoundMixer.instance().play(Sounds.GAME_OVER)
+                logging.debug("Game over: Avatar collided with vehicle.")
 
     def draw_coin_counter(self, surface):
         # Use cached images
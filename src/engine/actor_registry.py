@@ -0,0 +1,81 @@
+import logging
+
+# Local imports
+from src.core.actor_kind import ActorKind
+
+# Actors that never move, they carry a trigger volume
+STATIC_KINDS = (ActorKind.TRAFFIC_LIGHT, ActorKind.SPEED_LIMIT, ActorKind.TRAFFIC_SIGN)
+
+
+class RegisteredActor(object):
+    """An actor with its kind and the attributes that never change during its lifetime"""
+
+    def __init__(self, actor, rolename):
+        self.actor = actor
+        self.id = actor.id
+        self.type_id = actor.type_id
+        self.kind = ActorKind.classify(actor.type_id)
+
+        attributes = actor.attributes
+        self.role_name = attributes.get('role_name', '')
+        self.is_hero = self.kind == ActorKind.VEHICLE and self.role_name == rolename
+        self.number_of_wheels = int(attributes.get('number_of_wheels', 0) or 0)
+        self.extent = actor.bounding_box.extent
+        self.trigger_volume = actor.trigger_volume if self.kind in STATIC_KINDS else None
+
+
+class ActorRegistry(object):
+    """Actors of the world keyed by id. Each actor is classified and its static attributes are read once,
+    when it first appears in a snapshot; afterwards only appearing and disappearing ids are processed."""
+
+    def __init__(self, rolename):
+        self.rolename = rolename
+        self.entries = {}
+        self._by_kind = {kind: [] for kind in ActorKind}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, actor_id):
+        return actor_id in self.entries
+
+    def get(self, actor_id):
+        return self.entries.get(actor_id)
+
+    def of_kind(self, kind):
+        """Registered actors of one kind, in the order they appeared"""
+        return self._by_kind[kind]
+
+    def ids_of(self, kind):
+        return [entry.id for entry in self._by_kind[kind]]
+
+    def update(self, carla_world, actor_ids):
+        """Synchronises the registry with the ids of a snapshot. Only actors that appeared since the last
+        update are fetched from the server. Returns the set of kinds that had actors appear or disappear,
+        empty if nothing changed."""
+        actor_ids = set(actor_ids)
+        known_ids = set(self.entries)
+        added = actor_ids - known_ids
+        removed = known_ids - actor_ids
+        changed_kinds = set()
+
+        for actor_id in removed:
+            entry = self.entries.pop(actor_id)
+            self._by_kind[entry.kind].remove(entry)
+            changed_kinds.add(entry.kind)
+
+        if added:
+            for actor in carla_world.get_actors(list(added)):
+                try:
+                    entry = RegisteredActor(actor, self.rolename)
+                except RuntimeError as e:
+                    # Destroyed between the snapshot and the query, it leaves with the next snapshot
+                    logging.debug("Could not register actor %d: %s", actor.id, e)
+                    continue
+                self.entries[entry.id] = entry
+                self._by_kind[entry.kind].append(entry)
+                changed_kinds.add(entry.kind)
+
+        if added or removed:
+            logging.debug("Actor registry: %d added, %d removed, %d actors", len(added), len(removed), len(self.entries))
+        return changed_kinds
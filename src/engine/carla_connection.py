@@ -0,0 +1,75 @@
+import time
+import logging
+import carla
+
+
+class CarlaConnection(object):
+    """Owns the carla client of the game. When an RPC call times out or the connection drops, a new client
+    is created with an exponential backoff until the server answers again, so a single stall of the server
+    does not end the session."""
+
+    # Messages of the RuntimeErrors raised by the carla client when the server does not answer
+    CONNECTION_ERRORS = ("time-out", "timeout", "timed out", "connection", "connect to")
+
+    def __init__(self, host, port, timeout, attempts, backoff, max_backoff):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.attempts = attempts  # Reconnection attempts before giving up, 0 disables reconnecting
+        self.backoff = backoff  # Seconds before the first attempt, doubled after every failed one
+        self.max_backoff = max_backoff
+        self.client = None
+        self.reconnects = 0
+
+    def connect(self):
+        """Creates the client and checks that the server answers"""
+        client = carla.Client(self.host, self.port)
+        client.set_timeout(self.timeout)
+        logging.debug("Carla server %s:%d, version %s", self.host, self.port, client.get_server_version())
+        self.client = client
+        return client
+
+    @classmethod
+    def is_connection_error(cls, error):
+        """True if the error means that the server did not answer, rather than a bad call"""
+        if not isinstance(error, RuntimeError):
+            return False
+        message = str(error).lower()
+        return any(token in message for token in cls.CONNECTION_ERRORS)
+
+    def reconnect(self, waiting=None, resume=None):
+        """
+        Connects again with an exponential backoff. While it waits, the waiting callback is called about
+        every 100 ms with the attempt number, e.g. to keep the window responsive. The resume callback is
+        called with the new client to restore the game on it, a server that stalls again meanwhile counts
+        as a failed attempt. Returns the result of resume, or the new client without it, and raises the
+        last error once every attempt failed.
+        """
+        delay = self.backoff
+        last_error = None
+        for attempt in range(1, self.attempts + 1):
+            logging.warning("Reconnecting to the Carla server in %.1f s (attempt %d of %d)", delay, attempt, self.attempts)
+            deadline = time.perf_counter() + delay
+            while True:
+                if waiting is not None:
+                    waiting(attempt)
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0.0:
+                    break
+                time.sleep(min(remaining, 0.1))
+            try:
+                client = self.connect()
+                result = resume(client) if resume is not None else client
+            except RuntimeError as e:
+                if not self.is_connection_error(e):
+                    raise
+                last_error = e
+                logging.debug("Reconnection attempt %d failed: %s", attempt, e)
+                delay = min(delay * 2.0, self.max_backoff)
+                continue
+
+            self.reconnects += 1
+            logging.info("Reconnected to the Carla server after %d attempt(s).", attempt)
+            return result
+
+        raise last_error if last_error is not None else RuntimeError("Reconnecting to the Carla server is disabled")
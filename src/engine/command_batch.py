@@ -0,0 +1,68 @@
+import logging
+import carla
+
+
+class CommandBatch(object):
+    """Collects world mutations as carla.command objects and sends them in a single apply_batch_sync
+    round trip. Can be used as a context manager, the batch is applied when the block ends."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+        self._destroyed = set()
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.apply()
+        return False
+
+    def destroy(self, actor):
+        """Destroys an actor or an actor id, each actor only once per batch"""
+        actor_id = actor if isinstance(actor, int) else actor.id
+        if actor_id in self._destroyed:
+            return
+        self._destroyed.add(actor_id)
+        self.commands.append(carla.command.DestroyActor(actor_id))
+
+    def destroy_sensor(self, sensor):
+        """Stops the sensor stream on the client side and destroys the sensor"""
+        if sensor.is_listening:
+            sensor.stop()
+        self.destroy(sensor)
+
+    def spawn(self, blueprint, transform, parent=None, autopilot_port=None):
+        """Spawns an actor, optionally attached to a parent or handed to the traffic manager on the given port.
+        The response at the same position of apply() holds the id of the new actor."""
+        if parent is not None:
+            parent_id = parent if isinstance(parent, int) else parent.id
+            command = carla.command.SpawnActor(blueprint, transform, parent_id)
+        else:
+            command = carla.command.SpawnActor(blueprint, transform)
+        if autopilot_port is not None:
+            command = command.then(carla.command.SetAutopilot(carla.command.FutureActor, True, autopilot_port))
+        self.commands.append(command)
+
+    def apply_transform(self, actor, transform):
+        actor_id = actor if isinstance(actor, int) else actor.id
+        self.commands.append(carla.command.ApplyTransform(actor_id, transform))
+
+    def apply(self, do_tick=False):
+        """Sends all the commands in one round trip and returns the responses. Failed commands are logged."""
+        if not self.commands:
+            return []
+
+        responses = self.client.apply_batch_sync(self.commands, do_tick)
+        for command, response in zip(self.commands, responses):
+            if response.error:
+                logging.debug("Batch command %s failed: %s", type(command).__name__, response.error)
+        logging.debug("Applied a batch of %d commands.", len(self.commands))
+
+        self.commands = []
+        self._destroyed = set()
+        return responses
@@ -0,0 +1,112 @@
+import time
+import math
+import logging
+import collections
+
+FRAME_LIMITER_BUSY = "busy"
+FRAME_LIMITER_SLEEP = "sleep"
+FRAME_LIMITER_HYBRID = "hybrid"
+FRAME_LIMITER_SERVER = "server"
+FRAME_LIMITER_MODES = (FRAME_LIMITER_BUSY, FRAME_LIMITER_SLEEP, FRAME_LIMITER_HYBRID, FRAME_LIMITER_SERVER)
+
+
+class FrameLimiter:
+    """Paces the main loop to a target rate and measures the jitter of the resulting frame intervals.
+
+    Modes:
+        busy   : spins for the whole interval (same cost as pygame's tick_busy_loop)
+        sleep  : sleeps for the whole interval, cheapest but subject to the OS timer granularity
+        hybrid : sleeps most of the interval and only spins the last few milliseconds
+        server : no local pacing, the loop runs at the pace of the synchronous world.tick()
+    """
+
+    def __init__(self, mode, fps, spin_ms, report_interval, window=600):
+        if mode not in FRAME_LIMITER_MODES:
+            raise ValueError("Unknown frame limiter mode: {}".format(mode))
+
+        self.mode = mode
+        self.interval = 1.0 / fps
+        self._spin = spin_ms / 1000.0
+        self._report_interval = report_interval
+
+        self._deadline = None
+        self._last_frame = None
+        self._last_report = None
+        self._frame_time = 0.0
+
+        # Signed difference between the measured frame interval and the target one
+        self._errors = collections.deque(maxlen=window)
+
+    @property
+    def paced_by_server(self):
+        return self.mode == FRAME_LIMITER_SERVER
+
+    def wait(self):
+        """Blocks until the next frame is due. Returns the milliseconds elapsed since the previous frame."""
+        now = time.perf_counter()
+        if self._deadline is None:
+            self._deadline = now
+        self._deadline += self.interval
+
+        if self.mode == FRAME_LIMITER_BUSY:
+            self._spin_until(self._deadline)
+        elif self.mode == FRAME_LIMITER_SLEEP:
+            self._sleep_until(self._deadline)
+        elif self.mode == FRAME_LIMITER_HYBRID:
+            self._sleep_until(self._deadline - self._spin)
+            self._spin_until(self._deadline)
+
+        now = time.perf_counter()
+
+        # If the loop fell behind, do not try to catch up with a burst of frames
+        if self.paced_by_server or now - self._deadline > self.interval:
+            self._deadline = now
+
+        if self._last_frame is not None:
+            self._frame_time = now - self._last_frame
+            self._errors.append(self._frame_time - self.interval)
+        self._last_frame = now
+
+        if self._last_report is None:
+            self._last_report = now
+        elif now - self._last_report >= self._report_interval:
+            self._last_report = now
+            self.log_jitter(logging.DEBUG)
+
+        return self._frame_time * 1000.0
+
+    def get_time(self):
+        """Milliseconds elapsed between the last two frames, same as pygame.time.Clock.get_time()"""
+        return int(self._frame_time * 1000.0)
+
+    @staticmethod
+    def _sleep_until(deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    @staticmethod
+    def _spin_until(deadline):
+        while time.perf_counter() < deadline:
+            pass
+
+    def jitter_stats(self):
+        """Returns (mean frame time, jitter standard deviation, p99 absolute jitter, max absolute jitter) in ms"""
+        if not self._errors:
+            return 0.0, 0.0, 0.0, 0.0
+
+        errors = list(self._errors)
+        mean_error = sum(errors) / len(errors)
+        std = math.sqrt(sum((e - mean_error) ** 2 for e in errors) / len(errors))
+        absolute = sorted(abs(e) for e in errors)
+        p99 = absolute[min(len(absolute) - 1, int(len(absolute) * 0.99))]
+
+        return (self.interval + mean_error) * 1000.0, std * 1000.0, p99 * 1000.0, absolute[-1] * 1000.0
+
+    def log_jitter(self, level=logging.INFO):
+        mean, std, p99, worst = self.jitter_stats()
+        logging.log(
+            level,
+            "Frame limiter (%s): target %.2f ms, mean %.2f ms, jitter std %.3f ms, p99 %.3f ms, max %.3f ms",
+            self.mode, self.interval * 1000.0, mean, std, p99, worst
+        )
@@ -0,0 +1,103 @@
+import time
+import logging
+from contextlib import contextmanager
+
+
+class RateChannel:
+    """Fixed-rate channel of the main loop. Accumulates the elapsed wall time and reports how many
+    steps of its own interval are due, measuring the cost of each run against its budget."""
+
+    def __init__(self, name, fps, max_steps=1, slack=0.1):
+        self.name = name
+        self.fps = float(fps)
+        self.interval = 1.0 / self.fps  # Fixed delta time of one step, also the time budget of a run
+        self.max_steps = max_steps
+        self._slack = slack * self.interval  # Absorbs the jitter of the loop pacing
+
+        # Start with one interval due so the first loop iteration runs every channel
+        self.accumulator = self.interval
+
+        self.delta_time = 0.0  # Measured seconds between the last two runs
+        self.last_cost = 0.0  # Seconds spent in the last run
+        self.runs = 0
+        self.over_budget = 0
+        self.dropped_steps = 0
+        self._last_run = None
+
+    @property
+    def alpha(self):
+        """Fraction of the current interval that has already elapsed"""
+        return min(1.0, max(0.0, self.accumulator / self.interval))
+
+    def accumulate(self, elapsed):
+        self.accumulator += elapsed
+
+    def consume(self):
+        """Returns the number of steps that are due and removes them from the accumulator"""
+        steps = int((self.accumulator + self._slack) / self.interval)
+        if steps > self.max_steps:
+            # Too far behind, drop the backlog instead of spiralling
+            self.dropped_steps += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = self.accumulator % self.interval
+        else:
+            self.accumulator -= steps * self.interval
+        return steps
+
+    @contextmanager
+    def timed(self):
+        """Measures the delta time and cost of one run of this channel"""
+        start = time.perf_counter()
+        if self._last_run is not None:
+            self.delta_time = start - self._last_run
+        self._last_run = start
+        try:
+            yield self
+        finally:
+            self.last_cost = time.perf_counter() - start
+            self.runs += 1
+            if self.last_cost > self.interval:
+                self.over_budget += 1
+
+
+class FrameScheduler:
+    """Decouples the simulation step, the game logic and the rendering of the main loop, each one running
+    at its own fixed rate regardless of the current game state"""
+
+    def __init__(self, simulation_fps, logic_fps, render_fps, max_catch_up_steps):
+        # A synchronous server step blocks, so never queue more than one per loop iteration
+        self.simulation = RateChannel("simulation", simulation_fps, max_steps=1)
+        self.logic = RateChannel("logic", logic_fps, max_steps=max_catch_up_steps)
+        self.render = RateChannel("render", render_fps, max_steps=1)
+        self.channels = (self.simulation, self.logic, self.render)
+
+        # The loop has to wake up often enough to serve the fastest channel
+        self.loop_fps = max(channel.fps for channel in self.channels)
+        self._last_time = None
+        self._last_game_time = None
+
+    def advance(self, now=None, game_now=None):
+        """Feeds the wall time elapsed since the previous call into every channel. If the game time is
+        given, the game logic channel follows it instead, so fixed logic steps match the game clock."""
+        now = time.perf_counter() if now is None else now
+        if self._last_time is not None:
+            elapsed = now - self._last_time
+            self.simulation.accumulate(elapsed)
+            self.render.accumulate(elapsed)
+            if game_now is None:
+                self.logic.accumulate(elapsed)
+        self._last_time = now
+
+        if game_now is not None:
+            if self._last_game_time is not None:
+                self.logic.accumulate(max(0.0, game_now - self._last_game_time))
+            self._last_game_time = game_now
+
+    def log_summary(self):
+        """Logs the budget statistics of every channel"""
+        for channel in self.channels:
+            logging.info(
+                "Scheduler %s: %.1f Hz, %d runs, last cost %.2f ms (budget %.2f ms), %d over budget, %d dropped steps",
+                channel.name, channel.fps, channel.runs, channel.last_cost * 1000.0,
+                channel.interval * 1000.0, channel.over_budget, channel.dropped_steps
+            )
@@ -1,7 +1,6 @@
 import pygame
-import hashlib
+import numpy as np
 import os
-import glob
 import carla
 
 # Local imports
@@ -29,7 +28,8 @@ from src.core.colors import (
     COLOR_SIDEWALK_TRANSPARENT,
     COLOR_ROAD_TRANSPARENT,
 )
-from src.core.constants import PIXELS_PER_METER
+from src.core.constants import PIXELS_PER_METER, MAP_CACHE_DIR
+from src.engine.map_cache import opendrive_hash, cache_path, remove_stale
 from src.utils.util import Util
 
 
@@ -68,18 +68,12 @@ class GameMapImage:
 
         self.big_map_surface = pygame.Surface((width_in_pixels, width_in_pixels)).convert()
 
-        # Load OpenDrive content
-        opendrive_content = carla_map.to_opendrive()
-
-        # Get hash based on content
-        hash_func = hashlib.sha1()
-        hash_func.update(opendrive_content.encode("UTF-8"))
-        opendrive_hash = str(hash_func.hexdigest())
+        # Get hash based on the OpenDrive content, the lane graph is cached under the same hash
+        self.opendrive_hash = opendrive_hash(carla_map)
 
         # Build path for saving or loading the cached rendered map
-        filename = carla_map.name.split('/')[-1] + "_" + opendrive_hash + ".tga"
-        dirname = os.path.join("cache", "no_rendering_mode")
-        full_path = str(os.path.join(dirname, filename))
+        dirname = MAP_CACHE_DIR
+        full_path = cache_path(carla_map, self.opendrive_hash, ".tga")
 
         if os.path.isfile(full_path):
             # Load Image
@@ -91,23 +85,22 @@ class GameMapImage:
                 carla_world,
                 carla_map,
                 self.world_to_pixel,
-                self.world_to_pixel_width)
+                self.world_to_pixel_width,
+                self.world_to_pixel_array)
 
             # If folders path does not exist, create it
             if not os.path.exists(dirname):
                 os.makedirs(dirname)
 
             # Remove files if selected town had a previous version saved
-            list_filenames = glob.glob(os.path.join(dirname, carla_map.name) + "*")
-            for town_filename in list_filenames:
-                os.remove(town_filename)
+            remove_stale(carla_map, ".tga")
 
             # Save rendered map for next executions of same map
             pygame.image.save(self.big_map_surface, full_path)
 
         self.surface = self.big_map_surface
 
-    def draw_road_map(self, map_surface, carla_world, carla_map, world_to_pixel, world_to_pixel_width):
+    def draw_road_map(self, map_surface, carla_world, carla_map, world_to_pixel, world_to_pixel_width, world_to_pixel_array):
         """Draws all the roads, including lane markings, arrows and traffic signs"""
         map_surface.fill(COLOR_BLACK)
         precision = 0.05
@@ -156,12 +149,11 @@ class GameMapImage:
             """For multiple lane marking types (SolidSolid, BrokenSolid, SolidBroken and BrokenBroken), it converts them
              as a combination of Broken and Solid lines"""
             margin = 0.25
-            marking_1 = [world_to_pixel(lateral_shift(w.transform, sign * w.lane_width * 0.5)) for w in waypoints]
+            marking_1 = world_to_pixel_array(lateral_shift_array(waypoints, sign)).tolist()
             if lane_marking_type == carla.LaneMarkingType.Broken or (lane_marking_type == carla.LaneMarkingType.Solid):
                 return [(lane_marking_type, lane_marking_color, marking_1)]
             else:
-                marking_2 = [world_to_pixel(lateral_shift(w.transform,
-                                                          sign * (w.lane_width * 0.5 + margin * 2))) for w in waypoints]
+                marking_2 = world_to_pixel_array(lateral_shift_array(waypoints, sign, margin * 2)).tolist()
                 if lane_marking_type == carla.LaneMarkingType.SolidBroken:
                     return [(carla.LaneMarkingType.Broken, lane_marking_color, marking_1),
                             (carla.LaneMarkingType.Solid, lane_marking_color, marking_2)]
@@ -180,11 +172,7 @@ class GameMapImage:
         def draw_lane(surface, lane, color):
             """Renders a single lane in a surface and with a specified color"""
             for side in lane:
-                lane_left_side = [lateral_shift(w.transform, -w.lane_width * 0.5) for w in side]
-                lane_right_side = [lateral_shift(w.transform, w.lane_width * 0.5) for w in side]
-
-                polygon = lane_left_side + [x for x in reversed(lane_right_side)]
-                polygon = [world_to_pixel(x) for x in polygon]
+                polygon = lane_polygon(side)
 
                 if len(polygon) > 2:
                     pygame.draw.polygon(surface, color, polygon, 5)
@@ -269,8 +257,9 @@ class GameMapImage:
             left = start + 0.8 * forward - 0.4 * right_dir
 
             # Draw lines
-            pygame.draw.lines(surface, color, False, [world_to_pixel(x) for x in [start, end]], 4)
-            pygame.draw.lines(surface, color, False, [world_to_pixel(x) for x in [left, start, right]], 4)
+            start, end, left, right = world_to_pixel_array([(p.x, p.y) for p in (start, end, left, right)]).tolist()
+            pygame.draw.lines(surface, color, False, [start, end], 4)
+            pygame.draw.lines(surface, color, False, [left, start, right], 4)
 
         def draw_traffic_signs(surface, font_surface, actor, color=COLOR_ALUMINIUM_2, trigger_color=COLOR_PLUM_0):
             """Draw stop traffic signs and its bounding box if enabled"""
@@ -331,10 +320,30 @@ class GameMapImage:
         #         pygame.draw.polygon(surface, color, list_point)
         #         current_length += (line_width + space_between_lines) * 2
 
-        def lateral_shift(transform, shift):
-            """Makes a lateral shift of the forward vector of a transform"""
-            transform.rotation.yaw += 90
-            return transform.location + shift * transform.get_forward_vector()
+        def waypoint_arrays(waypoints):
+            """Locations (N, 2), x/y of the unit vectors to the right (N, 2) and lane widths (N) of the waypoints"""
+            rows = []
+            for w in waypoints:
+                t = w.transform
+                rows.append((t.location.x, t.location.y, t.rotation.yaw, t.rotation.pitch, w.lane_width))
+            rows = np.array(rows, dtype=np.float64).reshape(-1, 5)
+
+            # Forward vector of the transform turned 90 degrees to the right
+            yaw = np.radians(rows[:, 2] + 90.0)
+            cos_pitch = np.cos(np.radians(rows[:, 3]))
+            right = np.stack((cos_pitch * np.cos(yaw), cos_pitch * np.sin(yaw)), axis=1)
+            return rows[:, :2], right, rows[:, 4]
+
+        def lateral_shift_array(waypoints, sign, margin=0.0):
+            """Lateral shift of every waypoint by half its lane width plus a margin, to the left for a negative sign"""
+            locations, right, widths = waypoint_arrays(waypoints)
+            return locations + (sign * (widths * 0.5 + margin))[:, None] * right
+
+        def lane_polygon(waypoints):
+            """Pixel polygon of a lane: its left side along the waypoints and its right side back"""
+            locations, right, widths = waypoint_arrays(waypoints)
+            half_width = (widths * 0.5)[:, None] * right
+            return world_to_pixel_array(np.concatenate((locations - half_width, (locations + half_width)[::-1]))).tolist()
 
         def draw_topology(carla_topology, index):
             """ Draws traffic signs and the roads network with sidewalks, parking and shoulders by generating waypoints"""
@@ -406,11 +415,7 @@ class GameMapImage:
             # Draw Roads
             for waypoints in set_waypoints:
                 waypoint = waypoints[0]
-                road_left_side = [lateral_shift(w.transform, -w.lane_width * 0.5) for w in waypoints]
-                road_right_side = [lateral_shift(w.transform, w.lane_width * 0.5) for w in waypoints]
-
-                polygon = road_left_side + [x for x in reversed(road_right_side)]
-                polygon = [world_to_pixel(x) for x in polygon]
+                polygon = lane_polygon(waypoints)
 
                 # if len(polygon) > 2:
                 #     pygame.draw.polygon(map_surface, ROAD_COLOR, polygon, 5)
@@ -476,13 +481,30 @@ class GameMapImage:
         y = self.scale * self._pixels_per_meter * (location.y - self._world_offset[1])
         return [int(x - offset[0]), int(y - offset[1])]
 
+    def world_to_pixel_array(self, points, offset=(0, 0)):
+        """Converts an (N, 2) or (N, 3) array of world coordinates to an (N, 2) int array of pixel coordinates in
+        one go, the same pixels as world_to_pixel gives point by point. Leading dimensions are kept, e.g. the
+        corners of many boxes as (M, K, 2)"""
+        points = np.asarray(points, dtype=np.float64)
+        if points.ndim < 2:
+            points = points.reshape(-1, 2)
+        pixels = self.scale * self._pixels_per_meter * (points[..., :2] - self._world_offset) - offset
+        return pixels.astype(np.int32)
+
     def world_to_pixel_width(self, width):
         """Converts the world units to pixel units"""
         return int(self.scale * self._pixels_per_meter * width)
 
-    def scale_map(self, scale):
+    def pixel_to_world_width(self, width):
+        """Converts the pixel units to world units"""
+        return width / (self.scale * self._pixels_per_meter)
+
+    def scale_map(self, scale, smooth=True):
         """Scales the map surface"""
         if scale != self.scale:
             self.scale = scale
             width = int(self.big_map_surface.get_width() * self.scale)
-            self.surface = pygame.transform.smoothscale(self.big_map_surface, (width, width))
\ No newline at end of file
+            if smooth:
+                self.surface = pygame.transform.smoothscale(self.big_map_surface, (width, width))
+            else:
+                self.surface = pygame.transform.scale(self.big_map_surface, (width, width))
\ No newline at end of file
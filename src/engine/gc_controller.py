@@ -0,0 +1,104 @@
+import gc
+import time
+import logging
+
+from src.data.game_state import GameState
+
+GC_MODE_DEFAULT = "default"
+GC_MODE_DEFERRED = "deferred"
+GC_MODES = (GC_MODE_DEFAULT, GC_MODE_DEFERRED)
+
+# Game states without a moving minimap, where a full collection does not hurt the frame rate
+GC_IDLE_STATES = (GameState.PAUSED, GameState.MANUAL_DRIVING)
+
+
+class GCController(object):
+    """Controls when the garbage collector runs in the main loop and measures every collection.
+    In deferred mode the objects created during startup are frozen out of the collector, the automatic
+    full (generation 2) collections are made rare and the full collections run in idle game states instead."""
+
+    def __init__(self, mode, full_threshold, idle_interval):
+        if mode not in GC_MODES:
+            raise ValueError("Unknown GC mode: {}".format(mode))
+
+        self.mode = mode
+        self.full_threshold = full_threshold  # Generation 1 collections before an automatic full collection
+        self.idle_interval = idle_interval  # Minimum seconds between two full collections in idle states
+
+        # Collections and time spent in the collector, in total and since the last frame
+        self.collections = [0, 0, 0]
+        self.collect_time = 0.0
+        self.frame_collections = [0, 0, 0]
+        self.frame_collect_time = 0.0
+        self.idle_collections = 0
+
+        self._started = None
+        self._last_full = time.perf_counter()
+        self._default_threshold = gc.get_threshold()
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        """gc.callbacks hook timing every collection"""
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        if self._started is None:
+            return
+        elapsed = time.perf_counter() - self._started
+        self._started = None
+
+        generation = info["generation"]
+        self.collections[generation] += 1
+        self.frame_collections[generation] += 1
+        self.collect_time += elapsed
+        self.frame_collect_time += elapsed
+
+    def start(self):
+        """Called once the game is set up, moves every startup object out of the collector"""
+        if self.mode != GC_MODE_DEFERRED:
+            return
+
+        gc.collect()
+        gc.freeze()
+        threshold0, threshold1, _ = self._default_threshold
+        gc.set_threshold(threshold0, threshold1, self.full_threshold)
+        self._last_full = time.perf_counter()
+        logging.debug(
+            "GC deferred: %d startup objects frozen, thresholds %s", gc.get_freeze_count(), gc.get_threshold()
+        )
+
+    def on_frame(self, game_state):
+        """Called once per loop iteration. Runs the deferred full collection when the game is idle."""
+        if self.mode != GC_MODE_DEFERRED or game_state not in GC_IDLE_STATES:
+            return
+
+        now = time.perf_counter()
+        if now - self._last_full < self.idle_interval:
+            return
+
+        gc.collect(2)
+        self._last_full = now
+        self.idle_collections += 1
+
+        # Deliberate collection outside the measured frame, not a hitch of the next one
+        self.reset_frame()
+
+    def reset_frame(self):
+        """Starts the collection statistics of a new frame"""
+        self.frame_collections = [0, 0, 0]
+        self.frame_collect_time = 0.0
+
+    def stop(self):
+        """Restores the default collector settings"""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self.mode == GC_MODE_DEFERRED:
+            gc.unfreeze()
+            gc.set_threshold(*self._default_threshold)
+
+    def log_summary(self):
+        logging.info(
+            "GC %s: collections gen0=%d gen1=%d gen2=%d (%d in idle states), %.2f ms collecting",
+            self.mode, self.collections[0], self.collections[1], self.collections[2],
+            self.idle_collections, self.collect_time * 1000.0
+        )
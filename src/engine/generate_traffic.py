@@ -21,37 +21,18 @@ try:
 except IndexError:
     pass
 
-import carla
+# Make the LaneRunner sources importable when this file is run as a script
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from carla import VehicleLightState as vls
+import carla
 
 import argparse
 import logging
-from numpy import random
-
-def get_actor_blueprints(world, filter, generation):
-    bps = world.get_blueprint_library().filter(filter)
-
-    if generation.lower() == "all":
-        return bps
 
-    # If the filter returns only one bp, we assume that this one needed
-    # and therefore, we ignore the generation
-    if len(bps) == 1:
-        return bps
-
-    try:
-        int_generation = int(generation)
-        # Check if generation is in available generations
-        if int_generation in [1, 2]:
-            bps = [x for x in bps if int(x.get_attribute('generation')) == int_generation]
-            return bps
-        else:
-            print("   Warning! Actor Generation is not valid. No actor will be spawned.")
-            return []
-    except:
-        print("   Warning! Actor Generation is not valid. No actor will be spawned.")
-        return []
+from src.core.constants import TICK_ROLE, TICK_MASTER_LOCK_PATH
+from src.engine.tick_master import TickMaster, TICK_ROLES
+from src.engine.traffic_population import TrafficPopulation
+from src.utils.process_placement import add_placement_arguments, apply_process_placement
 
 def main():
     argparser = argparse.ArgumentParser(
@@ -119,6 +100,16 @@ def main():
         default=True,
         help="Enable synchronous mode for the Carla client (default: True)"
     )
+    argparser.add_argument(
+        '--tick-role',
+        choices=TICK_ROLES,
+        default=TICK_ROLE,
+        help='Who steps the synchronous world, shared with the game client (default: %s)' % TICK_ROLE)
+    argparser.add_argument(
+        '--tick-lock',
+        metavar='PATH',
+        default=TICK_MASTER_LOCK_PATH,
+        help='Lock file used to elect the tick master (default: %s)' % TICK_MASTER_LOCK_PATH)
     argparser.add_argument(
         '--hybrid',
         action='store_true',
@@ -154,18 +145,19 @@ def main():
         action='store_true',
         default=False,
         help='Activate no rendering mode')
+    add_placement_arguments(argparser)
 
     args = argparser.parse_args()
 
     logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.INFO)
 
-    vehicles_list = []
-    walkers_list = []
-    all_id = []
+    apply_process_placement(args, "traffic")
+
+    population = None
     client = carla.Client(args.host, args.port)
     client.set_timeout(10.0)
     synchronous_master = False
-    random.seed(args.seed if args.seed is not None else int(time.time()))
+    tick_master = None
 
     try:
         world = client.get_world()
@@ -177,13 +169,13 @@ def main():
         if args.hybrid:
             traffic_manager.set_hybrid_physics_mode(True)
             traffic_manager.set_hybrid_physics_radius(70.0)
-        if args.seed is not None:
-            traffic_manager.set_random_device_seed(args.seed)
 
         settings = world.get_settings()
         if not args.asynch:
             traffic_manager.set_synchronous_mode(True)
-            if not settings.synchronous_mode:
+            # Only tick if no other process (e.g. the game client) is the tick master
+            tick_master = TickMaster(args.tick_role, args.tick_lock, "traffic")
+            if tick_master.is_master:
                 synchronous_master = True
                 settings.synchronous_mode = True
                 settings.fixed_delta_seconds = 0.05
@@ -198,64 +190,20 @@ def main():
             settings.no_rendering_mode = True
         world.apply_settings(settings)
 
-        blueprints = get_actor_blueprints(world, args.filterv, args.generationv)
-        blueprintsWalkers = get_actor_blueprints(world, args.filterw, args.generationw)
-
-        if args.safe:
-            blueprints = [x for x in blueprints if x.get_attribute('base_type') == 'car']
-
-        blueprints = sorted(blueprints, key=lambda bp: bp.id)
-
-        spawn_points = world.get_map().get_spawn_points()
-        number_of_spawn_points = len(spawn_points)
-
-        if args.number_of_vehicles < number_of_spawn_points:
-            random.shuffle(spawn_points)
-        elif args.number_of_vehicles > number_of_spawn_points:
-            msg = 'requested %d vehicles, but could only find %d spawn points'
-            logging.warning(msg, args.number_of_vehicles, number_of_spawn_points)
-            args.number_of_vehicles = number_of_spawn_points
-
-        # @todo cannot import these directly.
-        SpawnActor = carla.command.SpawnActor
-        SetAutopilot = carla.command.SetAutopilot
-        FutureActor = carla.command.FutureActor
+        # The spawning itself is shared with the in-process traffic of the game client
+        population = TrafficPopulation(
+            client, world, traffic_manager, args.seed, args.safe,
+            args.filterv, args.generationv, args.filterw, args.generationw
+        )
 
         # --------------
         # Spawn vehicles
         # --------------
-        batch = []
-        hero = args.hero
-        for n, transform in enumerate(spawn_points):
-            if n >= args.number_of_vehicles:
-                break
-            blueprint = random.choice(blueprints)
-            if blueprint.has_attribute('color'):
-                color = random.choice(blueprint.get_attribute('color').recommended_values)
-                blueprint.set_attribute('color', color)
-            if blueprint.has_attribute('driver_id'):
-                driver_id = random.choice(blueprint.get_attribute('driver_id').recommended_values)
-                blueprint.set_attribute('driver_id', driver_id)
-            if hero:
-                blueprint.set_attribute('role_name', 'hero')
-                hero = False
-            else:
-                blueprint.set_attribute('role_name', 'autopilot')
-
-            # spawn the cars and set their autopilot and light state all together
-            batch.append(SpawnActor(blueprint, transform)
-                .then(SetAutopilot(FutureActor, True, traffic_manager.get_port())))
-
-        for response in client.apply_batch_sync(batch, synchronous_master):
-            if response.error:
-                logging.error(response.error)
-            else:
-                vehicles_list.append(response.actor_id)
+        population.spawn_vehicles(args.number_of_vehicles, hero_role_name='hero' if args.hero else None)
 
         # Set automatic vehicle lights update if specified
         if args.car_lights_on:
-            all_vehicle_actors = world.get_actors(vehicles_list)
-            for actor in all_vehicle_actors:
+            for actor in world.get_actors(population.vehicle_ids):
                 traffic_manager.update_vehicle_lights(actor, True)
 
         # -------------
@@ -266,60 +214,8 @@ def main():
         percentagePedestriansCrossing = 0.0     # how many pedestrians will walk through the road
         if args.seedw:
             world.set_pedestrians_seed(args.seedw)
-            random.seed(args.seedw)
-        # 1. take all the random locations to spawn
-        spawn_points = []
-        for i in range(args.number_of_walkers):
-            spawn_point = carla.Transform()
-            loc = world.get_random_location_from_navigation()
-            if (loc != None):
-                spawn_point.location = loc
-                spawn_points.append(spawn_point)
-        # 2. we spawn the walker object
-        batch = []
-        walker_speed = []
-        for spawn_point in spawn_points:
-            walker_bp = random.choice(blueprintsWalkers)
-            # set as not invincible
-            if walker_bp.has_attribute('is_invincible'):
-                walker_bp.set_attribute('is_invincible', 'false')
-            # set the max speed
-            if walker_bp.has_attribute('speed'):
-                if (random.random() > percentagePedestriansRunning):
-                    # walking
-                    walker_speed.append(walker_bp.get_attribute('speed').recommended_values[1])
-                else:
-                    # running
-                    walker_speed.append(walker_bp.get_attribute('speed').recommended_values[2])
-            else:
-                print("Walker has no speed")
-                walker_speed.append(0.0)
-            batch.append(SpawnActor(walker_bp, spawn_point))
-        results = client.apply_batch_sync(batch, True)
-        walker_speed2 = []
-        for i in range(len(results)):
-            if results[i].error:
-                logging.error(results[i].error)
-            else:
-                walkers_list.append({"id": results[i].actor_id})
-                walker_speed2.append(walker_speed[i])
-        walker_speed = walker_speed2
-        # 3. we spawn the walker controller
-        batch = []
-        walker_controller_bp = world.get_blueprint_library().find('controller.ai.walker')
-        for i in range(len(walkers_list)):
-            batch.append(SpawnActor(walker_controller_bp, carla.Transform(), walkers_list[i]["id"]))
-        results = client.apply_batch_sync(batch, True)
-        for i in range(len(results)):
-            if results[i].error:
-                logging.error(results[i].error)
-            else:
-                walkers_list[i]["con"] = results[i].actor_id
-        # 4. we put together the walkers and controllers id to get the objects from their id
-        for i in range(len(walkers_list)):
-            all_id.append(walkers_list[i]["con"])
-            all_id.append(walkers_list[i]["id"])
-        all_actors = world.get_actors(all_id)
+            population.random.seed(args.seedw)
+        population.spawn_walkers(args.number_of_walkers, percentagePedestriansRunning)
 
         # wait for a tick to ensure client receives the last transform of the walkers we have just created
         if args.asynch or not synchronous_master:
@@ -327,18 +223,10 @@ def main():
         else:
             world.tick()
 
-        # 5. initialize each controller and set target to walk to (list is [controler, actor, controller, actor ...])
-        # set how many pedestrians can cross the road
-        world.set_pedestrians_cross_factor(percentagePedestriansCrossing)
-        for i in range(0, len(all_id), 2):
-            # start walker
-            all_actors[i].start()
-            # set walk to random point
-            all_actors[i].go_to_location(world.get_random_location_from_navigation())
-            # max speed
-            all_actors[i].set_max_speed(float(walker_speed[int(i/2)]))
+        # start the walker controllers and send them to a random point
+        population.tick(percentagePedestriansCrossing)
 
-        print('spawned %d vehicles and %d walkers, press Ctrl+C to exit.' % (len(vehicles_list), len(walkers_list)))
+        print('spawned %d vehicles and %d walkers, press Ctrl+C to exit.' % (len(population.vehicle_ids), len(population.walker_ids)))
 
         # Example of how to use Traffic Manager parameters
         traffic_manager.global_percentage_speed_difference(30.0)
@@ -351,6 +239,9 @@ def main():
 
     finally:
 
+        if tick_master is not None:
+            tick_master.release()
+
         if not args.asynch and synchronous_master:
             settings = world.get_settings()
             settings.synchronous_mode = False
@@ -358,15 +249,9 @@ def main():
             settings.fixed_delta_seconds = None
             world.apply_settings(settings)
 
-        print('\ndestroying %d vehicles' % len(vehicles_list))
-        client.apply_batch([carla.command.DestroyActor(x) for x in vehicles_list])
-
-        # stop walker controllers (list is [controller, actor, controller, actor ...])
-        for i in range(0, len(all_id), 2):
-            all_actors[i].stop()
-
-        print('\ndestroying %d walkers' % len(walkers_list))
-        client.apply_batch([carla.command.DestroyActor(x) for x in all_id])
+        if population is not None:
+            print('\ndestroying %d vehicles and %d walkers' % (len(population.vehicle_ids), len(population.walker_ids)))
+            population.destroy()
 
         time.sleep(0.5)
 
@@ -0,0 +1,53 @@
+import gc
+import logging
+
+
+class HitchDetector(object):
+    """Records every loop iteration that takes longer than the hitch threshold, together with the
+    garbage collections that ran during it, so stutters can be told apart from GC pauses."""
+
+    def __init__(self, threshold, gc_controller, max_hitches=100):
+        self.threshold = threshold  # Seconds a frame may take before it counts as a hitch
+        self.gc_controller = gc_controller
+        self.max_hitches = max_hitches
+
+        self.frames = 0
+        self.hitch_count = 0
+        self.worst = 0.0
+        self.hitches = []  # Last hitches as dictionaries, oldest first
+
+    def on_frame(self, cost, game_state):
+        """Checks the cost in seconds of the last frame and starts the statistics of the next one"""
+        self.frames += 1
+        gc_controller = self.gc_controller
+
+        if cost > self.threshold:
+            self.hitch_count += 1
+            self.worst = max(self.worst, cost)
+            hitch = {
+                "frame": self.frames,
+                "cost_ms": cost * 1000.0,
+                "state": str(game_state),
+                "gc_ms": gc_controller.frame_collect_time * 1000.0,
+                "gc_collections": list(gc_controller.frame_collections),
+                "gc_count": gc.get_count(),
+            }
+            self.hitches.append(hitch)
+            if len(self.hitches) > self.max_hitches:
+                self.hitches.pop(0)
+
+            logging.debug(
+                "Frame hitch #%d: %.2f ms (threshold %.2f ms) in %s, GC %.2f ms, collections %s, pending %s",
+                hitch["frame"], hitch["cost_ms"], self.threshold * 1000.0, hitch["state"],
+                hitch["gc_ms"], hitch["gc_collections"], hitch["gc_count"]
+            )
+
+        gc_controller.reset_frame()
+
+    def log_summary(self):
+        caused_by_gc = sum(1 for hitch in self.hitches if hitch["gc_collections"][2] > 0)
+        logging.info(
+            "Frame hitches: %d of %d frames over %.2f ms, worst %.2f ms, %d of the last %d with a full GC",
+            self.hitch_count, self.frames, self.threshold * 1000.0, self.worst * 1000.0,
+            caused_by_gc, len(self.hitches)
+        )
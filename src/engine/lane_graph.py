@@ -0,0 +1,341 @@
+import os
+import logging
+import numpy as np
+import carla
+
+# Local imports
+from src.core.constants import MAP_CACHE_DIR, LANE_GRAPH_RESOLUTION
+from src.engine.map_cache import opendrive_hash, cache_path, remove_stale
+from src.utils.interpolation import lerp_angle
+
+LANE_GRAPH_EXTENSION = ".lanes.npz"
+
+
+class LanePoint(object):
+    """
+    A position on the lane graph: a sample of a lane and the meters driven past it, towards the next sample of
+    the same lane. It reads like a carla.Waypoint for what the game uses of one (transform, lane and road ids,
+    lane type and width), without calling into the map.
+    """
+
+    __slots__ = ('graph', 'node', 'along', '_transform')
+
+    def __init__(self, graph, node, along=0.0):
+        self.graph = graph
+        self.node = int(node)
+        self.along = float(along)
+        self._transform = None
+
+    @property
+    def lane_key(self):
+        return tuple(int(v) for v in self.graph.lane_keys[self.node])
+
+    @property
+    def road_id(self):
+        return int(self.graph.lane_keys[self.node, 0])
+
+    @property
+    def section_id(self):
+        return int(self.graph.lane_keys[self.node, 1])
+
+    @property
+    def lane_id(self):
+        return int(self.graph.lane_keys[self.node, 2])
+
+    @property
+    def lane_type(self):
+        # Only driving lanes are in the graph
+        return carla.LaneType.Driving
+
+    @property
+    def lane_width(self):
+        return float(self.graph.lane_widths[self.node])
+
+    @property
+    def is_junction(self):
+        return bool(self.graph.junction[self.node])
+
+    @property
+    def s(self):
+        return float(self.graph.s[self.node]) + self.graph.s_sign(self.node) * self.along
+
+    @property
+    def transform(self):
+        if self._transform is None:
+            self._transform = self.graph.transform_at(self.node, self.along)
+        return self._transform
+
+
+class LaneGraph(object):
+    """
+    Driving lanes of a map sampled every few meters, with the samples to the left and right of each sample and
+    the samples that follow it. Built once per map from the topology and cached next to the map image under the
+    OpenDRIVE hash, so finding the lane next to a waypoint or the point some meters ahead of it are array
+    lookups instead of chains of get_left_lane, get_right_lane and next calls.
+
+    Samples are stored as arrays indexed by node: positions (N, 3), rotations (N, 2) as pitch and yaw, lane keys
+    (N, 3) as road, section and lane id, s, lane widths and junction flags. left and right hold a node of the
+    neighbouring driving lane or -1. steps is the distance to the next sample of the same lane, 0 at the end of
+    a lane, where the successors are the first samples of the lanes it connects to.
+    """
+
+    FIELDS = ('positions', 'rotations', 'lane_keys', 's', 'lane_widths', 'junction',
+              'left', 'right', 'steps', 'successor_offsets', 'successors')
+
+    def __init__(self, resolution, positions, rotations, lane_keys, s, lane_widths, junction,
+                 left, right, steps, successor_offsets, successors):
+        self.resolution = float(resolution)
+        self.positions = positions
+        self.rotations = rotations
+        self.lane_keys = lane_keys
+        self.s = s
+        self.lane_widths = lane_widths
+        self.junction = junction
+        self.left = left
+        self.right = right
+        self.steps = steps
+        self.successor_offsets = successor_offsets
+        self.successors = successors
+
+        self._index_lanes()
+
+    def __len__(self):
+        return len(self.s)
+
+    def _index_lanes(self):
+        """Per lane key: the s of its samples in ascending order, their nodes and the sign of s along the lane"""
+        nodes_of = {}
+        for node, key in enumerate(self.lane_keys.tolist()):
+            nodes_of.setdefault(tuple(key), []).append(node)
+
+        self._lanes = {}
+        self._signs = np.ones(len(self), dtype=np.int8)
+        for key, nodes in nodes_of.items():
+            nodes = np.array(nodes, dtype=np.int32)
+            order = np.argsort(self.s[nodes], kind='stable')
+            sign = 1
+            for node in nodes:
+                if self.steps[node] > 0.0:
+                    nxt = self.successors[self.successor_offsets[node]]
+                    sign = 1 if self.s[nxt] >= self.s[node] else -1
+                    break
+            self._signs[nodes] = sign
+            self._lanes[key] = (self.s[nodes][order], nodes[order], sign)
+
+    def s_sign(self, node):
+        """+1 if s grows in the driving direction of the lane of the node, -1 if it shrinks"""
+        return int(self._signs[node])
+
+    def first_successor(self, node):
+        start = self.successor_offsets[node]
+        return int(self.successors[start]) if start < self.successor_offsets[node + 1] else -1
+
+    def successors_of(self, node):
+        return self.successors[self.successor_offsets[node]:self.successor_offsets[node + 1]].tolist()
+
+    def transform_at(self, node, along=0.0):
+        """carla.Transform of a point along past a node, between the node and the next sample of its lane"""
+        position = self.positions[node]
+        pitch, yaw = self.rotations[node]
+        step = self.steps[node]
+        if along > 0.0 and step > 0.0:
+            nxt = self.first_successor(node)
+            t = min(along / step, 1.0)
+            position = position + (self.positions[nxt] - position) * t
+            pitch = lerp_angle(pitch, self.rotations[nxt, 0], t)
+            yaw = lerp_angle(yaw, self.rotations[nxt, 1], t)
+        return carla.Transform(
+            carla.Location(x=float(position[0]), y=float(position[1]), z=float(position[2])),
+            carla.Rotation(pitch=float(pitch), yaw=float(yaw))
+        )
+
+    def locate(self, lane_key, s):
+        """LanePoint at the s coordinate of a lane, None if the lane is not in the graph"""
+        lane = self._lanes.get(lane_key)
+        if lane is None:
+            return None
+        s_sorted, nodes, sign = lane
+
+        # The sample right before s in the driving direction
+        if sign > 0:
+            i = int(np.searchsorted(s_sorted, s, side='right')) - 1
+        else:
+            i = int(np.searchsorted(s_sorted, s, side='left'))
+        i = min(max(i, 0), len(nodes) - 1)
+        node = int(nodes[i])
+        along = min(max((s - s_sorted[i]) * sign, 0.0), self.steps[node])
+        return LanePoint(self, node, along)
+
+    def point_at(self, waypoint):
+        """LanePoint of a carla.Waypoint, a LanePoint is returned as it is. None if its lane is not in the graph."""
+        if waypoint is None or isinstance(waypoint, LanePoint):
+            return waypoint
+        return self.locate((waypoint.road_id, waypoint.section_id, waypoint.lane_id), waypoint.s)
+
+    def neighbour(self, point, side):
+        """LanePoint next to a point on the driving lane to its left (side < 0) or right (side > 0), None if there
+        is no such lane"""
+        node = (self.right if side > 0 else self.left)[point.node]
+        if node < 0:
+            return None
+        return self.locate(tuple(int(v) for v in self.lane_keys[node]), point.s)
+
+    def lateral(self, point, offset):
+        """Moves a point offset lanes to the right (offset > 0) or left (offset < 0), as far as there are lanes"""
+        for _ in range(abs(offset)):
+            neighbour = self.neighbour(point, offset)
+            if neighbour is None:
+                break
+            point = neighbour
+        return point
+
+    def advance(self, point, distance):
+        """LanePoint distance meters ahead of a point, taking the first successor at every branch. A lane that
+        ends without successors stops it at its end."""
+        node, remaining = point.node, point.along + distance
+        for _ in range(len(self)):
+            step = self.steps[node]
+            if remaining < step:
+                break
+            nxt = self.first_successor(node)
+            if nxt < 0:
+                remaining = step
+                break
+            remaining -= step
+            node = nxt
+        return LanePoint(self, node, remaining)
+
+    def advance_all(self, point, distance, limit=64):
+        """LanePoints distance meters ahead of a point on every branch, at most limit of them"""
+        results = []
+        stack = [(point.node, point.along + distance)]
+        visited = 0
+        while stack and len(results) < limit and visited < len(self):
+            node, remaining = stack.pop()
+            visited += 1
+            step = self.steps[node]
+            if remaining < step:
+                results.append(LanePoint(self, node, remaining))
+                continue
+            successors = self.successors_of(node)
+            if not successors:
+                continue
+            # Reversed so the first successor is walked first, as in advance
+            stack.extend((nxt, remaining - step) for nxt in reversed(successors))
+        return results
+
+    @classmethod
+    def build(cls, carla_map, resolution=LANE_GRAPH_RESOLUTION):
+        """Samples every driving lane of the topology and links the samples, the only pass that calls the map"""
+        segments = []
+        for entry, exit_wp in carla_map.get_topology():
+            if entry.lane_type != carla.LaneType.Driving:
+                continue
+
+            # Walk the lane from its entry to its exit, as the global route planner does
+            samples = [entry]
+            end = exit_wp.transform.location
+            nxt = entry.next(resolution)
+            while nxt and nxt[0].road_id == entry.road_id:
+                if nxt[0].transform.location.distance(end) <= resolution:
+                    break
+                samples.append(nxt[0])
+                nxt = nxt[0].next(resolution)
+            if exit_wp.road_id == entry.road_id and abs(exit_wp.s - samples[-1].s) > 1e-3:
+                samples.append(exit_wp)
+            segments.append(samples)
+
+        rows = []
+        neighbours = []  # (node, side, lane key, s) of the driving lanes next to a sample
+        first_node = {}  # First sample of every lane key in the driving direction
+        segment_ends = []
+        for samples in segments:
+            for wp in samples:
+                node = len(rows)
+                first_node.setdefault((wp.road_id, wp.section_id, wp.lane_id), node)
+                t = wp.transform
+                rows.append((t.location.x, t.location.y, t.location.z, t.rotation.pitch, t.rotation.yaw,
+                             wp.road_id, wp.section_id, wp.lane_id, wp.s, wp.lane_width, wp.is_junction))
+                for side, other in ((-1, wp.get_left_lane()), (1, wp.get_right_lane())):
+                    if other is not None and other.lane_type == carla.LaneType.Driving:
+                        neighbours.append((node, side, (other.road_id, other.section_id, other.lane_id), other.s))
+            segment_ends.append((len(rows) - 1, samples[-1]))
+
+        rows = np.array(rows, dtype=np.float64).reshape(-1, 11)
+        count = len(rows)
+        s = rows[:, 8]
+
+        # Next sample of the same lane, and the first samples of the connected lanes at the end of a lane
+        successor_lists = [[] for _ in range(count)]
+        steps = np.zeros(count)
+        end_nodes = set(node for node, _ in segment_ends)
+        for node in range(count - 1):
+            if node not in end_nodes:
+                successor_lists[node].append(node + 1)
+                steps[node] = abs(s[node + 1] - s[node])
+        for node, last in segment_ends:
+            key = (last.road_id, last.section_id, last.lane_id)
+            for wp in last.next(0.1):
+                successor_key = (wp.road_id, wp.section_id, wp.lane_id)
+                nxt = first_node.get(successor_key)
+                if nxt is not None and successor_key != key and nxt not in successor_lists[node]:
+                    successor_lists[node].append(nxt)
+
+        successor_offsets = np.zeros(count + 1, dtype=np.int32)
+        successor_offsets[1:] = np.cumsum([len(successor_list) for successor_list in successor_lists])
+        successors = np.array([nxt for successor_list in successor_lists for nxt in successor_list], dtype=np.int32)
+
+        graph = cls(
+            resolution,
+            positions=rows[:, 0:3].copy(),
+            rotations=rows[:, 3:5].copy(),
+            lane_keys=rows[:, 5:8].astype(np.int32),
+            s=s.copy(),
+            lane_widths=rows[:, 9].copy(),
+            junction=rows[:, 10].astype(bool),
+            left=np.full(count, -1, dtype=np.int32),
+            right=np.full(count, -1, dtype=np.int32),
+            steps=steps,
+            successor_offsets=successor_offsets,
+            successors=successors
+        )
+
+        # Neighbours are resolved once every lane is indexed
+        for node, side, key, other_s in neighbours:
+            point = graph.locate(key, other_s)
+            if point is not None:
+                (graph.right if side > 0 else graph.left)[node] = point.node
+        return graph
+
+    def save(self, path):
+        np.savez_compressed(path, resolution=self.resolution, **{field: getattr(self, field) for field in self.FIELDS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(float(data['resolution']), **{field: data[field] for field in cls.FIELDS})
+
+    @classmethod
+    def for_map(cls, carla_map, content_hash=None, resolution=LANE_GRAPH_RESOLUTION, directory=MAP_CACHE_DIR):
+        """Lane graph of a map, read from the cache if its OpenDRIVE did not change since it was built"""
+        if content_hash is None:
+            content_hash = opendrive_hash(carla_map)
+        path = cache_path(carla_map, content_hash, LANE_GRAPH_EXTENSION, directory)
+
+        if os.path.isfile(path):
+            try:
+                graph = cls.load(path)
+                if graph.resolution == resolution:
+                    logging.debug("Lane graph of %s loaded from %s: %d samples", carla_map.name, path, len(graph))
+                    return graph
+            except Exception as e:
+                logging.warning("Failed to read the lane graph cache %s: %s", path, e)
+
+        graph = cls.build(carla_map, resolution)
+        logging.info("Lane graph of %s built: %d samples every %.1f m", carla_map.name, len(graph), resolution)
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        remove_stale(carla_map, LANE_GRAPH_EXTENSION, directory)
+        graph.save(path)
+        return graph
@@ -0,0 +1,29 @@
+import os
+import glob
+import hashlib
+
+# Local imports
+from src.core.constants import MAP_CACHE_DIR
+
+
+def opendrive_hash(carla_map):
+    """Hash of the OpenDRIVE content of a map, everything cached for a map is only valid for this content"""
+    hash_func = hashlib.sha1()
+    hash_func.update(carla_map.to_opendrive().encode("UTF-8"))
+    return str(hash_func.hexdigest())
+
+
+def map_name(carla_map):
+    """Town name of a map, e.g. Town04 for Carla/Maps/Town04"""
+    return carla_map.name.split('/')[-1]
+
+
+def cache_path(carla_map, content_hash, extension, directory=MAP_CACHE_DIR):
+    """Path of the cached file of a map with the given OpenDRIVE hash, e.g. Town04_<hash>.tga"""
+    return str(os.path.join(directory, map_name(carla_map) + "_" + content_hash + extension))
+
+
+def remove_stale(carla_map, extension, directory=MAP_CACHE_DIR):
+    """Removes the cached files of a map with this extension, left by a previous version of its OpenDRIVE"""
+    for filename in glob.glob(os.path.join(directory, map_name(carla_map) + "_*" + extension)):
+        os.remove(filename)
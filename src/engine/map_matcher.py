@@ -0,0 +1,132 @@
+import math
+import logging
+import numpy as np
+
+# Local imports
+from src.core.constants import MAP_MATCHER_CELL_SIZE, MAP_MATCHER_LOOKAHEAD, MAP_MATCHER_HEADING_WEIGHT
+from src.engine.lane_graph import LanePoint
+
+
+class MapMatcher(object):
+    """
+    Client side replacement of town_map.get_waypoint for a moving actor. The lane graph samples are put in a
+    uniform grid once, a match projects the location on the lane pieces (a sample to the next sample of its lane)
+    around it and keeps the closest one, with a small penalty for a heading against the lane.
+
+    Between two frames an actor barely moves, so the lane pieces just ahead of the last match and next to them
+    are tried first. The grid is only searched when the actor left them, e.g. after a respawn.
+    """
+
+    def __init__(self, lane_graph, cell_size=MAP_MATCHER_CELL_SIZE, lookahead=MAP_MATCHER_LOOKAHEAD,
+                 heading_weight=MAP_MATCHER_HEADING_WEIGHT):
+        self.lane_graph = lane_graph
+        self.cell_size = float(cell_size)
+        self.lookahead = lookahead
+        self.heading_weight = heading_weight  # Meters added for a heading opposite to the lane
+        self.previous = None
+
+        # Matches from the last match's neighbourhood and from the grid, for the debug summary
+        self.coherent_matches = 0
+        self.grid_matches = 0
+
+        # Lane pieces: from every sample to the next sample of its lane, a point at lane ends
+        graph = lane_graph
+        count = len(graph)
+        next_nodes = np.arange(count, dtype=np.int32)
+        has_next = graph.steps > 0.0
+        next_nodes[has_next] = graph.successors[graph.successor_offsets[:-1][has_next]]
+        self._starts = graph.positions
+        self._directions = graph.positions[next_nodes] - graph.positions
+        self._lengths_squared = np.einsum('ij,ij->i', self._directions, self._directions)
+        yaws = np.radians(graph.rotations[:, 1])
+        self._headings = np.stack((np.cos(yaws), np.sin(yaws)), axis=1)
+
+        # Grid cells of the samples, a sorted copy of the node ids and the range of every cell in it
+        cells = np.floor(graph.positions[:, :2] / self.cell_size).astype(np.int64)
+        order = np.lexsort((cells[:, 1], cells[:, 0]))
+        self._cell_nodes = order.astype(np.int32)
+        self._cells = {}
+        sorted_cells = cells[order]
+        if count:
+            breaks = np.flatnonzero(np.any(sorted_cells[1:] != sorted_cells[:-1], axis=1)) + 1
+            bounds = np.concatenate(([0], breaks, [count]))
+            for start, end in zip(bounds[:-1], bounds[1:]):
+                self._cells[tuple(sorted_cells[start].tolist())] = (start, end)
+
+    def reset(self):
+        """Forgets the last match, the next one searches the grid"""
+        self.previous = None
+
+    def _grid_candidates(self, x, y):
+        """Nodes of the 3x3 cells around x/y"""
+        cx, cy = int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+        ranges = [self._cells.get((i, j)) for i in (cx - 1, cx, cx + 1) for j in (cy - 1, cy, cy + 1)]
+        parts = [self._cell_nodes[start:end] for start, end in filter(None, ranges)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int32)
+
+    def _coherent_candidates(self, node):
+        """Nodes of the lane pieces ahead of the last match on every branch, and of the lanes next to them"""
+        graph = self.lane_graph
+        nodes = [node]
+        frontier = [node]
+        for _ in range(self.lookahead):
+            frontier = [nxt for current in frontier for nxt in graph.successors_of(current)]
+            nodes.extend(frontier)
+        neighbours = [side[n] for n in nodes for side in (graph.left, graph.right) if side[n] >= 0]
+        return np.unique(np.array(nodes + neighbours, dtype=np.int32))
+
+    def _best(self, candidates, location, heading):
+        """Closest lane piece of the candidates: its node, meters along it and the distance to it"""
+        point = np.array((location.x, location.y, location.z))
+        offsets = point - self._starts[candidates]
+        directions = self._directions[candidates]
+        lengths_squared = self._lengths_squared[candidates]
+
+        # Projection on every piece, clamped to the piece
+        t = np.einsum('ij,ij->i', offsets, directions)
+        t = np.divide(t, lengths_squared, out=np.zeros_like(t), where=lengths_squared > 0.0)
+        t = np.clip(t, 0.0, 1.0)
+        gaps = offsets - t[:, None] * directions
+        distances = np.sqrt(np.einsum('ij,ij->i', gaps, gaps))
+
+        costs = distances
+        if heading is not None:
+            alignment = self._headings[candidates] @ heading
+            costs = distances + self.heading_weight * (1.0 - alignment) * 0.5
+
+        best = int(np.argmin(costs))
+        node = int(candidates[best])
+        return node, float(t[best] * math.sqrt(lengths_squared[best])), float(distances[best])
+
+    def match(self, transform):
+        """
+        LanePoint of the driving lane closest to a carla.Transform: its lane, s and heading are read from the
+        lane graph. None if no lane sample is within a grid cell of the location.
+        """
+        location = transform.location
+        yaw = math.radians(transform.rotation.yaw)
+        heading = np.array((math.cos(yaw), math.sin(yaw)))
+
+        # Still on the lane pieces around the last match
+        if self.previous is not None:
+            node, along, distance = self._best(self._coherent_candidates(self.previous.node), location, heading)
+            if distance <= self.lane_graph.lane_widths[node] * 0.5:
+                self.coherent_matches += 1
+                self.previous = LanePoint(self.lane_graph, node, along)
+                return self.previous
+
+        candidates = self._grid_candidates(location.x, location.y)
+        if not len(candidates):
+            self.previous = None
+            return None
+
+        node, along, _ = self._best(candidates, location, heading)
+        self.grid_matches += 1
+        self.previous = LanePoint(self.lane_graph, node, along)
+        return self.previous
+
+    def log_summary(self):
+        total = self.coherent_matches + self.grid_matches
+        if total:
+            logging.debug("Map matcher: %d matches, %.1f%% from the last match, %d grid searches",
+                          total, 100.0 * self.coherent_matches / total, self.grid_matches)
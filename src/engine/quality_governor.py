@@ -0,0 +1,102 @@
+import logging
+
+from src.core.constants import (
+    HERO_DEFAULT_SCALE,
+    QUALITY_EMA_FACTOR,
+    QUALITY_DOWNGRADE_RATIO,
+    QUALITY_UPGRADE_RATIO,
+    QUALITY_HOLD_FRAMES
+)
+
+QUALITY_AUTO = "auto"
+
+
+class QualityLevel(object):
+    """Rendering settings of one quality level of the game view"""
+
+    def __init__(self, name, minimap_scale, max_vehicles, smooth, hud_angle_step):
+        self.name = name
+        self.minimap_scale = minimap_scale  # Resolution of the rotated minimap, relative to the hero view scale
+        self.max_vehicles = max_vehicles  # Nearest vehicles drawn around the hero, None draws all of them
+        self.smooth = smooth  # smoothscale when True, the cheaper nearest neighbour scale otherwise
+        self.hud_angle_step = hud_angle_step  # Degrees the HUD sprites turn before they are rotated again
+
+    def __repr__(self):
+        return "QualityLevel({})".format(self.name)
+
+
+# From the best to the cheapest level
+QUALITY_LEVELS = (
+    QualityLevel("high", minimap_scale=HERO_DEFAULT_SCALE, max_vehicles=None, smooth=True, hud_angle_step=0.0),
+    QualityLevel("medium", minimap_scale=HERO_DEFAULT_SCALE * 0.75, max_vehicles=40, smooth=True, hud_angle_step=2.0),
+    QualityLevel("low", minimap_scale=HERO_DEFAULT_SCALE * 0.5, max_vehicles=15, smooth=False, hud_angle_step=10.0),
+)
+QUALITY_MODES = (QUALITY_AUTO,) + tuple(level.name for level in QUALITY_LEVELS)
+
+
+class QualityGovernor(object):
+    """Keeps the render cost of a frame within its budget. The cost is smoothed with an exponential moving
+    average; the quality steps down when it gets close to the budget and back up once it is well below it.
+    After every change the level is held for a number of frames, so the quality does not oscillate."""
+
+    def __init__(self, mode, budget,
+                 ema_factor=QUALITY_EMA_FACTOR,
+                 downgrade_ratio=QUALITY_DOWNGRADE_RATIO,
+                 upgrade_ratio=QUALITY_UPGRADE_RATIO,
+                 hold_frames=QUALITY_HOLD_FRAMES):
+        if mode not in QUALITY_MODES:
+            raise ValueError("Unknown quality mode: {}".format(mode))
+
+        self.adaptive = mode == QUALITY_AUTO
+        self.budget = budget  # Seconds available for one rendered frame
+        self.ema_factor = ema_factor
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.hold_frames = hold_frames
+
+        names = [level.name for level in QUALITY_LEVELS]
+        self.level_index = 0 if self.adaptive else names.index(mode)
+        self.average_cost = None
+        self.changes = 0
+        self._held = 0
+
+    @property
+    def level(self):
+        return QUALITY_LEVELS[self.level_index]
+
+    def observe(self, cost):
+        """Feeds the cost in seconds of the last rendered frame and adapts the level if needed"""
+        if self.average_cost is None:
+            self.average_cost = cost
+        else:
+            self.average_cost += self.ema_factor * (cost - self.average_cost)
+
+        if not self.adaptive:
+            return
+
+        self._held += 1
+        if self._held < self.hold_frames:
+            return
+
+        if self.average_cost > self.budget * self.downgrade_ratio and self.level_index < len(QUALITY_LEVELS) - 1:
+            self._set_level(self.level_index + 1)
+        elif self.average_cost < self.budget * self.upgrade_ratio and self.level_index > 0:
+            self._set_level(self.level_index - 1)
+
+    def _set_level(self, index):
+        previous = self.level
+        self.level_index = index
+        self.changes += 1
+        self._held = 0
+        logging.info(
+            "Render quality %s -> %s (average frame cost %.2f ms, budget %.2f ms)",
+            previous.name, self.level.name, self.average_cost * 1000.0, self.budget * 1000.0
+        )
+
+    def log_summary(self):
+        """Logs the current level and the frame cost it is based on"""
+        logging.info(
+            "Render quality: %s (%s), average frame cost %.2f ms (budget %.2f ms), %d level changes",
+            self.level.name, "auto" if self.adaptive else "fixed",
+            (self.average_cost or 0.0) * 1000.0, self.budget * 1000.0, self.changes
+        )
@@ -11,6 +11,8 @@ from src.data.game_state import GameState
 from src.utils.exit_game import exit_game
 from src.core.avatar_direction import AvatarDirection
 from src.utils.log_lanerunner_timestamp import log_lanerunner_timestamp
+from src.data.game_clock import GameClock
+from src.utils.rpc_profiler import RpcProfiler
 
 # Import PyGame constants
 try:
@@ -43,6 +45,7 @@ try:
     from pygame.locals import K_m
     from pygame.locals import K_k
     from pygame.locals import K_l
+    from pygame.locals import K_i
 except ImportError:
     raise RuntimeError('cannot import pygame, make sure pygame package is installed')
 
@@ -92,6 +95,10 @@ class InputControl():
         self._stab_start_time = None
         self._stab_steer_values = []
 
+    def reapply_autopilot(self):
+        """Applies the autopilot setting to the player again, e.g. after it was resolved on a new connection"""
+        self.world.player.set_autopilot(self._autopilot_enabled)
+
     def start(self, game_manager):
         """Start the InputControl with a GameManager."""
         self.game_manager = game_manager
@@ -168,21 +175,19 @@ class InputControl():
                         #     self.lanerunner_logger.add_value(takeover_time=log_lanerunner_timestamp())
                     elif event.key == K_c:
                         logging.debug('Traffic light control triggered to go RED')
-                        for light in self.world.traffic_lights:
-                            light.set_state(carla.TrafficLightState.Red)
-                            # light.freeze(True)
+                        self.world.set_traffic_lights_state(carla.TrafficLightState.Red)
                     elif event.key == K_v:
                         logging.debug('Traffic light control triggered to go GREEN')
-                        for light in self.world.traffic_lights:
-                            if light.id == TARGET_TRAFFIC_LIGHT_ID:
-                                light.set_state(carla.TrafficLightState.Green)
-                                # light.freeze(True)
+                        self.world.set_traffic_lights_state(carla.TrafficLightState.Green, TARGET_TRAFFIC_LIGHT_ID)
                     elif event.key == K_b:
                         logging.debug('Toggle pause and resume')
                         self.game_manager.toggle_game()
                     elif event.key == K_n:
                         logging.debug('Restarting the game')
                         self.game_manager.restart_game()
+                    elif event.key == K_i:
+                        # Only reports when started with --profile-rpc
+                        RpcProfiler.instance().report()
                     elif event.key == K_m:
                         logging.debug('Ending the game')
                         self.game_manager.end_game()
@@ -306,11 +311,11 @@ class InputControl():
             logging.info("Takeover time logged from manual input.")
             # Start stability collection
             self._stab_collecting = True
-            self._stab_start_time = pygame.time.get_ticks()
+            self._stab_start_time = GameClock.instance().get_ticks()
             self._stab_steer_values = []
 
         if self._stab_collecting:
-            now = pygame.time.get_ticks()
+            now = GameClock.instance().get_ticks()
             elapsed = (now - self._stab_start_time) / 1000.0  # seconds
             self._stab_steer_values.append(self._control.steer)
             if elapsed >= 3.0:
@@ -365,11 +370,11 @@ class InputControl():
             logging.info("Takeover time logged from wheel input.")
             # Start stability collection
             self._stab_collecting = True
-            self._stab_start_time = pygame.time.get_ticks()
+            self._stab_start_time = GameClock.instance().get_ticks()
             self._stab_steer_values = []
 
         if self._stab_collecting:
-            now = pygame.time.get_ticks()
+            now = GameClock.instance().get_ticks()
             elapsed = (now - self._stab_start_time) / 1000.0  # seconds
             self._stab_steer_values.append(self._control.steer)
             if elapsed >= 3.0:
@@ -0,0 +1,57 @@
+import math
+
+
+class SpatialGrid(object):
+    """
+    Uniform hash grid over the x/y plane for the points of one tick. Rebuilding it is one pass over the points,
+    a query only looks at the cells around the queried location. With a cell size of at least the query radius,
+    that is the 3x3 cells around it, however many points there are.
+    """
+
+    def __init__(self, cell_size):
+        self.cell_size = float(cell_size)
+        self._cells = {}
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def _key(self, x, y):
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def rebuild(self, locations):
+        """Replaces the points of the grid with the given carla.Locations"""
+        cells = {}
+        for location in locations:
+            point = (location.x, location.y, location.z)
+            key = self._key(point[0], point[1])
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [point]
+            else:
+                cell.append(point)
+        self._cells = cells
+        self._count = sum(len(cell) for cell in cells.values())
+
+    def near(self, x, y, radius):
+        """(x, y, z) points of the cells that a circle of the radius around x/y overlaps, a superset of the hits"""
+        if not self._cells:
+            return []
+        reach = int(math.ceil(radius / self.cell_size))
+        cx, cy = self._key(x, y)
+        points = []
+        for i in range(cx - reach, cx + reach + 1):
+            for j in range(cy - reach, cy + reach + 1):
+                cell = self._cells.get((i, j))
+                if cell is not None:
+                    points.extend(cell)
+        return points
+
+    def any_within(self, location, radius):
+        """True if a point is closer than the radius to the carla.Location (3D distance)"""
+        x, y, z = location.x, location.y, location.z
+        radius_squared = radius * radius
+        for px, py, pz in self.near(x, y, radius):
+            if (px - x) ** 2 + (py - y) ** 2 + (pz - z) ** 2 < radius_squared:
+                return True
+        return False
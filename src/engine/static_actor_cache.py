@@ -0,0 +1,84 @@
+import numpy as np
+
+# Local imports
+from src.core.actor_kind import ActorKind
+from src.utils.util import Util
+
+
+class StaticActor(object):
+    """World position and trigger volume of an actor that never moves, read once"""
+
+    def __init__(self, entry):
+        self.entry = entry
+        self.actor = entry.actor
+
+        transform = entry.actor.get_transform()
+        self.location = transform.location
+        self.yaw = transform.rotation.yaw
+
+        # Trigger volume centre in world space and the radius of its extent
+        trigger_volume = entry.trigger_volume
+        self.trigger_centre = transform.transform(trigger_volume.location)
+        self.trigger_radius = Util.length(trigger_volume.extent)
+
+        # Speed limit text, e.g. '30' for traffic.speed_limit.30
+        parts = entry.type_id.split('.')
+        self.limit = parts[2] if entry.kind == ActorKind.SPEED_LIMIT and len(parts) > 2 else None
+
+
+class StaticActorCache(object):
+    """Traffic lights, speed limits and stop/yield signs of the map with everything that does not change
+    precomputed: world positions, trigger volume centres and radii, and pixel positions per map scale.
+    Only the traffic light states are refreshed every tick."""
+
+    def __init__(self):
+        self.traffic_lights = []
+        self.speed_limits = []
+        self.traffic_signs = []
+        self.traffic_light_states = []
+
+        # Trigger centres (N, 3) and radii (N) of the traffic lights, for the affected light test
+        self._trigger_centres = np.zeros((0, 3))
+        self._trigger_radii = np.zeros(0)
+
+        self._pixel_scale = None
+        self._pixels = {}
+
+    def rebuild(self, actor_registry):
+        """Reads the static actors of the registry, called when actors appeared or disappeared"""
+        self.traffic_lights = [StaticActor(entry) for entry in actor_registry.of_kind(ActorKind.TRAFFIC_LIGHT)]
+        self.speed_limits = [StaticActor(entry) for entry in actor_registry.of_kind(ActorKind.SPEED_LIMIT)]
+        self.traffic_signs = [StaticActor(entry) for entry in actor_registry.of_kind(ActorKind.TRAFFIC_SIGN)]
+
+        self._trigger_centres = np.array(
+            [(tl.trigger_centre.x, tl.trigger_centre.y, tl.trigger_centre.z) for tl in self.traffic_lights],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        self._trigger_radii = np.array([tl.trigger_radius for tl in self.traffic_lights], dtype=np.float64)
+        self._pixels = {}
+        self.refresh_states()
+
+    def refresh_states(self):
+        """Reads the traffic light states of the last tick"""
+        self.traffic_light_states = [tl.actor.state for tl in self.traffic_lights]
+
+    def pixels(self, group, world_to_pixel_array, scale):
+        """Pixel positions of a group of static actors ('traffic_lights', 'speed_limits' or 'traffic_signs'),
+        converted once per map scale"""
+        if scale != self._pixel_scale:
+            self._pixel_scale = scale
+            self._pixels = {}
+
+        positions = self._pixels.get(group)
+        if positions is None:
+            locations = [(static_actor.location.x, static_actor.location.y) for static_actor in getattr(self, group)]
+            positions = world_to_pixel_array(locations).tolist()
+            self._pixels[group] = positions
+        return positions
+
+    def affected_traffic_lights(self, location, radius):
+        """Indices of the traffic lights whose trigger volume reaches an actor of the given radius"""
+        if not len(self._trigger_radii):
+            return []
+        distances = np.linalg.norm(self._trigger_centres - (location.x, location.y, location.z), axis=1)
+        return np.flatnonzero(distances <= self._trigger_radii + radius).tolist()
@@ -0,0 +1,87 @@
+import os
+import errno
+import logging
+
+TICK_ROLE_AUTO = "auto"
+TICK_ROLE_MASTER = "master"
+TICK_ROLE_FOLLOWER = "follower"
+TICK_ROLES = (TICK_ROLE_AUTO, TICK_ROLE_MASTER, TICK_ROLE_FOLLOWER)
+
+
+class TickMaster(object):
+    """Decides which process steps the synchronous world. Only the master calls world.tick(), every other
+    process follows the server with world.wait_for_tick(). In auto mode the first process that creates
+    the shared lock file becomes the master, so the game client and generate_traffic.py never tick together."""
+
+    def __init__(self, role, lock_path, name, wait_timeout=10.0):
+        if role not in TICK_ROLES:
+            raise ValueError("Unknown tick role: {}".format(role))
+
+        self.name = name
+        self.lock_path = lock_path
+        self.wait_timeout = wait_timeout
+        self._owns_lock = False
+
+        if role == TICK_ROLE_MASTER:
+            self._acquire(force=True)
+            self.is_master = True
+        elif role == TICK_ROLE_FOLLOWER:
+            self.is_master = False
+        else:
+            self.is_master = self._acquire()
+
+        logging.info(
+            "Tick role of %s: %s (requested: %s, lock: %s)",
+            self.name, TICK_ROLE_MASTER if self.is_master else TICK_ROLE_FOLLOWER, role, self.lock_path
+        )
+
+    def _acquire(self, force=False):
+        """Creates the lock file with our pid. Returns False if a live process already holds it."""
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+                holder = self._read_holder()
+                if not force and holder is not None and self._is_alive(holder):
+                    logging.debug("Tick master lock held by pid %d", holder)
+                    return False
+                # Stale lock of a process that is gone, or the master role is forced
+                logging.debug("Taking over tick master lock from pid %s", holder)
+                os.remove(self.lock_path)
+                continue
+
+            with os.fdopen(fd, 'w') as lock_file:
+                lock_file.write("{} {}\n".format(os.getpid(), self.name))
+            self._owns_lock = True
+            return True
+
+        return False
+
+    def _read_holder(self):
+        try:
+            with open(self.lock_path) as lock_file:
+                return int(lock_file.read().split()[0])
+        except (OSError, IOError, ValueError, IndexError):
+            return None
+
+    @staticmethod
+    def _is_alive(pid):
+        try:
+            os.kill(pid, 0)
+        except OSError as e:
+            return e.errno == errno.EPERM
+        return True
+
+    def tick(self, world):
+        """Advances to the next simulation frame: steps the world as master, waits for it as follower"""
+        if self.is_master:
+            return world.tick()
+        return world.wait_for_tick(self.wait_timeout).frame
+
+    def release(self):
+        """Removes the lock file if this process still holds it"""
+        if self._owns_lock and self._read_holder() == os.getpid():
+            os.remove(self.lock_path)
+        self._owns_lock = False
@@ -0,0 +1,63 @@
+import logging
+import queue
+import threading
+
+from src.utils.process_placement import pin_current_thread
+
+
+class TickPipeline:
+    """Drives the synchronous Carla step from a worker thread, so the server computes frame N+1 while
+    the main thread renders frame N. At most one step is in flight and at most one finished frame is
+    waiting to be collected, which bounds the hand-off to a single frame."""
+
+    def __init__(self, carla_world, step, cpus=None):
+        self._world = carla_world
+        self._step = step  # Advances the world by one frame (tick as master, wait as follower)
+        self._cpus = cpus  # Keeps the waiting for the server off the cpus of the render thread
+        self._requests = queue.Queue()
+        self._results = queue.Queue(maxsize=1)
+        self._in_flight = False
+
+        self._thread = threading.Thread(target=self._run, name="carla-tick", daemon=True)
+        self._thread.start()
+        logging.debug("Tick pipeline started.")
+
+    def _run(self):
+        """Worker loop: steps the server and fetches everything the next frame needs from it"""
+        pin_current_thread(self._cpus, "tick thread")
+        while True:
+            request = self._requests.get()
+            if request is None:
+                break
+            try:
+                self._step()
+                # Fetch the snapshot here, so the main thread does not have to wait for the server while it renders
+                snapshot = self._world.get_snapshot()
+                self._results.put((snapshot, None))
+            except Exception as e:
+                self._results.put((None, e))
+
+    def submit(self):
+        """Starts the next server step unless one is already in flight"""
+        if self._in_flight:
+            return False
+        self._in_flight = True
+        self._requests.put(True)
+        return True
+
+    def collect(self, timeout=None):
+        """Waits for the step in flight and returns its world snapshot. Returns None if no step was
+        submitted. Errors raised in the worker are re-raised here."""
+        if not self._in_flight:
+            return None
+        snapshot, error = self._results.get(timeout=timeout)
+        self._in_flight = False
+        if error is not None:
+            raise error
+        return snapshot
+
+    def stop(self, timeout=5.0):
+        """Lets the step in flight finish and stops the worker"""
+        self._requests.put(None)
+        self._thread.join(timeout)
+        logging.debug("Tick pipeline stopped.")
@@ -0,0 +1,47 @@
+import math
+
+
+class TickSnapshot(object):
+    """Transforms and velocities of every actor in one simulation frame, read once from a carla.WorldSnapshot
+    so the game view, the game manager and the HUD do not query each actor separately"""
+
+    def __init__(self, snapshot):
+        self.frame = snapshot.frame
+        self.elapsed_seconds = snapshot.timestamp.elapsed_seconds
+
+        self.transforms = {}
+        self.velocities = {}
+        for actor_snapshot in snapshot:
+            self.transforms[actor_snapshot.id] = actor_snapshot.get_transform()
+            self.velocities[actor_snapshot.id] = actor_snapshot.get_velocity()
+
+    def __contains__(self, actor_id):
+        return actor_id in self.transforms
+
+    @property
+    def ids(self):
+        return self.transforms.keys()
+
+    def transform(self, actor_id):
+        """Transform of the actor, None if it is not part of this frame"""
+        return self.transforms.get(actor_id)
+
+    def location(self, actor_id):
+        transform = self.transforms.get(actor_id)
+        return transform.location if transform is not None else None
+
+    def velocity(self, actor_id):
+        return self.velocities.get(actor_id)
+
+    def speed(self, actor_id):
+        """Speed of the actor in m/s, 0 if it is not part of this frame"""
+        velocity = self.velocities.get(actor_id)
+        if velocity is None:
+            return 0.0
+        return math.sqrt(velocity.x ** 2 + velocity.y ** 2 + velocity.z ** 2)
+
+    def locations(self, actor_ids=None):
+        """Locations of the given actors, or of every actor of the frame"""
+        if actor_ids is None:
+            return [transform.location for transform in self.transforms.values()]
+        return [self.transforms[actor_id].location for actor_id in actor_ids if actor_id in self.transforms]
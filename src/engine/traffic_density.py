@@ -0,0 +1,135 @@
+import math
+import logging
+import numpy as np
+
+# The traffic manager only centres the hybrid physics on vehicles with this role name
+TRAFFIC_MANAGER_HERO_ROLE = 'hero'
+
+
+class TrafficDensityController(object):
+    """
+    Keeps a target number of traffic vehicles within a radius around the hero instead of spreading them over the
+    whole map. Vehicles that fell far behind or left the radius are destroyed, and new ones are spawned on free
+    spawn points ahead of the hero, a limited batch per update. The number of vehicles the server simulates stays
+    the same however far the hero drives.
+    """
+
+    def __init__(self, population, spawn_points, target, radius, behind_distance, min_spawn_distance,
+                 clearance, batch_size, interval):
+        self.population = population
+        self.target = target
+        self.radius = radius
+        self.behind_distance = behind_distance  # Vehicles behind the hero further than this are despawned
+        self.min_spawn_distance = min_spawn_distance  # New vehicles appear at least this far ahead
+        self.clearance = clearance  # No spawn point closer than this to another vehicle is used
+        self.batch_size = batch_size
+        self.interval = interval  # Simulation seconds between two updates
+
+        self.spawn_points = list(spawn_points)
+        self._spawn_positions = np.array(
+            [(point.location.x, point.location.y) for point in self.spawn_points], dtype=np.float64
+        ).reshape(-1, 2)
+
+        self._last_update = None
+        self._missing = set()  # Vehicles that were not part of the snapshot of the last update
+        self.spawned = 0
+        self.despawned = 0
+
+    def reset(self):
+        """Forgets the last update, e.g. after a reconnect to a restarted server whose clock started over"""
+        self._last_update = None
+        self._missing = set()
+
+    def enable_hybrid_physics(self, traffic_manager, role_name, radius):
+        """Lets the traffic manager teleport the vehicles outside the given radius instead of simulating their physics"""
+        if role_name != TRAFFIC_MANAGER_HERO_ROLE:
+            logging.warning(
+                "Hybrid physics needs the role name '%s', the hero is '%s', keeping full physics",
+                TRAFFIC_MANAGER_HERO_ROLE, role_name
+            )
+            return
+        traffic_manager.set_hybrid_physics_mode(True)
+        traffic_manager.set_hybrid_physics_radius(radius)
+        logging.debug("Traffic manager hybrid physics within %.0f m of the hero", radius)
+
+    def fill(self, hero_transform):
+        """Spawns the vehicles missing to the target anywhere within the radius, e.g. at the start"""
+        missing = self.target - len(self.population.vehicle_ids)
+        if missing <= 0:
+            return
+        points = self._free_spawn_points(hero_transform, {}, ahead_only=False)
+        self.spawned += len(self.population.spawn_vehicles(missing, points))
+
+    def update(self, hero_transform, snapshot):
+        """Despawns the vehicles that no longer matter and spawns new ones ahead, once per interval"""
+        if self._last_update is not None and snapshot.elapsed_seconds - self._last_update < self.interval:
+            return
+        self._last_update = snapshot.elapsed_seconds
+
+        locations = {}
+        missing = set()
+        for actor_id in self.population.vehicle_ids:
+            location = snapshot.location(actor_id)
+            if location is not None:
+                locations[actor_id] = location
+            else:
+                missing.add(actor_id)
+
+        # A vehicle can miss from a snapshot taken while it was spawned, twice in a row it was destroyed by someone else
+        far = list(missing & self._missing)
+        self._missing = missing - self._missing
+
+        # Despawn what fell far behind or left the radius
+        hero_location = hero_transform.location
+        forward = self._forward(hero_transform)
+        for actor_id, location in locations.items():
+            dx, dy = location.x - hero_location.x, location.y - hero_location.y
+            distance = math.hypot(dx, dy)
+            behind = dx * forward[0] + dy * forward[1] < 0.0
+            if distance > self.radius or (behind and distance > self.behind_distance):
+                far.append(actor_id)
+        if far:
+            self.population.despawn_vehicles(far)
+            self.despawned += len(far)
+            for actor_id in far:
+                locations.pop(actor_id, None)
+
+        # Spawn ahead, a batch at a time so a single update never stalls the server
+        missing = min(self.target - len(self.population.vehicle_ids), self.batch_size)
+        if missing > 0:
+            points = self._free_spawn_points(hero_transform, locations, ahead_only=True)
+            self.spawned += len(self.population.spawn_vehicles(missing, points))
+
+    def _free_spawn_points(self, hero_transform, locations, ahead_only):
+        """Spawn points within the radius, away from the hero and the other vehicles, optionally only ahead"""
+        if not self.spawn_points:
+            return []
+
+        hero = np.array((hero_transform.location.x, hero_transform.location.y))
+        offsets = self._spawn_positions - hero
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+
+        mask = (distances <= self.radius) & (distances >= self.clearance)
+        if ahead_only:
+            mask &= offsets.dot(self._forward(hero_transform)) > 0.0
+            mask &= distances >= self.min_spawn_distance
+
+        if locations:
+            vehicles = np.array([(location.x, location.y) for location in locations.values()])
+            candidates = np.flatnonzero(mask)
+            gaps = self._spawn_positions[candidates, None, :] - vehicles[None, :, :]
+            occupied = (np.hypot(gaps[..., 0], gaps[..., 1]) < self.clearance).any(axis=1)
+            mask[candidates[occupied]] = False
+
+        return [self.spawn_points[i] for i in np.flatnonzero(mask)]
+
+    @staticmethod
+    def _forward(transform):
+        yaw = math.radians(transform.rotation.yaw)
+        return np.array((math.cos(yaw), math.sin(yaw)))
+
+    def log_summary(self):
+        logging.info(
+            "Traffic density: %d vehicles within %.0f m, %d spawned, %d despawned",
+            len(self.population.vehicle_ids), self.radius, self.spawned, self.despawned
+        )
@@ -43,8 +43,16 @@ class TrafficLightSurfaces(object):
             tls.Unknown: make_surface(tls.Unknown)
         }
         self.surfaces = dict(self._original_surfaces)
+        self._last_rotozoom = None
+
+    def rotozoom(self, angle, scale, angle_step=0.0):
+        """Rotates and scales the traffic light surface. With an angle step, the angle is rounded to it
+        and the surfaces are only rotated again when the rounded angle or the scale changes."""
+        if angle_step > 0.0:
+            angle = round(angle / angle_step) * angle_step
+        if self._last_rotozoom == (angle, scale):
+            return
+        self._last_rotozoom = (angle, scale)
 
-    def rotozoom(self, angle, scale):
-        """Rotates and scales the traffic light surface"""
         for key, surface in self._original_surfaces.items():
             self.surfaces[key] = pygame.transform.rotozoom(surface, angle, scale)
\ No newline at end of file
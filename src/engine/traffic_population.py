@@ -0,0 +1,221 @@
+import logging
+import random
+import carla
+
+# Local imports
+from src.engine.command_batch import CommandBatch
+
+
+def get_actor_blueprints(world, filter, generation):
+    bps = world.get_blueprint_library().filter(filter)
+
+    if generation.lower() == "all":
+        return bps
+
+    # If the filter returns only one bp, we assume that this one needed
+    # and therefore, we ignore the generation
+    if len(bps) == 1:
+        return bps
+
+    try:
+        int_generation = int(generation)
+        # Check if generation is in available generations
+        if int_generation in [1, 2]:
+            bps = [x for x in bps if int(x.get_attribute('generation')) == int_generation]
+            return bps
+        else:
+            logging.warning("Actor generation %s is not valid. No actor will be spawned.", generation)
+            return []
+    except Exception:
+        logging.warning("Actor generation %s is not valid. No actor will be spawned.", generation)
+        return []
+
+
+class TrafficPopulation(object):
+    """
+    Background vehicles on the traffic manager autopilot and walkers with their AI controllers, spawned and
+    destroyed in batches over the connection of the caller. All random choices come from one seeded
+    generator, so the same seed spawns the same population. The walker controllers are started on the
+    first tick after they were spawned, when their walkers have a transform.
+    """
+
+    def __init__(self, client, carla_world, traffic_manager, seed=None, safe=True,
+                 vehicle_filter='vehicle.*', vehicle_generation='All',
+                 walker_filter='walker.pedestrian.*', walker_generation='2'):
+        self.client = client
+        self.world = carla_world
+        self.traffic_manager = traffic_manager
+        self.seed = seed
+        self.random = random.Random(seed)
+
+        self.vehicle_ids = []
+        self.walker_ids = []
+        self.controller_ids = []  # Walker controller of the walker at the same index
+        self._walker_speeds = {}
+        self._pending_controllers = []  # Controllers spawned since the last tick, not started yet
+
+        if seed is not None:
+            self.traffic_manager.set_random_device_seed(seed)
+            self.world.set_pedestrians_seed(seed)
+
+        blueprints = get_actor_blueprints(carla_world, vehicle_filter, vehicle_generation)
+        if safe:
+            # Motorcycles and bicycles are prone to accidents
+            blueprints = [x for x in blueprints if x.get_attribute('base_type') == 'car']
+        self.vehicle_blueprints = sorted(blueprints, key=lambda bp: bp.id)
+        self.walker_blueprints = sorted(get_actor_blueprints(carla_world, walker_filter, walker_generation), key=lambda bp: bp.id)
+        self.walker_controller_blueprint = carla_world.get_blueprint_library().find('controller.ai.walker')
+
+    def __len__(self):
+        return len(self.vehicle_ids) + len(self.walker_ids)
+
+    def populate(self, vehicles, walkers, spawn_points=None):
+        """Spawns the vehicles and walkers missing to reach the given numbers"""
+        self.spawn_vehicles(vehicles - len(self.vehicle_ids), spawn_points)
+        self.spawn_walkers(walkers - len(self.walker_ids))
+
+    def reconnect(self, client, carla_world, traffic_manager):
+        """Follows a new connection and forgets the actors that did not survive on the server"""
+        self.client = client
+        self.world = carla_world
+        self.traffic_manager = traffic_manager
+
+        alive = set(actor.id for actor in carla_world.get_actors(self.vehicle_ids + self.walker_ids + self.controller_ids))
+        self.vehicle_ids = [actor_id for actor_id in self.vehicle_ids if actor_id in alive]
+        walkers = [(walker_id, controller_id) for walker_id, controller_id in zip(self.walker_ids, self.controller_ids)
+                   if walker_id in alive and controller_id in alive]
+        self.walker_ids = [walker_id for walker_id, _ in walkers]
+        self.controller_ids = [controller_id for _, controller_id in walkers]
+        self._pending_controllers = [pending for pending in self._pending_controllers if pending[0] in alive]
+        logging.debug("Traffic after reconnecting: %d vehicles, %d walkers", len(self.vehicle_ids), len(self.walker_ids))
+
+    def spawn_vehicles(self, count, spawn_points=None, hero_role_name=None):
+        """
+        Spawns up to count vehicles on free spawn points of the map in one batch, handed to the traffic manager.
+        The first vehicle gets the hero role name if one is given. Returns the ids of the new vehicles.
+        """
+        if count <= 0 or not self.vehicle_blueprints:
+            return []
+        if spawn_points is None:
+            spawn_points = self.world.get_map().get_spawn_points()
+        spawn_points = list(spawn_points)
+        self.random.shuffle(spawn_points)
+        if count > len(spawn_points):
+            logging.warning("Requested %d vehicles, but could only find %d spawn points", count, len(spawn_points))
+
+        batch = CommandBatch(self.client)
+        for transform in spawn_points[:count]:
+            blueprint = self.random.choice(self.vehicle_blueprints)
+            if blueprint.has_attribute('color'):
+                blueprint.set_attribute('color', self.random.choice(blueprint.get_attribute('color').recommended_values))
+            if blueprint.has_attribute('driver_id'):
+                blueprint.set_attribute('driver_id', self.random.choice(blueprint.get_attribute('driver_id').recommended_values))
+            if hero_role_name is not None:
+                blueprint.set_attribute('role_name', hero_role_name)
+                hero_role_name = None
+            else:
+                blueprint.set_attribute('role_name', 'autopilot')
+            batch.spawn(blueprint, transform, autopilot_port=self.traffic_manager.get_port())
+
+        spawned = [response.actor_id for response in batch.apply() if not response.error]
+        self.vehicle_ids.extend(spawned)
+        logging.debug("Spawned %d traffic vehicles.", len(spawned))
+        return spawned
+
+    def despawn_vehicles(self, actor_ids, batch=None):
+        """Destroys some of the vehicles, in one batch or added to the given one"""
+        apply = batch is None
+        if batch is None:
+            batch = CommandBatch(self.client)
+
+        removed = set(actor_ids)
+        for actor_id in removed:
+            batch.destroy(actor_id)
+        self.vehicle_ids = [actor_id for actor_id in self.vehicle_ids if actor_id not in removed]
+
+        if apply:
+            batch.apply()
+
+    def spawn_walkers(self, count, running=0.0):
+        """
+        Spawns up to count walkers on random navigation points, then their controllers, one batch each.
+        Returns the ids of the new walkers.
+        """
+        if count <= 0 or not self.walker_blueprints:
+            return []
+
+        batch = CommandBatch(self.client)
+        speeds = []
+        for _ in range(count):
+            location = self.world.get_random_location_from_navigation()
+            if location is None:
+                continue
+            walker_bp = self.random.choice(self.walker_blueprints)
+            # set as not invincible
+            if walker_bp.has_attribute('is_invincible'):
+                walker_bp.set_attribute('is_invincible', 'false')
+            # walking or running max speed
+            if walker_bp.has_attribute('speed'):
+                speed_index = 2 if self.random.random() < running else 1
+                speeds.append(float(walker_bp.get_attribute('speed').recommended_values[speed_index]))
+            else:
+                speeds.append(0.0)
+            batch.spawn(walker_bp, carla.Transform(location))
+
+        walker_ids = []
+        for response, speed in zip(batch.apply(), speeds):
+            if not response.error:
+                walker_ids.append(response.actor_id)
+                self._walker_speeds[response.actor_id] = speed
+
+        for walker_id in walker_ids:
+            batch.spawn(self.walker_controller_blueprint, carla.Transform(), parent=walker_id)
+        for walker_id, response in zip(walker_ids, batch.apply()):
+            if response.error:
+                # A walker without a controller would only stand in the way
+                batch.destroy(walker_id)
+                continue
+            self.walker_ids.append(walker_id)
+            self.controller_ids.append(response.actor_id)
+            self._pending_controllers.append((response.actor_id, walker_id))
+        batch.apply()
+
+        logging.debug("Spawned %d traffic walkers.", len(self._pending_controllers))
+        return walker_ids
+
+    def tick(self, crossing=0.0):
+        """Starts the walker controllers spawned since the last tick and sends them to a random destination"""
+        if not self._pending_controllers:
+            return
+
+        self.world.set_pedestrians_cross_factor(crossing)
+        pending, self._pending_controllers = self._pending_controllers, []
+        controllers = self.world.get_actors([controller_id for controller_id, _ in pending])
+        for controller, (_, walker_id) in zip(controllers, pending):
+            controller.start()
+            controller.go_to_location(self.world.get_random_location_from_navigation())
+            controller.set_max_speed(self._walker_speeds.get(walker_id, 1.4))
+
+    def destroy(self, batch=None):
+        """Stops the walker controllers and destroys the whole population, in one batch or added to the given one"""
+        apply = batch is None
+        if batch is None:
+            batch = CommandBatch(self.client)
+
+        started = set(self.controller_ids) - set(controller_id for controller_id, _ in self._pending_controllers)
+        if started:
+            for controller in self.world.get_actors(list(started)):
+                controller.stop()
+
+        logging.debug("Destroying %d traffic vehicles and %d walkers", len(self.vehicle_ids), len(self.walker_ids))
+        for actor_id in self.controller_ids + self.walker_ids + self.vehicle_ids:
+            batch.destroy(actor_id)
+
+        self.vehicle_ids = []
+        self.walker_ids = []
+        self.controller_ids = []
+        self._walker_speeds = {}
+        self._pending_controllers = []
+
+        if apply:
+            batch.apply()
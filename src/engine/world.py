@@ -6,12 +6,27 @@ import pygame
 
 # Local imports
 from src.utils.exit_game import exit_game
-from src.core.constants import CARLA_VEHICLE, HERO_SPAWN_TRANSFORM, FONT_REGULAR_PATH
+from src.core.constants import (
+    CARLA_VEHICLE,
+    HERO_SPAWN_TRANSFORM,
+    FONT_REGULAR_PATH,
+    TRAFFIC_HERO_CLEARANCE,
+    TRAFFIC_DISTANCE_TO_LEADING_VEHICLE,
+    TRAFFIC_SPEED_DIFFERENCE,
+    TRAFFIC_BEHIND_DISTANCE,
+    TRAFFIC_MIN_SPAWN_DISTANCE,
+    TRAFFIC_SPAWN_BATCH,
+    TRAFFIC_UPDATE_INTERVAL,
+    TRAFFIC_HYBRID_RADIUS
+)
 from src.utils.find_weather_presets import find_weather_presets
 from src.engine.sensor.collision_sensor import CollisionSensor
 from src.engine.sensor.lane_invasion_sensor import LaneInvasionSensor
 from src.engine.sensor.gnss_sensor import GnssSensor
 from src.engine.sensor.sensor_camera import SensorCamera
+from src.engine.command_batch import CommandBatch
+from src.engine.traffic_population import TrafficPopulation
+from src.engine.traffic_density import TrafficDensityController
 
 class World():
     def __init__(self, client, carla_world, args):
@@ -32,6 +47,7 @@ class World():
             exit_game(1)
 
         self.player = None
+        self.external_player = False  # Player created by another client, not destroyed on exit
 
         self.trafficmanager = None
         self.collision_sensor = None
@@ -42,6 +58,9 @@ class World():
         self.weather_index = 0
 
         self.traffic_lights = None
+        self.snapshot = None  # TickSnapshot of the last tick
+        self.traffic = None  # Background traffic spawned over our own connection
+        self.traffic_density = None  # Keeps the traffic around the player with --traffic-radius
 
         logging.debug("Loading world with role name: %s", self.actor_role_name)
 
@@ -63,26 +82,40 @@ class World():
         )
     
         self.restart()
+        self._spawn_traffic()
 
     def restart(self):
 
         self.world.set_weather(self.weather)
 
-        cam_index = self.sensor_camera.index if self.sensor_camera is not None else 0
-        cam_pos_index = self.sensor_camera.transform_index if self.sensor_camera is not None else 0
-
         self.player_max_speed = 1.589
         self.player_max_speed_fast = 3.713
 
-        # Remove all actors with the role_name == self.actor_role_name
+        # Attach to an existing hero instead of replacing it
+        if self.player is None and self.args.externalActor and self._attach_player():
+            return
+
+        # Respawn at the current position of the player, read before it is destroyed
+        respawn_point = None
+        if self.player is not None:
+            respawn_point = self.player.get_transform()
+            respawn_point.location.z += 2.0
+            respawn_point.rotation.roll = 0.0
+            respawn_point.rotation.pitch = 0.0
+
+        # Remove all actors with the role_name == self.actor_role_name, in one round trip
+        batch = CommandBatch(self.client)
         actors = self.world.get_actors().filter('vehicle.*')
         for actor in actors:
             if actor.attributes.get('role_name') == self.actor_role_name:
                 logging.debug("Destroying existing actor with role name: %s", self.actor_role_name)
-                actor.destroy()
+                batch.destroy(actor)
             if actor.attributes.get('base_type') == 'motorcycle' or actor.attributes.get('base_type') == 'bicycle':
                 logging.debug("Destroying existing motorcycle/bicycle actor: %s", actor.id)
-                actor.destroy()
+                batch.destroy(actor)
+        if self.player is not None:
+            self._destroy_player(batch)
+        batch.apply()
 
         blueprint = self.world.get_blueprint_library().find(CARLA_VEHICLE)
         logging.debug("Spawning vehicle with blueprint: %s", blueprint.id)
@@ -96,13 +129,8 @@ class World():
         if blueprint.has_attribute('is_invincible'):
             blueprint.set_attribute('is_invincible', 'true')
         # Spawn the player.
-        if self.player is not None:
-            spawn_point = self.player.get_transform()
-            spawn_point.location.z += 2.0
-            spawn_point.rotation.roll = 0.0
-            spawn_point.rotation.pitch = 0.0
-            self.destroy()
-            self.player = self.world.try_spawn_actor(blueprint, spawn_point)
+        if respawn_point is not None:
+            self.player = self.world.try_spawn_actor(blueprint, respawn_point)
             self.show_vehicle_telemetry = False
             self.modify_vehicle_physics(self.player)
         
@@ -131,6 +159,82 @@ class World():
             self.show_vehicle_telemetry = False
             self.modify_vehicle_physics(self.player)
 
+        self.external_player = False
+        self._setup_player()
+
+    def _attach_player(self):
+        """
+        Reuses a hero vehicle with our role name that already exists in the world.
+        Returns False if there is none.
+        """
+        actor = self._find_player()
+        if actor is None:
+            logging.debug("No existing hero with role name %s, spawning one", self.actor_role_name)
+            return False
+
+        self.player = actor
+        self.external_player = True
+        logging.info("Attached to existing hero %s (%d)", actor.type_id, actor.id)
+        self._setup_player()
+        return True
+
+    def _find_player(self):
+        """
+        Returns the hero vehicle with our role name in the world, None if there is none.
+        """
+        for actor in self.world.get_actors().filter('vehicle.*'):
+            if actor.attributes.get('role_name') == self.actor_role_name:
+                return actor
+        return None
+
+    def reconnect(self, client, carla_world, town_map):
+        """
+        Resumes on a new connection. The hero is resolved again by its role name and the sensors are
+        spawned again, since their streams ended with the old client. A hero lost with a restarted server
+        is spawned again.
+        """
+        stale_sensors = [
+            sensor.sensor for sensor in (
+                self.sensor_camera, self.collision_sensor, self.lane_invasion_sensor, self.gnss_sensor
+            ) if sensor is not None and sensor.sensor is not None
+        ]
+
+        self.client = client
+        self.world = carla_world
+        self.map = town_map
+        self.world.set_weather(self.weather)
+
+        # Sensors left on a server that only stalled would keep streaming to nobody
+        batch = CommandBatch(self.client)
+        for sensor in stale_sensors:
+            batch.destroy(sensor.id)
+        batch.apply()
+
+        player = self._find_player()
+        if player is None:
+            logging.warning("The hero %s is gone after reconnecting, spawning a new one", self.actor_role_name)
+            self.player = None
+            self.external_player = False
+            self.restart()
+        else:
+            self.player = player
+            self._setup_player()
+            logging.info("Resumed with hero %s (%d)", player.type_id, player.id)
+
+        # Either way the traffic follows the new connection and traffic manager, and is topped up again
+        if self.traffic is not None:
+            self.traffic.reconnect(self.client, self.world, self.trafficmanager)
+            if self.traffic_density is not None:
+                self.traffic_density.reset()
+            self._spawn_traffic()
+
+    def _setup_player(self):
+        """
+        Sets up the traffic manager and the sensors of the player.
+        """
+        cam_index = self.sensor_camera.index if self.sensor_camera is not None else 0
+        cam_pos_index = self.sensor_camera.transform_index if self.sensor_camera is not None else 0
+
         self.trafficmanager = self.client.get_trafficmanager(8000)
         self.trafficmanager.set_synchronous_mode(self.args.sync)
 
@@ -147,6 +251,44 @@ class World():
 
         logging.debug("Player spawned successfully: %s", self.player.id)
 
+    def _spawn_traffic(self):
+        """
+        Spawns the requested background traffic in-process, on our connection and our ticks.
+        """
+        if not self.args.traffic_vehicles and not self.args.traffic_walkers:
+            return
+
+        # A restarted server comes with a fresh traffic manager, so its settings are applied every time
+        self.trafficmanager.set_global_distance_to_leading_vehicle(TRAFFIC_DISTANCE_TO_LEADING_VEHICLE)
+        self.trafficmanager.global_percentage_speed_difference(TRAFFIC_SPEED_DIFFERENCE)
+
+        if self.traffic is None:
+            self.traffic = TrafficPopulation(self.client, self.world, self.trafficmanager, self.args.traffic_seed)
+            if self.args.traffic_radius > 0:
+                self.traffic_density = TrafficDensityController(
+                    self.traffic, self.map.get_spawn_points(), self.args.traffic_vehicles, self.args.traffic_radius,
+                    TRAFFIC_BEHIND_DISTANCE, TRAFFIC_MIN_SPAWN_DISTANCE, TRAFFIC_HERO_CLEARANCE,
+                    TRAFFIC_SPAWN_BATCH, TRAFFIC_UPDATE_INTERVAL
+                )
+
+        if self.traffic_density is not None:
+            self.traffic_density.enable_hybrid_physics(self.trafficmanager, self.actor_role_name, TRAFFIC_HYBRID_RADIUS)
+            self.traffic_density.fill(self.player.get_transform())
+            self.traffic.populate(0, self.args.traffic_walkers)
+        else:
+            self.traffic.populate(self.args.traffic_vehicles, self.args.traffic_walkers, self._free_spawn_points())
+        logging.info("Traffic: %d vehicles, %d walkers", len(self.traffic.vehicle_ids), len(self.traffic.walker_ids))
+
+    def _free_spawn_points(self):
+        """
+        Spawn points of the map that are not too close to the player.
+        """
+        spawn_points = self.map.get_spawn_points()
+        if self.player is None:
+            return spawn_points
+        player_location = self.player.get_location()
+        return [point for point in spawn_points if point.location.distance(player_location) > TRAFFIC_HERO_CLEARANCE]
+
     def modify_vehicle_physics(self, actor):
         #If actor is not a vehicle, we cannot use the physics control
         try:
@@ -156,11 +298,15 @@ class World():
         except Exception:
             pass
 
-    def tick(self):
+    def tick(self, snapshot=None):
         """
         Update the world and all actors.
         """
-        pass
+        self.snapshot = snapshot
+        if self.traffic is not None:
+            self.traffic.tick()
+        if self.traffic_density is not None and snapshot is not None and self.player.id in snapshot:
+            self.traffic_density.update(snapshot.transform(self.player.id), snapshot)
         # <3
         # if self.player is None or not hasattr(self.player, "get_location"):
         #     return
@@ -241,8 +387,11 @@ class World():
         Render the speedometer for the player vehicle.
         """
         if self.player is not None and hasattr(self.player, 'get_velocity'):
-            velocity = self.player.get_velocity()
-            speed = (velocity.x**2 + velocity.y**2 + velocity.z**2)**0.5 * 3.6 # Convert m/s to km/h
+            if self.snapshot is not None and self.player.id in self.snapshot:
+                speed = self.snapshot.speed(self.player.id) * 3.6 # Convert m/s to km/h
+            else:
+                velocity = self.player.get_velocity()
+                speed = (velocity.x**2 + velocity.y**2 + velocity.z**2)**0.5 * 3.6 # Convert m/s to km/h
             speed_text = f"{int(speed)} km/h"
             font_size = 32
             font = pygame.font.Font(FONT_REGULAR_PATH, font_size)
@@ -264,23 +413,61 @@ class World():
                 spawn_point = waypoint.transform if waypoint else carla.Transform(target_location)
                 spawn_point.location.z += 0.5
 
-                # Remove vehicles near the respawn point
+                # Remove vehicles near the respawn point and move the player in one round trip
                 radius = 5.0  # meters, adjust as needed
+                batch = CommandBatch(self.client)
                 actors = self.world.get_actors().filter('vehicle.*')
                 for actor in actors:
                     if actor.id != self.player.id:
-                        distance = actor.get_location().distance(spawn_point.location)
+                        location = self.snapshot.location(actor.id) if self.snapshot is not None else None
+                        if location is None:
+                            location = actor.get_location()
+                        distance = location.distance(spawn_point.location)
                         if distance < radius:
                             logging.debug(f"Destroying vehicle {actor.id} at distance {distance:.2f}m from respawn point.")
-                            actor.destroy()
+                            batch.destroy(actor)
 
-                self.player.set_transform(spawn_point)
+                batch.apply_transform(self.player, spawn_point)
+                batch.apply()
         else:
             logging.warning("No player vehicle to respawn.")
 
-    def destroy(self):
+    def set_traffic_lights_state(self, state, light_id=None):
+        """
+        Sets the state of all traffic lights, or only of the one with the given id.
+        Traffic lights have no batch command, so lights already in the state are skipped instead.
+        """
+        changed = 0
+        for light in self.traffic_lights:
+            if light_id is not None and light.id != light_id:
+                continue
+            if light.state == state:
+                continue
+            light.set_state(state)
+            changed += 1
+        logging.debug("Traffic lights set to %s: %d changed", state, changed)
+        return changed
+
+    def destroy(self, batch=None):
+        """
+        Clean up the world and all actors. The actors are destroyed in one batch, or added to the given one.
+        """
+        apply = batch is None
+        if batch is None:
+            batch = CommandBatch(self.client)
+
+        if self.traffic_density is not None:
+            self.traffic_density.log_summary()
+        if self.traffic is not None:
+            self.traffic.destroy(batch)
+        self._destroy_player(batch)
+
+        if apply:
+            batch.apply()
+
+    def _destroy_player(self, batch):
         """
-        Clean up the world and all actors.
+        Adds the sensors and the player to the batch, the player only if we spawned it.
         """
         sensors = [
             self.sensor_camera.sensor,
@@ -291,7 +478,7 @@ class World():
 
         for sensor in sensors:
             if sensor:
-                sensor.destroy()
+                batch.destroy_sensor(sensor)
 
-        if self.player:
-            self.player.destroy()
\ No newline at end of file
+        if self.player and not self.external_player:
+            batch.destroy(self.player)
\ No newline at end of file
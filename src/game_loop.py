@@ -1,7 +1,7 @@
 import pygame
 import logging
 import os
-import carla
+import time
 import traceback
 
 # Local imports
@@ -9,12 +9,37 @@ from src.views.game_view import GameView
 from src.data.game_manager import GameManager
 from src.data.game_state import GameState
 from src.core.colors import COLOR_AQUAMARINE
-from src.core.constants import TITLE_WORLD, FONT_REGULAR_PATH
+from src.core.constants import (
+    TITLE_WORLD,
+    FONT_REGULAR_PATH,
+    MAX_CATCH_UP_STEPS,
+    JITTER_REPORT_INTERVAL,
+    TICK_MASTER_LOCK_PATH,
+    GC_FULL_THRESHOLD,
+    GC_IDLE_INTERVAL,
+    RPC_PROFILE_TOP_N,
+    CARLA_CLIENT_TIMEOUT,
+    RECONNECT_MAX_BACKOFF
+)
 from src.engine.sensor.input_control import InputControl
 from src.engine.world import World
+from src.engine.carla_connection import CarlaConnection
+from src.engine.lane_graph import LaneGraph
+from src.engine.map_matcher import MapMatcher
+from src.engine.frame_scheduler import FrameScheduler
+from src.engine.tick_pipeline import TickPipeline
+from src.engine.frame_limiter import FrameLimiter
+from src.engine.tick_master import TickMaster
+from src.engine.quality_governor import QualityGovernor
+from src.engine.gc_controller import GCController
+from src.engine.hitch_detector import HitchDetector
 from src.data.sound_mixer import SoundMixer
 from src.data.sounds import Sounds
+from src.data.game_clock import GameClock, GAME_CLOCK_SIMULATION
 from src.sessions.lanerunner_logger import LaneRunnerLogger
+from src.sessions.session_recorder import SessionRecorder
+from src.utils.frame_dumper import FrameDumper
+from src.utils.rpc_profiler import RpcProfiler
 
 def game_loop(args):
     """
@@ -24,9 +49,24 @@ def game_loop(args):
     logging.debug("Game loop started with arguments: %s", args)
 
     world = None
+    scheduler = None
+    tick_pipeline = None
+    frame_limiter = None
+    tick_master = None
+    quality_governor = None
+    gc_controller = None
+    hitch_detector = None
+    map_matcher = None
     lanerunner_logger = LaneRunnerLogger()
+    rpc_profiler = RpcProfiler.instance()
 
     try:
+        if args.headless:
+            # Render offscreen, so the full render path also runs on machines without a display
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+            logging.debug("Headless mode: SDL video driver %s", os.environ["SDL_VIDEODRIVER"])
+
         # Here you would implement the main game logic
         # For example, connecting to the Carla server, spawning vehicles, etc.
         pygame.init()
@@ -46,7 +86,7 @@ def game_loop(args):
         # Initialize the display
         display = pygame.display.set_mode(
             (args.width, args.height),
-            pygame.HWSURFACE | pygame.DOUBLEBUF
+            0 if args.headless else pygame.HWSURFACE | pygame.DOUBLEBUF
         )
         pygame.display.set_caption(args.description)
 
@@ -80,20 +120,26 @@ def game_loop(args):
         display.blit(text_surface, text_surface.get_rect(center=(args.width // 2, args.height // 2)))
         pygame.display.flip()
 
+        connection = CarlaConnection(
+            args.host, args.port, CARLA_CLIENT_TIMEOUT,
+            args.reconnect_attempts, args.reconnect_backoff, RECONNECT_MAX_BACKOFF
+        )
         try:
-            client = carla.Client(args.host, args.port)
-            client.set_timeout(2.0)  # Set a timeout for the connection
+            client = connection.connect()
+
+            if args.profile_rpc:
+                # Every world, map, actor and waypoint obtained through the client is counted as well
+                rpc_profiler.enable(RPC_PROFILE_TOP_N)
+                client = rpc_profiler.wrap(client)
         except Exception as e:
             logging.error("Failed to connect to Carla server: %s", e)
             return
         
         logging.debug("Connected to Carla server at %s:%d", args.host, args.port)
 
-        # Load the specified map
+        # Load the specified map, or attach to the running world if it already has it
         try:
-            carla_world = client.load_world(args.map)
-            town_map = carla_world.get_map()
-            logging.debug("Loaded map: %s", args.map)
+            carla_world, town_map = attach_world(client, args.map, args.reload_world)
         except Exception as e:
             logging.error("Failed to load map %s: %s", args.map, e)
             return
@@ -105,75 +151,159 @@ def game_loop(args):
         game_view = GameView(args)
         input_control = InputControl(TITLE_WORLD, world, args.autopilot, lanerunner_logger)
 
+        if args.record:
+            lanerunner_logger.set_recorder(SessionRecorder(world, args.record_dir))
+            logging.debug("Sessions are recorded to %s", args.record_dir)
+
+        # Game timers read the game clock, so select its time source before the game starts
+        game_clock = GameClock.instance()
+        game_clock.set_mode(args.game_clock)
+        logging.debug("Game clock: %s", args.game_clock)
+
         game_manager = GameManager()
 
-        game_view.start(input_control, carla_world, town_map, game_manager)
+        # The render budget is one frame of the render rate
+        quality_governor = QualityGovernor(args.quality, 1.0 / args.render_fps)
+        logging.debug("Render quality: %s, starting at %s", args.quality, quality_governor.level.name)
+
+        game_view.start(input_control, carla_world, town_map, game_manager, quality_governor)
 
-        hero_wp = town_map.get_waypoint(game_view.hero_transform.location)
-        game_manager.start(hero_wp)
+        # Built once per map and cached under the OpenDRIVE hash of the map image
+        lane_graph = LaneGraph.for_map(town_map, game_view.map_image.opendrive_hash)
+        map_matcher = MapMatcher(lane_graph)
+
+        hero_wp = match_hero(map_matcher, town_map, game_view.hero_transform)
+        game_manager.start(hero_wp, lane_graph)
 
         input_control.start(game_manager)
 
-        settings = carla_world.get_settings()
-        settings.synchronous_mode = args.sync
+        # Only one process may step the synchronous world, the others follow it
+        tick_master = TickMaster(args.tick_role, TICK_MASTER_LOCK_PATH, "client")
 
-        carla_world.apply_settings(settings)
-        logging.debug("Game settings applied: Synchronous mode = %s", args.sync)
+        if tick_master.is_master:
+            apply_world_settings(carla_world, args)
+        else:
+            logging.debug("Following the world ticks of another tick master, settings left untouched.")
 
         # Main Game Loop
-        clock = pygame.time.Clock()
+        scheduler = FrameScheduler(args.sim_fps, args.logic_fps, args.render_fps, MAX_CATCH_UP_STEPS)
+        frame_limiter = FrameLimiter(args.frame_limiter, scheduler.loop_fps, args.limiter_spin_ms, JITTER_REPORT_INTERVAL)
+        logging.debug("Frame limiter: %s at %.1f FPS", args.frame_limiter, scheduler.loop_fps)
+        current_wp = hero_wp
+
+        if args.pipelined:
+            tick_pipeline = TickPipeline(carla_world, lambda: tick_master.tick(carla_world), args.tick_cpus)
+            logging.debug("Pipelined frame loop enabled.")
+
+        # Everything allocated so far lives for the whole game
+        gc_controller = GCController(args.gc_mode, GC_FULL_THRESHOLD, GC_IDLE_INTERVAL)
+        gc_controller.start()
+        hitch_threshold = args.hitch_threshold_ms / 1000.0 if args.hitch_threshold_ms else 1.0 / scheduler.loop_fps
+        hitch_detector = HitchDetector(hitch_threshold, gc_controller)
+        frame_dumper = FrameDumper(args.dump_dir, args.dump_frames)
+
+        def resume(new_client):
+            """Restores the game on a new connection, the game manager and the session logger are kept"""
+            new_client = rpc_profiler.wrap(new_client)
+            new_world, new_map = attach_world(new_client, args.map)
+            if tick_master.is_master:
+                apply_world_settings(new_world, args)
+            world.reconnect(new_client, new_world, new_map)
+            game_view.reconnect(new_world, new_map)
+            input_control.reapply_autopilot()
+            map_matcher.reset()
+            return new_client, new_world, new_map
 
         while True:
-            clock.tick_busy_loop(60)  # Limit to 60 FPS
-
-            carla_world.tick()
-            game_view.tick()
-            world.tick()
-
-            current_wp = town_map.get_waypoint(game_view.hero_transform.location)
-            
-            # Handle eventsgst
-            if input_control.parse_events(clock, current_wp):
-                return
-
-            
-            # Render all modules
-            world.render(display)
-            lanerunner_logger.render_recording_status(display)
-
-            # Clear overlay before drawing
-            overlay_surface.fill((0, 0, 0, 0))  # Transparent fill
-
-            game_state = game_manager.get_state()
-
-            if game_state == GameState.MANUAL_DRIVING:
-                pass
-            elif game_state == GameState.STARTING:
-                delta_time = clock.tick_busy_loop(60) / 1000.0  # Convert milliseconds to seconds
-                if game_manager.has_gamified_active:
-                    game_manager.update_starting(delta_time, current_wp)
-                    game_manager.draw_starting(overlay_surface)
-            elif game_state == GameState.IN_GAME:
-                if game_manager.has_gamified_active:
-                    game_view.render(overlay_surface)
-                    game_view.update(current_wp)
-                    game_manager.draw_coin_counter(overlay_surface)
-                    game_manager.draw_live_counter(overlay_surface)
-            elif game_state == GameState.PAUSED:
-                game_manager.draw_pause_menu(overlay_surface)
-            elif game_state == GameState.TAKEOVER_REQUESTING:
-                delta_time = clock.tick_busy_loop(60) / 1000.0  # Convert milliseconds to seconds
-                game_manager.update_takeover(delta_time)
-                game_manager.draw_takeover_request(overlay_surface)
-            elif game_state == GameState.GAME_OVER:
-                game_manager.draw_game_over_menu(overlay_surface)
-            elif game_state == GameState.END_GAME:
-                game_manager.draw_victory_menu(overlay_surface)
-
-            # Blit the overlay onto the main display
-            display.blit(overlay_surface, overlay_rect)
-
-            pygame.display.flip()
+            try:
+                frame_limiter.wait()
+                frame_start = time.perf_counter()
+                game_clock.tick()
+
+                # In simulation clock mode the game logic follows the simulation time, not the wall time
+                if args.game_clock == GAME_CLOCK_SIMULATION:
+                    scheduler.advance(game_now=game_clock.seconds())
+                else:
+                    scheduler.advance()
+
+                # Simulation step, every iteration when the loop is paced by the server
+                if scheduler.simulation.consume() or frame_limiter.paced_by_server:
+                    with scheduler.simulation.timed():
+                        if tick_pipeline is not None:
+                            # Collect frame N and let the server step frame N+1 while frame N is rendered
+                            snapshot = tick_pipeline.collect()
+                            tick_pipeline.submit()
+                            game_view.tick(snapshot)
+                        else:
+                            tick_master.tick(carla_world)
+                            game_view.tick()
+                        world.tick(game_view.snapshot)
+
+                        current_wp = match_hero(map_matcher, town_map, game_view.hero_transform)
+
+                # Handle events
+                if input_control.parse_events(game_clock, current_wp):
+                    return
+
+                # Game logic
+                logic_steps = scheduler.logic.consume()
+                if logic_steps:
+                    with scheduler.logic.timed():
+                        for _ in range(logic_steps):
+                            update_game_logic(game_manager, game_view, scheduler.logic.interval, current_wp)
+
+                # Render all modules
+                if scheduler.render.consume():
+                    with scheduler.render.timed():
+                        world.render(display)
+                        lanerunner_logger.render_recording_status(display)
+
+                        # Clear overlay before drawing
+                        overlay_surface.fill((0, 0, 0, 0))  # Transparent fill
+
+                        # Fraction of the simulation step elapsed since the last tick, for render interpolation
+                        alpha = 1.0 if frame_limiter.paced_by_server else scheduler.simulation.alpha
+                        render_overlay(game_manager, game_view, overlay_surface, alpha)
+
+                        # Blit the overlay onto the main display
+                        display.blit(overlay_surface, overlay_rect)
+
+                        pygame.display.flip()
+
+                    quality_governor.observe(scheduler.render.last_cost)
+                    frame_dumper.dump(display)
+
+                    # Unattended runs stop by themselves
+                    if args.max_frames and frame_dumper.frames >= args.max_frames:
+                        logging.info("Rendered %d frames, stopping.", frame_dumper.frames)
+                        return
+
+                game_state = game_manager.get_state()
+                hitch_detector.on_frame(time.perf_counter() - frame_start, game_state)
+                gc_controller.on_frame(game_state)
+                rpc_profiler.end_frame()
+
+            except RuntimeError as e:
+                # Only a server that stopped answering is recovered, everything else ends the game below
+                if not CarlaConnection.is_connection_error(e) or connection.attempts <= 0:
+                    raise
+                logging.warning("Lost the Carla server: %s", e)
+
+                # A step in flight belongs to the old connection
+                if tick_pipeline is not None:
+                    tick_pipeline.stop(timeout=CARLA_CLIENT_TIMEOUT)
+                    tick_pipeline = None
+
+                # Keep showing the last rendered frame while reconnecting
+                held_frame = display.copy()
+                client, carla_world, town_map = connection.reconnect(
+                    lambda attempt: render_reconnecting(display, held_frame, attempt, connection.attempts),
+                    resume
+                )
+
+                if args.pipelined:
+                    tick_pipeline = TickPipeline(carla_world, lambda: tick_master.tick(carla_world), args.tick_cpus)
+                current_wp = match_hero(map_matcher, town_map, game_view.hero_transform)
 
     # Handle Errors
     except pygame.error as e:
@@ -192,8 +322,142 @@ def game_loop(args):
             logging.error("An error occurred in the game loop: %s", e)
     finally:
 
+        if tick_pipeline is not None:
+            tick_pipeline.stop()
+
+        if tick_master is not None:
+            tick_master.release()
+
+        if scheduler is not None:
+            scheduler.log_summary()
+
+        if frame_limiter is not None:
+            frame_limiter.log_jitter()
+
+        if quality_governor is not None:
+            quality_governor.log_summary()
+
+        if hitch_detector is not None:
+            hitch_detector.log_summary()
+
+        if gc_controller is not None:
+            gc_controller.log_summary()
+            gc_controller.stop()
+
+        if map_matcher is not None:
+            map_matcher.log_summary()
+
+        rpc_profiler.report()
+
+        # A session still running when the game ends keeps its recording
+        if lanerunner_logger.recorder is not None:
+            lanerunner_logger.recorder.stop()
+
         if world is not None:
             world.destroy()
 
         pygame.quit()
-        logging.debug("Game loop ended.")
\ No newline at end of file
+        logging.debug("Game loop ended.")
+
+
+def attach_world(client, map_name, force_reload=False):
+    """
+    Returns the world and map of the requested town. A world that already runs the town is reused,
+    which keeps the spawned traffic and avoids the level reload. Only a different town or a forced
+    reload calls load_world.
+    """
+    if not force_reload:
+        carla_world = client.get_world()
+        town_map = carla_world.get_map()
+        if town_map.name.split('/')[-1] == map_name.split('/')[-1]:
+            logging.info("Attached to the running world: %s", town_map.name)
+            return carla_world, town_map
+        logging.debug("Server runs %s, loading %s", town_map.name, map_name)
+
+    carla_world = client.load_world(map_name)
+    town_map = carla_world.get_map()
+    logging.debug("Loaded map: %s", map_name)
+    return carla_world, town_map
+
+
+def apply_world_settings(carla_world, args):
+    """
+    Applies the synchronous mode and the fixed delta time of the game to the world.
+    """
+    settings = carla_world.get_settings()
+    settings.synchronous_mode = args.sync
+    settings.fixed_delta_seconds = 1.0 / args.sim_fps
+
+    carla_world.apply_settings(settings)
+    logging.debug(
+        "Game settings applied: Synchronous mode = %s, fixed delta = %.4f s",
+        args.sync, settings.fixed_delta_seconds
+    )
+
+
+def match_hero(map_matcher, town_map, hero_transform):
+    """
+    Returns the lane point of the hero from the map matcher. The map is only asked when
+    the hero is away from every lane of the lane graph.
+    """
+    hero_wp = map_matcher.match(hero_transform)
+    if hero_wp is None:
+        hero_wp = town_map.get_waypoint(hero_transform.location)
+    return hero_wp
+
+
+def render_reconnecting(display, held_frame, attempt, attempts):
+    """
+    Shows the last rendered frame with the reconnection status and keeps the window responsive.
+    """
+    pygame.event.pump()
+    display.blit(held_frame, (0, 0))
+
+    font = pygame.font.Font(FONT_REGULAR_PATH, 32)
+    text_surface = font.render(
+        "Reconnecting to the Carla server (%d/%d)..." % (attempt, attempts), True, COLOR_AQUAMARINE
+    )
+    display.blit(text_surface, text_surface.get_rect(center=(display.get_width() // 2, display.get_height() - 60)))
+    pygame.display.flip()
+
+
+def update_game_logic(game_manager, game_view, delta_time, current_wp):
+    """
+    Runs one fixed step of the game logic for the current game state.
+    """
+    game_state = game_manager.get_state()
+
+    if game_state == GameState.STARTING:
+        if game_manager.has_gamified_active:
+            game_manager.update_starting(delta_time, current_wp)
+    elif game_state == GameState.IN_GAME:
+        if game_manager.has_gamified_active:
+            game_view.update(current_wp)
+    elif game_state == GameState.TAKEOVER_REQUESTING:
+        game_manager.update_takeover(delta_time)
+
+
+def render_overlay(game_manager, game_view, overlay_surface, alpha=1.0):
+    """
+    Draws the overlay of the current game state.
+    """
+    game_state = game_manager.get_state()
+
+    if game_state == GameState.MANUAL_DRIVING:
+        pass
+    elif game_state == GameState.STARTING:
+        if game_manager.has_gamified_active:
+            game_manager.draw_starting(overlay_surface)
+    elif game_state == GameState.IN_GAME:
+        if game_manager.has_gamified_active:
+            game_view.render(overlay_surface, alpha)
+            game_manager.draw_coin_counter(overlay_surface)
+            game_manager.draw_live_counter(overlay_surface)
+    elif game_state == GameState.PAUSED:
+        game_manager.draw_pause_menu(overlay_surface)
+    elif game_state == GameState.TAKEOVER_REQUESTING:
+        game_manager.draw_takeover_request(overlay_surface)
+    elif game_state == GameState.GAME_OVER:
+        game_manager.draw_game_over_menu(overlay_surface)
+    elif game_state == GameState.END_GAME:
+        game_manager.draw_victory_menu(overlay_surface)
\ No newline at end of file
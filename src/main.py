@@ -34,6 +34,7 @@ Please refer to the README.md file for more information about the LaneRunner pro
     C            : traffic light RED
     V            : traffic light GREEN
     B            : pause/resume game
+    I            : log the RPC profile (with --profile-rpc)
     N            : restart game
     M            : end game
 
@@ -51,7 +52,29 @@ import logging
 
 # Local imports
 from src.game_loop import game_loop
-from src.core.constants import DESCRIPTION
+from src.core.constants import (
+    DESCRIPTION,
+    SIMULATION_FPS,
+    GAME_LOGIC_FPS,
+    RENDER_FPS,
+    FRAME_LIMITER_MODE,
+    FRAME_LIMITER_SPIN_MS,
+    TICK_ROLE,
+    QUALITY_MODE,
+    GC_MODE,
+    RECONNECT_ATTEMPTS,
+    RECONNECT_BACKOFF,
+    TRAFFIC_VEHICLES,
+    TRAFFIC_WALKERS,
+    TRAFFIC_RADIUS,
+    RECORDER_DIR
+)
+from src.engine.frame_limiter import FRAME_LIMITER_MODES, FRAME_LIMITER_SERVER
+from src.engine.tick_master import TICK_ROLES
+from src.engine.quality_governor import QUALITY_MODES
+from src.engine.gc_controller import GC_MODES
+from src.data.game_clock import GAME_CLOCK_MODES, GAME_CLOCK_WALL, GAME_CLOCK_SIMULATION
+from src.utils.process_placement import add_placement_arguments, apply_process_placement
 
 def main():
     argparser = argparse.ArgumentParser(
@@ -93,8 +116,9 @@ def main():
     argparser.add_argument(
         "--rolename",
         metavar="ROLENAME",
-        default="lanerunner-hero",
-        help="Role name for the Carla client (default: lanerunner-hero)"
+        default="hero",
+        help="Role name for the Carla client, the traffic manager only centres the hybrid physics of "
+             "--traffic-radius on 'hero' (default: hero)"
     )
 
     argparser.add_argument(
@@ -125,12 +149,231 @@ def main():
         help="Enable synchronous mode for the Carla client (default: True)"
     )
 
+    argparser.add_argument(
+        "--tick-role",
+        choices=TICK_ROLES,
+        default=TICK_ROLE,
+        help="Who steps the synchronous world: master ticks it, follower waits for the ticks of "
+             "another process, auto takes the master role if no other process holds it (default: %s)" % TICK_ROLE
+    )
+
+    # Main loop rates
+    argparser.add_argument(
+        "--sim-fps",
+        metavar="FPS",
+        type=float,
+        default=SIMULATION_FPS,
+        help="Fixed rate of the synchronous Carla steps (default: %d)" % SIMULATION_FPS
+    )
+
+    argparser.add_argument(
+        "--logic-fps",
+        metavar="FPS",
+        type=float,
+        default=GAME_LOGIC_FPS,
+        help="Fixed rate of the game logic updates (default: %d)" % GAME_LOGIC_FPS
+    )
+
+    argparser.add_argument(
+        "--render-fps",
+        metavar="FPS",
+        type=float,
+        default=RENDER_FPS,
+        help="Rate of the rendered frames (default: %d)" % RENDER_FPS
+    )
+
+    argparser.add_argument(
+        "--frame-limiter",
+        choices=FRAME_LIMITER_MODES,
+        default=FRAME_LIMITER_MODE,
+        help="Frame pacing: busy (spin), sleep, hybrid (sleep, then spin the last part) "
+             "or server (pace off the synchronous world tick) (default: %s)" % FRAME_LIMITER_MODE
+    )
+
+    argparser.add_argument(
+        "--limiter-spin-ms",
+        metavar="MS",
+        type=float,
+        default=FRAME_LIMITER_SPIN_MS,
+        help="Milliseconds spun at the end of each frame by the hybrid frame limiter (default: %.1f)" % FRAME_LIMITER_SPIN_MS
+    )
+
+    argparser.add_argument(
+        "--game-clock",
+        choices=GAME_CLOCK_MODES,
+        default=GAME_CLOCK_WALL,
+        help="Time source of the game timers: wall clock or simulation time (default: %s)" % GAME_CLOCK_WALL
+    )
+
+    argparser.add_argument(
+        "--unthrottled",
+        action="store_true",
+        default=False,
+        help="Step the world as fast as the server allows, implies --frame-limiter server and --game-clock simulation"
+    )
+
+    argparser.add_argument(
+        "--pipelined",
+        action="store_true",
+        default=False,
+        help="Step the Carla server in a worker thread while the previous frame is rendered"
+    )
+
+    argparser.add_argument(
+        "--quality",
+        choices=QUALITY_MODES,
+        default=QUALITY_MODE,
+        help="Render quality: auto adapts it to the frame budget, or a fixed level (default: %s)" % QUALITY_MODE
+    )
+
+    argparser.add_argument(
+        "--gc-mode",
+        choices=GC_MODES,
+        default=GC_MODE,
+        help="Garbage collector: default, or deferred to freeze startup objects and run full collections "
+             "only while paused or driving manually (default: %s)" % GC_MODE
+    )
+
+    argparser.add_argument(
+        "--hitch-threshold-ms",
+        metavar="MS",
+        type=float,
+        default=None,
+        help="Log every frame slower than this as a hitch with its GC statistics (default: one loop frame)"
+    )
+
+    argparser.add_argument(
+        "--headless",
+        action="store_true",
+        default=False,
+        help="Render offscreen with the SDL dummy drivers, for machines without a display"
+    )
+
+    argparser.add_argument(
+        "--dump-frames",
+        metavar="N",
+        type=int,
+        default=0,
+        help="Save every Nth rendered frame to --dump-dir (default: 0, disabled)"
+    )
+
+    argparser.add_argument(
+        "--dump-dir",
+        metavar="DIR",
+        default="frames",
+        help="Directory of the dumped frames (default: frames)"
+    )
+
+    argparser.add_argument(
+        "--max-frames",
+        metavar="N",
+        type=int,
+        default=0,
+        help="Quit after N rendered frames, for unattended runs (default: 0, unlimited)"
+    )
+
+    argparser.add_argument(
+        "--profile-rpc",
+        action="store_true",
+        default=False,
+        help="Count the calls and latency of the Carla API per method and call site, report with I and on exit"
+    )
+
+    # Process placement arguments
+    add_placement_arguments(argparser)
+
+    argparser.add_argument(
+        "--tick-cpus",
+        metavar="LIST",
+        default=None,
+        help="Pin the tick thread of the pipelined frame loop to these cpus, e.g. 2-3 (default: same as the process)"
+    )
+
+    argparser.add_argument(
+        "--interpolate",
+        action="store_true",
+        default=False,
+        help="Interpolate the actors between the last two simulation ticks on every rendered frame"
+    )
+
     argparser.add_argument(
         '--externalActor',
         action='store_true',
         help='attaches to externally created actor by role name'
     )
 
+    argparser.add_argument(
+        "--reconnect-attempts",
+        metavar="N",
+        type=int,
+        default=RECONNECT_ATTEMPTS,
+        help="Reconnection attempts when the Carla server stops answering, 0 ends the game (default: %d)" % RECONNECT_ATTEMPTS
+    )
+
+    argparser.add_argument(
+        "--reconnect-backoff",
+        metavar="SECONDS",
+        type=float,
+        default=RECONNECT_BACKOFF,
+        help="Seconds before the first reconnection attempt, doubled after every failed one (default: %.1f)" % RECONNECT_BACKOFF
+    )
+
+    argparser.add_argument(
+        "--traffic-vehicles",
+        metavar="N",
+        type=int,
+        default=TRAFFIC_VEHICLES,
+        help="Background vehicles spawned by the client itself on its own connection and ticks, "
+             "0 leaves the traffic to generate_traffic.py (default: %d)" % TRAFFIC_VEHICLES
+    )
+
+    argparser.add_argument(
+        "--traffic-walkers",
+        metavar="N",
+        type=int,
+        default=TRAFFIC_WALKERS,
+        help="Background walkers spawned by the client itself (default: %d)" % TRAFFIC_WALKERS
+    )
+
+    argparser.add_argument(
+        "--traffic-radius",
+        metavar="METERS",
+        type=float,
+        default=TRAFFIC_RADIUS,
+        help="Keep the --traffic-vehicles within this radius of the hero, despawning behind and spawning ahead, "
+             "with hybrid physics in the traffic manager. 0 turns the radius limit off and spreads the vehicles "
+             "over the whole map (default: %.0f)" % TRAFFIC_RADIUS
+    )
+
+    argparser.add_argument(
+        "--traffic-seed",
+        metavar="S",
+        type=int,
+        default=None,
+        help="Seed of the background traffic and the traffic manager, for reproducible runs (default: random)"
+    )
+
+    argparser.add_argument(
+        "--record",
+        action="store_true",
+        default=False,
+        help="Record the Carla world during every session (T to Y), with an index of the session events for replay_session"
+    )
+
+    argparser.add_argument(
+        "--record-dir",
+        metavar="DIR",
+        default=RECORDER_DIR,
+        help="Directory of the session recordings and their indexes (default: %s)" % RECORDER_DIR
+    )
+
+    argparser.add_argument(
+        '--reload-world',
+        action='store_true',
+        default=False,
+        help='Always reload the map, even if the server already runs it'
+    )
+
     # Scenario arguments
     argparser.add_argument(
         '--start-x',
@@ -163,10 +406,17 @@ def main():
     args = argparser.parse_args()
 
     args.width, args.height = map(int, args.resolution.split('x'))
+
+    if args.unthrottled:
+        args.frame_limiter = FRAME_LIMITER_SERVER
+        args.game_clock = GAME_CLOCK_SIMULATION
     
     log_level = logging.DEBUG if args.debug else logging.debug
     logging.basicConfig(format='%(levelname)s: %(message)s', level=log_level)
 
+    # Before any thread is started, so all of them inherit the placement
+    apply_process_placement(args, "client")
+
     logging.debug("Listening for Carla server at %s:%d", args.host, args.port)
     logging.debug("Autopilot mode: %s", "enabled" if args.autopilot else "disabled")
     logging.debug("Client resolution set to %dx%d", args.width, args.height)
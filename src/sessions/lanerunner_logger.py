@@ -19,9 +19,13 @@ class LaneRunnerLogger:
             # TOR 2
             "tor2_time", "takeover2_time", "stab2_start", "stab2_end", "steer_values2", "stable2", "steer_mean2", "steer_std2"
         ]
+        self.recorder = None  # Optional SessionRecorder, records the Carla world during a session
         self.ensure_file_exists()
         self.reset_session()
 
+    def set_recorder(self, recorder):
+        self.recorder = recorder
+
     def ensure_file_exists(self):
         if not os.path.exists(self.filename):
             with open(self.filename, 'w', newline='') as file:
@@ -33,6 +37,8 @@ class LaneRunnerLogger:
         self.session_id = str(uuid.uuid4())
         self.date_time = log_lanerunner_timestamp()
         logging.info(f"Session started with ID: {self.session_id} at {self.date_time}")
+        if self.recorder is not None:
+            self.recorder.start(self.session_id, self.date_time)
 
     def reset_session(self):
         self.session_id = None
@@ -64,6 +70,17 @@ class LaneRunnerLogger:
             logging.warning("Maximum of 2 TORs already recorded. Ignoring extra data.")
             return
 
+        if self.recorder is not None:
+            # Index the events in the recording, under the names of their CSV columns
+            for name, timestamp in ((f"tor{tor_index}", tor_time), (f"takeover{tor_index}", takeover_time)):
+                if timestamp is not None:
+                    self.recorder.mark(name, timestamp)
+            # The stability window is reported when it ends, its start in game clock ms is that long ago
+            if stab_end is not None:
+                if stab_start is not None:
+                    self.recorder.mark(f"stab{tor_index}_start", stab_start, (stab_end - stab_start) / 1000.0)
+                self.recorder.mark(f"stab{tor_index}_end", stab_end)
+
         if tor_time is not None:
             setattr(self, f"tor{tor_index}_time", tor_time)
         if takeover_time is not None:
@@ -135,6 +152,8 @@ class LaneRunnerLogger:
             }
             writer.writerow(row)
         logging.info(f"Session {self.session_id} saved successfully.")
+        if self.recorder is not None:
+            self.recorder.stop()
         self.reset_session()
 
     def render_recording_status(self, display):
@@ -0,0 +1,78 @@
+import os
+import json
+import logging
+
+
+class RecorderIndex(object):
+    """
+    Sidecar of a Carla recorder file. Maps the session events (session start, TORs, takeovers, stability
+    windows) to the simulation frame they happened in and to their time in the recording, so a replay can
+    start right before an event instead of at the beginning of the file.
+    """
+
+    def __init__(self, session_id, recorder_file, start_frame, start_seconds, date_time=None, hero_id=None):
+        self.session_id = session_id
+        self.date_time = date_time
+        self.recorder_file = recorder_file
+        self.start_frame = start_frame  # Simulation frame and elapsed seconds when the recorder started
+        self.start_seconds = start_seconds
+        self.hero_id = hero_id
+        self.events = []
+
+    @staticmethod
+    def path_for(directory, session_id):
+        return os.path.join(directory, "%s.json" % session_id)
+
+    def mark(self, name, frame, elapsed_seconds, timestamp=None):
+        """Adds an event at the given simulation frame, with its wall clock timestamp of the session log"""
+        event = {
+            "name": name,
+            "timestamp": timestamp,
+            "frame": frame,
+            "time": round(max(0.0, elapsed_seconds - self.start_seconds), 3),
+        }
+        self.events.append(event)
+        logging.debug("Recorder event %s at frame %d (%.3f s)", name, frame, event["time"])
+        return event
+
+    def event(self, name):
+        """The first event with the given name, None if there is none"""
+        for event in self.events:
+            if event["name"] == name:
+                return event
+        return None
+
+    def seek(self, name, offset=0.0):
+        """Replay start time in seconds for the event, shifted by offset (e.g. -2.0 for 2 s before it)"""
+        event = self.event(name)
+        if event is None:
+            raise KeyError("No event %s in session %s, recorded: %s" % (
+                name, self.session_id, ", ".join(e["name"] for e in self.events) or "none"))
+        return max(0.0, event["time"] + offset)
+
+    def to_dict(self):
+        return {
+            "session_id": self.session_id,
+            "date_time": self.date_time,
+            "recorder_file": self.recorder_file,
+            "start_frame": self.start_frame,
+            "start_seconds": self.start_seconds,
+            "hero_id": self.hero_id,
+            "events": self.events,
+        }
+
+    def save(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+        logging.info("Recorder index of session %s saved to %s", self.session_id, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        index = cls(
+            data["session_id"], data["recorder_file"], data["start_frame"], data["start_seconds"],
+            data.get("date_time"), data.get("hero_id")
+        )
+        index.events = data.get("events", [])
+        return index
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+"""
+Replays a recorded LaneRunner session from right before one of its events, using the recorder index
+written next to the recording, e.g. 2 s before the first TOR:
+
+    python -m src.sessions.replay_session SESSION_ID --event tor1 --before 2
+"""
+
+import os
+import argparse
+import logging
+import carla
+
+# Local imports
+from src.core.constants import RECORDER_DIR
+from src.sessions.recorder_index import RecorderIndex
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument(
+        'session',
+        help='Session id, or the path of a recorder index (.json)')
+    argparser.add_argument(
+        '--host',
+        metavar='H',
+        default='127.0.0.1',
+        help='IP of the host server (default: 127.0.0.1)')
+    argparser.add_argument(
+        '-p', '--port',
+        metavar='P',
+        default=2000,
+        type=int,
+        help='TCP port to listen to (default: 2000)')
+    argparser.add_argument(
+        '--record-dir',
+        metavar='DIR',
+        default=RECORDER_DIR,
+        help='Directory of the recordings and their indexes (default: %s)' % RECORDER_DIR)
+    argparser.add_argument(
+        '-e', '--event',
+        metavar='NAME',
+        default='session_start',
+        help='Event to start at: session_start, tor1, takeover1, stab1_start, stab1_end, tor2, ... (default: session_start)')
+    argparser.add_argument(
+        '-b', '--before',
+        metavar='SECONDS',
+        default=2.0,
+        type=float,
+        help='Seconds replayed before the event (default: 2.0)')
+    argparser.add_argument(
+        '-d', '--duration',
+        metavar='SECONDS',
+        default=0.0,
+        type=float,
+        help='Seconds to replay, 0 replays to the end (default: 0)')
+    argparser.add_argument(
+        '--no-follow',
+        action='store_true',
+        help='Do not move the spectator camera with the hero')
+    argparser.add_argument(
+        '-x', '--time-factor',
+        metavar='X',
+        default=1.0,
+        type=float,
+        help='Replay speed, 1.0 is real time (default: 1.0)')
+    argparser.add_argument(
+        '--list',
+        action='store_true',
+        help='List the events of the session and exit')
+    args = argparser.parse_args()
+
+    logging.basicConfig(format='%(levelname)s: %(message)s', level=logging.INFO)
+
+    path = args.session if args.session.endswith('.json') else RecorderIndex.path_for(args.record_dir, args.session)
+    if not os.path.exists(path):
+        logging.error("No recorder index at %s", path)
+        return
+    index = RecorderIndex.load(path)
+
+    if args.list:
+        for event in index.events:
+            logging.info("%-16s frame %8d  %9.3f s  %s", event["name"], event["frame"], event["time"], event["timestamp"])
+        return
+
+    try:
+        start = index.seek(args.event, -args.before)
+    except KeyError as e:
+        logging.error(e.args[0])
+        return
+
+    client = carla.Client(args.host, args.port)
+    client.set_timeout(60.0)
+    client.set_replayer_time_factor(args.time_factor)
+
+    follow_id = 0 if args.no_follow or index.hero_id is None else index.hero_id
+    logging.info("Replaying session %s from %.2f s (%s - %.1f s)", index.session_id, start, args.event, args.before)
+    logging.info(client.replay_file(index.recorder_file, start, args.duration, follow_id))
+
+
+if __name__ == '__main__':
+
+    try:
+        main()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,68 @@
+import os
+import logging
+
+# Local imports
+from src.sessions.recorder_index import RecorderIndex
+
+
+class SessionRecorder(object):
+    """
+    Runs the Carla recorder for the duration of a study session and writes its index next to the recording.
+    The events are stamped with the frame of the last world tick, so they line up with the recorded frames.
+    """
+
+    def __init__(self, world, directory):
+        self.world = world  # LaneRunner World, its client and last snapshot follow reconnections
+        self.directory = os.path.abspath(directory)
+        self.index = None
+        os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def recording(self):
+        return self.index is not None
+
+    def _now(self):
+        """Frame and elapsed simulation seconds of the last tick"""
+        snapshot = self.world.snapshot
+        if snapshot is not None:
+            return snapshot.frame, snapshot.elapsed_seconds
+        snapshot = self.world.world.get_snapshot()
+        return snapshot.frame, snapshot.timestamp.elapsed_seconds
+
+    def start(self, session_id, date_time=None):
+        """Starts recording the session, a recording still running is stopped first"""
+        if self.recording:
+            self.stop()
+
+        # The server writes the file, an absolute path keeps it next to the session logs on a local server
+        recorder_file = os.path.join(self.directory, "%s.log" % session_id)
+        frame, elapsed_seconds = self._now()
+        self.world.client.start_recorder(recorder_file)
+
+        hero_id = self.world.player.id if self.world.player is not None else None
+        self.index = RecorderIndex(session_id, recorder_file, frame, elapsed_seconds, date_time, hero_id)
+        self.index.mark("session_start", frame, elapsed_seconds, date_time)
+        logging.info("Recording session %s to %s", session_id, recorder_file)
+
+    def mark(self, name, timestamp=None, seconds_ago=0.0):
+        """Adds an event of the running session to the index, optionally one that happened some seconds ago"""
+        if not self.recording:
+            return
+        frame, elapsed_seconds = self._now()
+        if seconds_ago > 0.0:
+            # Synchronous frames are fixed_delta_seconds apart
+            frame -= int(round(seconds_ago * self.world.args.sim_fps))
+            elapsed_seconds -= seconds_ago
+        self.index.mark(name, frame, elapsed_seconds, timestamp)
+
+    def stop(self, timestamp=None):
+        """Stops the recorder and saves the index of the session"""
+        if not self.recording:
+            return
+        self.mark("session_end", timestamp)
+        try:
+            self.world.client.stop_recorder()
+        except RuntimeError as e:
+            logging.error("Failed to stop the recorder: %s", e)
+        self.index.save(RecorderIndex.path_for(self.directory, self.index.session_id))
+        self.index = None
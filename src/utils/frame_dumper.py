@@ -0,0 +1,30 @@
+import os
+import logging
+import pygame
+
+
+class FrameDumper(object):
+    """Saves every Nth rendered frame of a surface to disk, e.g. to check the output of a headless run"""
+
+    def __init__(self, directory, every_n):
+        self.directory = directory
+        self.every_n = every_n
+        self.frames = 0
+        self.saved = 0
+
+        if self.every_n > 0:
+            os.makedirs(self.directory, exist_ok=True)
+            logging.debug("Dumping every %d. frame to %s", self.every_n, self.directory)
+
+    def dump(self, surface):
+        """Counts a rendered frame and saves it if it is one of every Nth"""
+        self.frames += 1
+        if self.every_n <= 0 or self.frames % self.every_n != 0:
+            return
+
+        path = os.path.join(self.directory, "frame_%06d.png" % self.frames)
+        try:
+            pygame.image.save(surface, path)
+            self.saved += 1
+        except pygame.error as e:
+            logging.error("Failed to save frame %s: %s", path, e)
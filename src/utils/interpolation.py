@@ -0,0 +1,29 @@
+import carla
+
+
+def lerp(a, b, t):
+    """Linear interpolation between a and b"""
+    return a + (b - a) * t
+
+
+def lerp_angle(a, b, t):
+    """Interpolates between two angles in degrees along the shortest arc"""
+    diff = (b - a + 180.0) % 360.0 - 180.0
+    return a + diff * t
+
+
+def lerp_location(a, b, t):
+    """Interpolates between two carla.Location"""
+    return carla.Location(x=lerp(a.x, b.x, t), y=lerp(a.y, b.y, t), z=lerp(a.z, b.z, t))
+
+
+def lerp_transform(a, b, t):
+    """Interpolates between two carla.Transform, rotations along the shortest arc"""
+    return carla.Transform(
+        lerp_location(a.location, b.location, t),
+        carla.Rotation(
+            pitch=lerp_angle(a.rotation.pitch, b.rotation.pitch, t),
+            yaw=lerp_angle(a.rotation.yaw, b.rotation.yaw, t),
+            roll=lerp_angle(a.rotation.roll, b.rotation.roll, t)
+        )
+    )
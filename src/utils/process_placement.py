@@ -0,0 +1,108 @@
+import os
+import logging
+
+# Scheduling policies selectable from the command line
+SCHED_POLICIES = {
+    "other": "SCHED_OTHER",
+    "batch": "SCHED_BATCH",
+    "idle": "SCHED_IDLE",
+    "fifo": "SCHED_FIFO",
+    "rr": "SCHED_RR",
+}
+
+
+def parse_cpu_list(text):
+    """Parses a cpu list like taskset does, e.g. '0-3,6' -> {0, 1, 2, 3, 6}"""
+    cpus = set()
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(part))
+    if not cpus:
+        raise ValueError("Empty cpu list: {!r}".format(text))
+    return cpus
+
+
+def add_placement_arguments(argparser):
+    """Adds the process placement options to a launcher"""
+    argparser.add_argument(
+        '--cpus',
+        metavar='LIST',
+        default=None,
+        help='Pin the process to these cpus, e.g. 0-3,6 (default: all cpus)')
+    argparser.add_argument(
+        '--nice',
+        metavar='N',
+        type=int,
+        default=None,
+        help='Nice increment of the process (default: unchanged)')
+    argparser.add_argument(
+        '--sched-policy',
+        choices=sorted(SCHED_POLICIES),
+        default=None,
+        help='Scheduling policy of the process, fifo and rr need privileges (default: unchanged)')
+    argparser.add_argument(
+        '--sched-priority',
+        metavar='P',
+        type=int,
+        default=0,
+        help='Static priority for the fifo and rr policies (default: 0)')
+
+
+def pin_current_thread(cpus, name):
+    """Pins the calling thread to a cpu list, threads created afterwards inherit it"""
+    if not cpus:
+        return
+    try:
+        os.sched_setaffinity(0, parse_cpu_list(cpus))
+    except (AttributeError, OSError, ValueError) as e:
+        logging.warning("Could not pin %s to cpus %s: %s", name, cpus, e)
+        return
+    logging.debug("%s pinned to cpus %s", name, sorted(os.sched_getaffinity(0)))
+
+
+def apply_process_placement(args, name):
+    """Applies the cpu affinity, scheduling policy and nice value given on the command line and logs
+    the resulting layout. Has to run before any thread is started, so every thread inherits it."""
+    pin_current_thread(args.cpus, name)
+
+    if args.sched_policy is not None:
+        try:
+            policy = getattr(os, SCHED_POLICIES[args.sched_policy])
+            priority = args.sched_priority if args.sched_policy in ("fifo", "rr") else 0
+            os.sched_setscheduler(0, policy, os.sched_param(priority))
+        except (AttributeError, OSError) as e:
+            logging.warning("Could not set scheduling policy %s of %s: %s", args.sched_policy, name, e)
+
+    if args.nice is not None:
+        try:
+            os.nice(args.nice)
+        except (AttributeError, OSError) as e:
+            logging.warning("Could not set nice %d of %s: %s", args.nice, name, e)
+
+    log_process_placement(name)
+
+
+def log_process_placement(name):
+    """Logs the cpus, scheduling policy and nice value the process is running with"""
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+        policy_id = os.sched_getscheduler(0)
+        priority = os.sched_getparam(0).sched_priority
+    except (AttributeError, OSError):
+        logging.info("Process placement of %s (pid %d) not available on this platform", name, os.getpid())
+        return
+
+    policy = next(
+        (key for key, attr in SCHED_POLICIES.items() if getattr(os, attr, None) == policy_id),
+        str(policy_id)
+    )
+    logging.info(
+        "Process placement of %s (pid %d): cpus %s of %d, policy %s, priority %d, nice %d",
+        name, os.getpid(), cpus, os.cpu_count(), policy, priority, os.nice(0)
+    )
@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import logging
+import threading
+
+import carla
+
+# Carla objects whose methods are counted. Objects of these types returned by a counted call are wrapped too,
+# so wrapping the client is enough to follow the world, the map, the actors and the waypoints.
+PROFILED_TYPES = (carla.Client, carla.World, carla.Map, carla.Actor, carla.ActorList, carla.Waypoint)
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+class _MethodStats(object):
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.frames = 0  # Frames with at least one call
+        self.max_per_frame = 0
+
+
+class RpcProfiler():
+    """
+    Counts the calls and the latency of the carla API per method, per frame and per call site.
+    Only active when enabled, the wrapped objects behave like the carla objects they wrap.
+    """
+    _instance = None
+
+    def __init__(self):
+        if RpcProfiler._instance is not None:
+            raise Exception("Use RpcProfiler.instance()")
+        self.enabled = False
+        self.top_n = 20
+        self.frames = 0
+        self._methods = {}
+        self._sites = {}
+        self._frame_calls = {}
+        self._lock = threading.Lock()
+        RpcProfiler._instance = self
+
+    @staticmethod
+    def instance():
+        if RpcProfiler._instance is None:
+            RpcProfiler()
+        return RpcProfiler._instance
+
+    def enable(self, top_n):
+        self.enabled = True
+        self.top_n = top_n
+        logging.debug("RPC profiling enabled.")
+
+    def wrap(self, value):
+        """Wraps a carla object, or the carla objects of a list, in counting proxies"""
+        if not self.enabled:
+            return value
+        if isinstance(value, PROFILED_TYPES) and type(value) is not RpcProxy:
+            return RpcProxy(value, self)
+        if isinstance(value, list) and value and isinstance(value[0], PROFILED_TYPES):
+            return [self.wrap(item) for item in value]
+        return value
+
+    def record(self, method, site, elapsed):
+        with self._lock:
+            stats = self._methods.get(method)
+            if stats is None:
+                stats = self._methods[method] = _MethodStats()
+            stats.calls += 1
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            self._frame_calls[method] = self._frame_calls.get(method, 0) + 1
+
+            key = (method, site)
+            calls, total = self._sites.get(key, (0, 0.0))
+            self._sites[key] = (calls + 1, total + elapsed)
+
+    def end_frame(self):
+        """Closes the statistics of one loop iteration"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.frames += 1
+            for method, calls in self._frame_calls.items():
+                stats = self._methods[method]
+                stats.frames += 1
+                stats.max_per_frame = max(stats.max_per_frame, calls)
+            self._frame_calls = {}
+
+    def report(self, top_n=None):
+        """Logs the methods and the call sites with the most time spent in the carla API"""
+        if not self.enabled:
+            return
+        top_n = top_n or self.top_n
+        frames = max(1, self.frames)
+
+        with self._lock:
+            methods = sorted(self._methods.items(), key=lambda item: item[1].total, reverse=True)[:top_n]
+            sites = sorted(self._sites.items(), key=lambda item: item[1][1], reverse=True)[:top_n]
+
+        lines = ["RPC profile over %d frames, top %d methods:" % (self.frames, top_n),
+                 "%-40s %9s %9s %9s %11s %9s %9s" % ("method", "calls", "/frame", "max/fr", "total ms", "mean us", "max us")]
+        for method, stats in methods:
+            lines.append("%-40s %9d %9.2f %9d %11.2f %9.1f %9.1f" % (
+                method, stats.calls, stats.calls / float(frames), stats.max_per_frame,
+                stats.total * 1000.0, stats.total / stats.calls * 1e6, stats.max * 1e6))
+
+        lines.append("Top %d call sites:" % top_n)
+        lines.append("%-40s %-50s %9s %11s" % ("method", "call site", "calls", "total ms"))
+        for (method, site), (calls, total) in sites:
+            lines.append("%-40s %-50s %9d %11.2f" % (method, site, calls, total * 1000.0))
+
+        logging.info("\n".join(lines))
+
+
+def _unwrap(value):
+    if type(value) is RpcProxy:
+        return object.__getattribute__(value, '_target')
+    if isinstance(value, (list, tuple)) and any(type(item) is RpcProxy for item in value):
+        return type(value)(_unwrap(item) for item in value)
+    return value
+
+
+def _call_site(frame):
+    code = frame.f_code
+    path = os.path.relpath(code.co_filename, _ROOT) if code.co_filename.startswith(_ROOT) else code.co_filename
+    return "%s:%d %s" % (path, frame.f_lineno, code.co_name)
+
+
+class RpcProxy(object):
+    """Forwards everything to a carla object and times its method calls. Reports the class of the wrapped
+    object, so isinstance checks keep working, and unwraps proxies passed back into the carla API."""
+    __slots__ = ('_target', '_profiler')
+
+    def __init__(self, target, profiler):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_profiler', profiler)
+
+    @property
+    def __class__(self):
+        return type(object.__getattribute__(self, '_target'))
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, '_target')
+        profiler = object.__getattribute__(self, '_profiler')
+        value = getattr(target, name)
+        if not callable(value):
+            return profiler.wrap(value)
+
+        method = "%s.%s" % (type(target).__name__, name)
+
+        def counted(*args, **kwargs):
+            args = [_unwrap(arg) for arg in args]
+            kwargs = {key: _unwrap(arg) for key, arg in kwargs.items()}
+            start = time.perf_counter()
+            try:
+                return profiler.wrap(value(*args, **kwargs))
+            finally:
+                profiler.record(method, _call_site(sys._getframe(1)), time.perf_counter() - start)
+
+        return counted
+
+    def __setattr__(self, name, value):
+        setattr(object.__getattribute__(self, '_target'), name, _unwrap(value))
+
+    def __iter__(self):
+        profiler = object.__getattribute__(self, '_profiler')
+        return (profiler.wrap(item) for item in object.__getattribute__(self, '_target'))
+
+    def __len__(self):
+        return len(object.__getattribute__(self, '_target'))
+
+    def __getitem__(self, index):
+        profiler = object.__getattribute__(self, '_profiler')
+        return profiler.wrap(object.__getattribute__(self, '_target')[index])
+
+    def __bool__(self):
+        return bool(object.__getattribute__(self, '_target'))
+
+    def __eq__(self, other):
+        return object.__getattribute__(self, '_target') == _unwrap(other)
+
+    def __ne__(self, other):
+        return object.__getattribute__(self, '_target') != _unwrap(other)
+
+    def __hash__(self):
+        return hash(object.__getattribute__(self, '_target'))
+
+    def __repr__(self):
+        return repr(object.__getattribute__(self, '_target'))
+
+    def __str__(self):
+        return str(object.__getattribute__(self, '_target'))
@@ -1,6 +1,7 @@
 import carla
 import logging
 import pygame
+import numpy as np
 import weakref
 import random
 import math
@@ -8,13 +9,21 @@ import math
 # Local imports
 from src.engine.traffic_light_surfaces import TrafficLightSurfaces
 from src.engine.game_map_image import GameMapImage
+from src.engine.tick_snapshot import TickSnapshot
+from src.engine.actor_registry import ActorRegistry, STATIC_KINDS
+from src.engine.static_actor_cache import StaticActorCache
+from src.engine.spatial_grid import SpatialGrid
+from src.core.actor_kind import ActorKind
 from src.utils.util import Util
+from src.utils.interpolation import lerp_transform
+from src.data.game_clock import GameClock
 from src.utils.get_actor_display_name import get_actor_display_name
 from src.core.constants import (
     HERO_IMAGE_PATH,
     PIXELS_PER_METER, 
     HERO_DEFAULT_SCALE,
-    PIXELS_AHEAD_VEHICLE
+    PIXELS_AHEAD_VEHICLE,
+    VEHICLE_GRID_CELL_SIZE
 )
 from src.core.colors import (
     COLOR_AQUAMARINE,
@@ -45,11 +54,22 @@ class GameView:
         # World data
         self.world = None
         self.town_map = None
-        self.actors_with_transform = []
+        self.actor_registry = ActorRegistry(args.rolename)
+        self.static_actors = StaticActorCache()  # Traffic lights and signs, they never move
+        self.actors_with_transforms = []
+        self.snapshot = None  # TickSnapshot of the last tick
+        self.vehicle_grid = SpatialGrid(VEHICLE_GRID_CELL_SIZE)  # Vehicle locations of the last tick, for collisions
+
+        # Transforms of the previous tick, used to interpolate the display frames between two ticks
+        self.previous_transforms = {}
+        self.previous_hero_transform = None
 
         # Game Manager
         self.game_manager = None
 
+        # Adapts the rendering cost to the frame budget, full quality when not set
+        self.quality_governor = None
+
         self._input = None
 
         self.surface_size = [0, 0]  # Size of the surface to render the map
@@ -60,6 +80,7 @@ class GameView:
         self.hero_actor = None
         self.spawned_hero = None
         self.hero_transform = None
+        self.render_hero_transform = None  # Hero transform of the frame being rendered
 
         # Hero image
         self.hero_image = None
@@ -82,7 +103,7 @@ class GameView:
         self.hero_surface = None
         self.actors_surface = None
 
-    def start(self, input_control, world, town_map, game_manager):
+    def start(self, input_control, world, town_map, game_manager, quality_governor=None):
         """
         Builds the game view, stores the needed modules and prepares rendering in Hero Mode.
         """
@@ -92,6 +113,7 @@ class GameView:
         self.world, self.town_map = world, town_map
         
         self.game_manager = game_manager
+        self.quality_governor = quality_governor
 
         self.map_image = GameMapImage(
             self.world,
@@ -148,6 +170,24 @@ class GameView:
         self._input.control = carla.VehicleControl()
 
         # Register event for receiving server tick
+        self._listen_world_ticks()
+
+    def reconnect(self, world, town_map):
+        """Follows the world of a new connection. The actors are fetched again, the hero is selected again
+        by its role name and the server tick callback is registered on the new world. The map image is kept."""
+        self.world, self.town_map = world, town_map
+
+        self.actor_registry = ActorRegistry(self.args.rolename)
+        self.static_actors = StaticActorCache()
+        self.actors_with_transforms = []
+        self.previous_transforms = {}
+        self.snapshot = None
+
+        self.hero_actor = None
+        self.select_hero_actor()
+        self._listen_world_ticks()
+
+    def _listen_world_ticks(self):
         weak_self = weakref.ref(self)
         self.world.on_tick(lambda timestamp: GameView.on_world_tick(weak_self, timestamp))
 
@@ -188,15 +228,38 @@ class GameView:
         # Save it in order to destroy it when closing program
         self.spawned_hero = self.hero_actor
 
-    def tick(self):
-        """Retrieves the actors for Hero and Map modes and updates de HUD based on that"""
-        actors = self.world.get_actors()
+    def tick(self, snapshot=None):
+        """Retrieves the actors for Hero and Map modes and updates de HUD based on that.
+        The transforms of all actors are read at once from the world snapshot of the tick, the actors
+        themselves are only fetched from the server when they appear."""
+        if snapshot is None:
+            snapshot = self.world.get_snapshot()
+        self.snapshot = TickSnapshot(snapshot)
+        changed_kinds = self.actor_registry.update(self.world, self.snapshot.ids)
+
+        # Traffic spawns and despawns leave the static actors alone, only their own kinds invalidate the cache
+        if changed_kinds.intersection(STATIC_KINDS):
+            self.static_actors.rebuild(self.actor_registry)
+        else:
+            self.static_actors.refresh_states()
+
+        # Keep the last tick so display frames can be interpolated towards the new one
+        self.previous_transforms = {actor.id: transform for actor, transform in self.actors_with_transforms}
+        self.previous_hero_transform = self.hero_transform
+
+        # All the transforms of a snapshot belong to the same frame, static actors come from their cache
+        self.actors_with_transforms = []
+        for kind in (ActorKind.VEHICLE, ActorKind.WALKER):
+            for actor in self.actor_registry.of_kind(kind):
+                self.actors_with_transforms.append((actor, self.snapshot.transform(actor.id)))
+
+        # Sensors and static actors never collide with the avatar or the coins
+        self.vehicle_grid.rebuild(self.snapshot.locations(self.actor_registry.ids_of(ActorKind.VEHICLE)))
 
-        # We store the transforms also so that we avoid having transforms of
-        # previous tick and current tick when rendering them.
-        self.actors_with_transforms = [(actor, actor.get_transform()) for actor in actors]
         if self.hero_actor is not None:
-            self.hero_transform = self.hero_actor.get_transform()
+            hero_transform = self.snapshot.transform(self.hero_actor.id)
+            if hero_transform is not None:
+                self.hero_transform = hero_transform
 
     @staticmethod
     def on_world_tick(weak_self, timestamp):
@@ -209,81 +272,118 @@ class GameView:
         self.server_fps = self.server_clock.get_fps()
         self.simulation_time = timestamp.elapsed_seconds
 
+        # Drive the game timers with the simulation time
+        GameClock.instance().on_world_tick(timestamp.elapsed_seconds)
+
     def _show_nearby_vehicles(self, vehicles):
         """Shows nearby vehicles of the hero actor"""
         info_text = []
         if self.hero_actor is not None and len(vehicles) > 1:
             location = self.hero_transform.location
-            vehicle_list = [x[0] for x in vehicles if x[0].id != self.hero_actor.id]
+            vehicle_list = [x for x in vehicles if x[0].id != self.hero_actor.id]
 
-            def distance(v): return location.distance(v.get_location())
-            for n, vehicle in enumerate(sorted(vehicle_list, key=distance)):
+            def distance(v): return location.distance(v[1].location)
+            for n, (vehicle, _) in enumerate(sorted(vehicle_list, key=distance)):
                 if n > 15:
                     break
-                vehicle_type = get_actor_display_name(vehicle, truncate=22)
+                vehicle_type = get_actor_display_name(vehicle.actor, truncate=22)
                 info_text.append('% 5d %s' % (vehicle.id, vehicle_type))
 
-    def _split_actors(self):
-        """Splits the retrieved actors by type id"""
-        vehicles = []
-        traffic_lights = []
-        speed_limits = []
-        walkers = []
-
-        for actor_with_transform in self.actors_with_transforms:
-            actor = actor_with_transform[0]
-            if 'vehicle' in actor.type_id:
-                vehicles.append(actor_with_transform)
-            elif 'traffic_light' in actor.type_id:
-                traffic_lights.append(actor_with_transform)
-            elif 'speed_limit' in actor.type_id:
-                speed_limits.append(actor_with_transform)
-            elif 'walker.pedestrian' in actor.type_id:
-                walkers.append(actor_with_transform)
-
-        return (vehicles, traffic_lights, speed_limits, walkers)
-
-    def _render_traffic_lights(self, surface, list_tl, world_to_pixel):
+    def _interpolate_transforms(self, alpha):
+        """Returns the actors with their transforms and the hero transform blended between the previous
+        and the last tick. An alpha of 0 is the previous tick and 1 the last one."""
+        if alpha >= 1.0 or not self.previous_transforms:
+            return self.actors_with_transforms, self.hero_transform
+
+        actors_with_transforms = []
+        for actor, transform in self.actors_with_transforms:
+            previous = self.previous_transforms.get(actor.id)
+            if previous is not None:
+                transform = lerp_transform(previous, transform, alpha)
+            actors_with_transforms.append((actor, transform))
+
+        hero_transform = self.hero_transform
+        if self.previous_hero_transform is not None and hero_transform is not None:
+            hero_transform = lerp_transform(self.previous_hero_transform, hero_transform, alpha)
+
+        return actors_with_transforms, hero_transform
+
+    def _split_actors(self, actors_with_transforms):
+        """Splits the retrieved actors by their registered kind"""
+        split = {
+            ActorKind.VEHICLE: [],
+            ActorKind.WALKER: []
+        }
+
+        for actor_with_transform in actors_with_transforms:
+            split[actor_with_transform[0].kind].append(actor_with_transform)
+
+        return (split[ActorKind.VEHICLE], split[ActorKind.WALKER])
+
+    def _limit_vehicles(self, vehicles, max_vehicles):
+        """Keeps the hero and the nearest vehicles that can be visible on the minimap"""
+        hero_location = self.render_hero_transform.location
+        visible_radius = self.map_image.pixel_to_world_width(self.hero_surface.get_width())
+        max_distance = visible_radius * visible_radius
+
+        hero = []
+        nearby = []
+        for vehicle in vehicles:
+            if vehicle[0].is_hero:
+                hero.append(vehicle)
+                continue
+            location = vehicle[1].location
+            dx = location.x - hero_location.x
+            dy = location.y - hero_location.y
+            distance = dx * dx + dy * dy
+            if distance <= max_distance:
+                nearby.append((distance, vehicle))
+
+        if max_vehicles is not None and len(nearby) > max_vehicles:
+            nearby.sort(key=lambda item: item[0])
+            nearby = nearby[:max_vehicles]
+
+        return [vehicle for _, vehicle in nearby] + hero
+
+    def _render_traffic_lights(self, surface, world_to_pixel_array):
         """Renders the traffic lights and shows its triggers and bounding boxes if flags are enabled"""
         self.affected_traffic_light = None
-
-        for tl in list_tl:
-            world_pos = tl.get_location()
-            pos = world_to_pixel(world_pos)
-
+        cache = self.static_actors
+        positions = cache.pixels('traffic_lights', world_to_pixel_array, self.map_image.scale)
+
+        # Traffic lights whose trigger volume reaches the hero
+        affected = ()
+        hero = self.actor_registry.get(self.hero_actor.id) if self.hero_actor is not None else None
+        if hero is not None:
+            affected = cache.affected_traffic_lights(self.hero_transform.location, Util.length(hero.extent))
+            if affected:
+                self.affected_traffic_light = cache.traffic_lights[affected[-1]].actor
+
+        for index, (tl, pos, state) in enumerate(zip(cache.traffic_lights, positions, cache.traffic_light_states)):
             if False: # self.args.show_triggers:
-                corners = Util.get_bounding_box(tl)
-                corners = [world_to_pixel(p) for p in corners]
+                corners = Util.get_bounding_box(tl.actor)
+                corners = world_to_pixel_array([(p.x, p.y) for p in corners]).tolist()
                 pygame.draw.lines(surface, COLOR_BUTTER_1, True, corners, 2)
 
-            if self.hero_actor is not None:
-                corners = Util.get_bounding_box(tl)
-                corners = [world_to_pixel(p) for p in corners]
-                tl_t = tl.get_transform()
-
-                transformed_tv = tl_t.transform(tl.trigger_volume.location)
-                hero_location = self.hero_actor.get_location()
-                d = hero_location.distance(transformed_tv)
-                s = Util.length(tl.trigger_volume.extent) + Util.length(self.hero_actor.bounding_box.extent)
-                if (d <= s):
-                    # Highlight traffic light
-                    self.affected_traffic_light = tl
-                    srf = self.traffic_light_surfaces.surfaces['h']
-                    surface.blit(srf, srf.get_rect(center=pos))
-
-            srf = self.traffic_light_surfaces.surfaces[tl.state]
+            if index in affected:
+                # Highlight traffic light
+                srf = self.traffic_light_surfaces.surfaces['h']
+                surface.blit(srf, srf.get_rect(center=pos))
+
+            srf = self.traffic_light_surfaces.surfaces[state]
             surface.blit(srf, srf.get_rect(center=pos))
 
-    def _render_speed_limits(self, surface, list_sl, world_to_pixel, world_to_pixel_width):
+    def _render_speed_limits(self, surface, world_to_pixel_array, world_to_pixel_width):
         """Renders the speed limits by drawing two concentric circles (outer is red and inner white) and a speed limit text"""
 
         font_size = world_to_pixel_width(2)
         radius = world_to_pixel_width(2)
         font = pygame.font.SysFont('Arial', font_size)
 
-        for sl in list_sl:
+        cache = self.static_actors
+        positions = cache.pixels('speed_limits', world_to_pixel_array, self.map_image.scale)
 
-            x, y = world_to_pixel(sl.get_location())
+        for sl, (x, y) in zip(cache.speed_limits, positions):
 
             # Render speed limit concentric circles
             white_circle_radius = int(radius * 0.75)
@@ -291,18 +391,17 @@ class GameView:
             pygame.draw.circle(surface, COLOR_SCARLET_RED_1, (x, y), radius)
             pygame.draw.circle(surface, COLOR_ALUMINIUM_0, (x, y), white_circle_radius)
 
-            limit = sl.type_id.split('.')[2]
-            font_surface = font.render(limit, True, COLOR_ALUMINIUM_5)
+            font_surface = font.render(sl.limit, True, COLOR_ALUMINIUM_5)
 
             if False: # self.args.show_triggers
-                corners = Util.get_bounding_box(sl)
-                corners = [world_to_pixel(p) for p in corners]
+                corners = Util.get_bounding_box(sl.actor)
+                corners = world_to_pixel_array([(p.x, p.y) for p in corners]).tolist()
                 pygame.draw.lines(surface, COLOR_PLUM_2, True, corners, 2)
 
             # Blit
             if self.hero_actor is not None:
                 # In hero mode, Rotate font surface with respect to hero vehicle front
-                angle = -self.hero_transform.rotation.yaw - 90.0
+                angle = -self.render_hero_transform.rotation.yaw - 90.0
                 font_surface = pygame.transform.rotate(font_surface, angle)
                 offset = font_surface.get_rect(center=(x, y))
                 surface.blit(font_surface, offset)
@@ -311,68 +410,73 @@ class GameView:
                 # In map mode, there is no need to rotate the text of the speed limit
                 surface.blit(font_surface, (x - radius / 2, y - radius / 2))
 
-    def _render_walkers(self, surface, list_w, world_to_pixel):
+    @staticmethod
+    def _footprints(list_a, corners_x, corners_y):
+        """World x/y of the bounding box corners of many actors as an (N, K, 2) array. The corners are given in
+        the actor frame as (N, K) arrays and turned by the yaw of the actor, all actors in one go"""
+        poses = np.array([(t.location.x, t.location.y, t.rotation.yaw) for _, t in list_a], dtype=np.float64)
+        yaw = np.radians(poses[:, 2])[:, None]
+        cos_yaw, sin_yaw = np.cos(yaw), np.sin(yaw)
+        x = poses[:, 0, None] + corners_x * cos_yaw - corners_y * sin_yaw
+        y = poses[:, 1, None] + corners_x * sin_yaw + corners_y * cos_yaw
+        return np.stack((x, y), axis=2)
+
+    def _render_walkers(self, surface, list_w, world_to_pixel_array):
         """Renders the walkers' bounding boxes"""
-        for w in list_w:
-            color = COLOR_PLUM_0
-
-            # Compute bounding box points
-            bb = w[0].bounding_box.extent
-            corners = [
-                carla.Location(x=-bb.x, y=-bb.y),
-                carla.Location(x=bb.x, y=-bb.y),
-                carla.Location(x=bb.x, y=bb.y),
-                carla.Location(x=-bb.x, y=bb.y)]
-
-            w[1].transform(corners)
-            corners = [world_to_pixel(p) for p in corners]
+        if not list_w:
+            return
+        color = COLOR_PLUM_0
+
+        # Compute bounding box points
+        extents = np.array([(w[0].extent.x, w[0].extent.y) for w in list_w], dtype=np.float64)
+        bx, by = extents[:, 0, None], extents[:, 1, None]
+        corners_x = np.hstack((-bx, bx, bx, -bx))
+        corners_y = np.hstack((-by, -by, by, by))
+
+        polygons = world_to_pixel_array(self._footprints(list_w, corners_x, corners_y))
+        for corners in polygons.tolist():
             pygame.draw.polygon(surface, color, corners)
 
-    def _render_vehicles(self, surface, list_v, world_to_pixel):
+    def _render_vehicles(self, surface, list_v, world_to_pixel_array):
         """Renders the vehicles' bounding boxes"""
+        others = []
         for v in list_v:
-            color = COLOR_AQUAMARINE
-            if int(v[0].attributes['number_of_wheels']) == 2:
-                color = COLOR_AQUAMARINE
-            if v[0].attributes['role_name'] == self.args.rolename:
+            if v[0].is_hero:
                 # Simple, direct rendering of the hero vehicle
-                x, y = world_to_pixel(v[0].get_location())
+                x, y = world_to_pixel_array([(v[1].location.x, v[1].location.y)])[0].tolist()
                 angle = (-v[1].rotation.yaw - 90) % 360
 
-                center = (int(x), int(y))
+                center = (x, y)
                 hero_image_rotated = pygame.transform.rotozoom(self.hero_image, angle, 1.0).convert_alpha()
                 hero_rect_rotated = hero_image_rotated.get_rect(center=center)
                 surface.blit(hero_image_rotated, hero_rect_rotated)
+            else:
+                others.append(v)
 
-                if v[1] is not None:
-                    self.hero_transform = v[1]
-
+        if not others:
+            return
+        color = COLOR_AQUAMARINE
 
-            # Compute bounding box points
-            bb = v[0].bounding_box.extent
-            corners = [carla.Location(x=-bb.x, y=-bb.y),
-                       carla.Location(x=bb.x - 0.8, y=-bb.y),
-                       carla.Location(x=bb.x, y=0),
-                       carla.Location(x=bb.x - 0.8, y=bb.y),
-                       carla.Location(x=-bb.x, y=bb.y),
-                       carla.Location(x=-bb.x, y=-bb.y)
-                       ]
-            v[1].transform(corners)
-            corners = [world_to_pixel(p) for p in corners]
+        # Compute bounding box points, a pointed front
+        extents = np.array([(v[0].extent.x, v[0].extent.y) for v in others], dtype=np.float64)
+        bx, by = extents[:, 0, None], extents[:, 1, None]
+        corners_x = np.hstack((-bx, bx - 0.8, bx, bx - 0.8, -bx, -bx))
+        corners_y = np.hstack((-by, -by, np.zeros_like(by), by, by, -by))
 
-            if v[0].attributes['role_name'] != self.args.rolename:
-                pygame.draw.polygon(surface, color, corners)
+        polygons = world_to_pixel_array(self._footprints(others, corners_x, corners_y))
+        for corners in polygons.tolist():
+            pygame.draw.polygon(surface, color, corners)
 
-    def render_actors(self, surface, vehicles, traffic_lights, speed_limits, walkers):
+    def render_actors(self, surface, vehicles, walkers):
         """Renders all the actors"""
         # Static actors
-        self._render_traffic_lights(surface, [tl[0] for tl in traffic_lights], self.map_image.world_to_pixel)
-        self._render_speed_limits(surface, [sl[0] for sl in speed_limits], self.map_image.world_to_pixel,
+        self._render_traffic_lights(surface, self.map_image.world_to_pixel_array)
+        self._render_speed_limits(surface, self.map_image.world_to_pixel_array,
                                   self.map_image.world_to_pixel_width)
 
         # Dynamic actors
-        self._render_vehicles(surface, vehicles, self.map_image.world_to_pixel)
-        self._render_walkers(surface, walkers, self.map_image.world_to_pixel)
+        self._render_vehicles(surface, vehicles, self.map_image.world_to_pixel_array)
+        self._render_walkers(surface, walkers, self.map_image.world_to_pixel_array)
 
     def clip_surfaces(self, clipping_rect):
         """Used to improve perfomance. Clips the surfaces in order to render only the part of the surfaces that are going to be visible"""
@@ -380,7 +484,7 @@ class GameView:
         self.vehicle_id_surface.set_clip(clipping_rect)
         self.result_surface.set_clip(clipping_rect)
 
-    def _compute_scale(self, scale_factor):
+    def _compute_scale(self, scale_factor, smooth=True):
         """Computes the scale and moves the map so that it is zoomed in or out, centered."""
         # Center zooming on the display center
         display_center = (self.args.width / 2, self.args.height / 2)
@@ -401,30 +505,38 @@ class GameView:
         self.prev_scaled_size = self.scaled_size
 
         # Scale performed
-        self.map_image.scale_map(scale_factor)
+        self.map_image.scale_map(scale_factor, smooth)
 
-    def render(self, display):
-        """Renders the map and all the actors in hero and map mode"""
+    def render(self, display, alpha=1.0):
+        """Renders the map and all the actors in hero and map mode.
+        With interpolation enabled, alpha is the fraction of the simulation step elapsed since the last tick."""
         if self.actors_with_transforms is None:
             return
         self.result_surface.fill(COLOR_TRANSPARENT)
 
+        if not self.args.interpolate:
+            alpha = 1.0
+        actors_with_transforms, self.render_hero_transform = self._interpolate_transforms(alpha)
+
+        quality = self.quality_governor.level if self.quality_governor is not None else None
+
         # Split the actors by vehicle type id
-        vehicles, traffic_lights, speed_limits, walkers = self._split_actors()
+        vehicles, walkers = self._split_actors(actors_with_transforms)
 
         # Zoom in and out
         scale_factor = self._input.wheel_offset
         self.scaled_size = int(self.map_image.width * scale_factor)
         if self.scaled_size != self.prev_scaled_size:
-            self._compute_scale(scale_factor)
+            self._compute_scale(scale_factor, quality is None or quality.smooth)
+
+        if self.hero_actor is not None and self.render_hero_transform is not None:
+            vehicles = self._limit_vehicles(vehicles, quality.max_vehicles if quality is not None else None)
 
         # Render Actors
         self.actors_surface.fill(COLOR_BLACK)
         self.render_actors(
             self.actors_surface,
             vehicles,
-            traffic_lights,
-            speed_limits,
             walkers)
 
         # Show nearby actors from hero mode
@@ -437,18 +549,18 @@ class GameView:
                     )
         
         if self.game_manager.avatar:
-            self.game_manager.avatar.draw(self.actors_surface, self.map_image.world_to_pixel)
+            self.game_manager.avatar.draw(self.actors_surface, self.map_image.world_to_pixel, alpha)
 
-        self.game_manager.draw_coins(self.actors_surface, self.map_image.world_to_pixel, self.map_image.world_to_pixel_width)
+        self.game_manager.draw_coins(self.actors_surface, self.map_image.world_to_pixel_array, self.map_image.world_to_pixel_width)
 
-        angle = 0.0 if self.hero_actor is None else self.hero_transform.rotation.yaw + 90.0
-        self.traffic_light_surfaces.rotozoom(-angle, self.map_image.scale)
+        angle = 0.0 if self.hero_actor is None else self.render_hero_transform.rotation.yaw + 90.0
+        self.traffic_light_surfaces.rotozoom(-angle, self.map_image.scale, quality.hud_angle_step if quality is not None else 0.0)
 
         center_offset = (0, 0)
         if self.hero_actor is not None:
             # Hero Mode
-            hero_location_screen = self.map_image.world_to_pixel(self.hero_transform.location)
-            hero_front = self.hero_transform.get_forward_vector()
+            hero_location_screen = self.map_image.world_to_pixel(self.render_hero_transform.location)
+            hero_front = self.render_hero_transform.get_forward_vector()
             translation_offset = (
                 hero_location_screen[0] - self.hero_surface.get_width() / 2 + hero_front.x * PIXELS_AHEAD_VEHICLE,
                 hero_location_screen[1] - self.hero_surface.get_height() / 2 + hero_front.y * PIXELS_AHEAD_VEHICLE
@@ -479,8 +591,16 @@ class GameView:
             minimap_surface = pygame.Surface((minimap_diameter, minimap_diameter), pygame.SRCALPHA).convert_alpha()
             minimap_surface.fill((0, 0, 0, 0))  # Fully transparent
 
-            # Rotate the hero surface and center it on the minimap surface
-            rotated_hero_surface = pygame.transform.rotozoom(self.hero_surface, angle, 0.9).convert_alpha()
+            # Rotate the hero surface and center it on the minimap surface. At lower quality it is rotated
+            # at a reduced resolution and scaled back up, which is much cheaper than a full size rotozoom.
+            minimap_scale = quality.minimap_scale if quality is not None else 1.0
+            rotated_hero_surface = pygame.transform.rotozoom(self.hero_surface, angle, 0.9 * minimap_scale).convert_alpha()
+            if minimap_scale != 1.0:
+                size = (int(rotated_hero_surface.get_width() / minimap_scale), int(rotated_hero_surface.get_height() / minimap_scale))
+                if quality.smooth:
+                    rotated_hero_surface = pygame.transform.smoothscale(rotated_hero_surface, size)
+                else:
+                    rotated_hero_surface = pygame.transform.scale(rotated_hero_surface, size)
             rotated_rect = rotated_hero_surface.get_rect(center=(minimap_diameter // 2, minimap_diameter // 2))
             minimap_surface.blit(rotated_hero_surface, rotated_rect)
 
@@ -522,8 +642,8 @@ class GameView:
         """Updates the game view by rendering the map and actors"""
         self.game_manager.avatar.update(hero_wp)
 
-        vehicles = self.world.get_actors()
-        self.game_manager.update(vehicles)
+        # Vehicle grid of the last tick, rebuilt once per tick however many logic steps run on it
+        self.game_manager.update(self.vehicle_grid)
 
     def destroy(self):
         """Destroy the hero actor when class instance is destroyed"""